@@ -1,2 +1,16 @@
+import os
 import sys
-sys.path.append("D:/profile redirect/msclark1/Documents/GitHub/TD_MayaTools_03/src")
\ No newline at end of file
+
+# run from userSetup.py or the script editor. the tools folder is this file's folder, or MAYA_TOOLS_PATH when the
+# code is pasted into the script editor and has no file.
+try:
+    toolsPath = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    toolsPath = os.environ["MAYA_TOOLS_PATH"]
+
+if toolsPath not in sys.path:
+    sys.path.append(toolsPath)
+
+import maya.utils
+import ToolLauncher
+maya.utils.executeDeferred(ToolLauncher.InstallToolsMenu)
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# headless MayaToUE export of many scenes. the manifest is a json file like:
+# {
+#     "jobs": [
+#         {
+#             "scene": "D:/anims/walk.ma",
+#             "rootJnt": "root",
+#             "meshes": ["body"],
+#             "saveDir": "D:/export/walk",
+#             "fileName": "walk",
+#             "reduceKeys": true,
+#             "clips": [{"subfix": "loop", "frameMin": 1, "frameMax": 30, "shouldExport": true}]
+#         }
+#     ]
+# }
+# every job runs in its own worker process started with the worker command (mayapy by default), the runner only
+# schedules them, so it does not need maya itself.
+
+ResultPrefix = "BATCH_EXPORT_RESULT "
+
+def GetDefaultWorkerCommand():
+    return [os.environ.get("MAYAPY", "mayapy")]
+
+def RunExportJob(job):
+    import maya.standalone
+    maya.standalone.initialize()
+
+    try:
+        import maya.cmds as mc
+        from MayaToUE import MayaToUE
+
+        mc.file(job["scene"], o=True, f=True)
+
+        mayaToUE = MayaToUE()
+        mayaToUE.rootJnt = job["rootJnt"]
+        mayaToUE.meshes = job.get("meshes", [])
+        mayaToUE.saveDir = job["saveDir"]
+        mayaToUE.fileName = job["fileName"]
+        mayaToUE.reduceKeys = job.get("reduceKeys", False)
+        mayaToUE.skipUnchanged = job.get("skipUnchanged", True)
+        mayaToUE.AddAnimClips(job.get("clips", []))
+
+        mayaToUE.SaveFiles()
+        return mayaToUE.exportCounts
+    finally:
+        maya.standalone.uninitialize()
+
+def RunWorker(jobPath):
+    with open(jobPath) as jobFile:
+        job = json.load(jobFile)
+
+    result = RunExportJob(job)
+    print(ResultPrefix + json.dumps(result), flush=True)
+
+class BatchExporter:
+    def __init__(self, workerCommand = None, workerCount = None, timeout = 1800, retries = 1):
+        self.workerCommand = workerCommand or GetDefaultWorkerCommand()
+        self.workerCount = workerCount or os.cpu_count()
+        self.timeout = timeout
+        self.retries = retries
+
+    def RunJob(self, job, jobPath):
+        command = self.workerCommand + [os.path.abspath(__file__), "--worker", jobPath]
+        report = {"scene": job["scene"], "status": "failed", "attempts": 0, "time": 0.0, "error": ""}
+        startTime = time.perf_counter()
+        while report["attempts"] <= self.retries:
+            report["attempts"] += 1
+            try:
+                process = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                report["error"] = f"timed out after {self.timeout}s"
+                continue
+
+            results = [line[len(ResultPrefix):] for line in process.stdout.splitlines() if line.startswith(ResultPrefix)]
+            if process.returncode == 0 and results:
+                report["status"] = "succeeded"
+                report["error"] = ""
+                report["result"] = json.loads(results[-1])
+                break
+
+            errorLines = process.stderr.strip().splitlines()
+            report["error"] = errorLines[-1] if errorLines else f"worker exited with code {process.returncode}"
+
+        report["time"] = time.perf_counter() - startTime
+        return report
+
+    def Run(self, jobs):
+        startTime = time.perf_counter()
+        with tempfile.TemporaryDirectory() as jobDir:
+            jobPaths = []
+            for i, job in enumerate(jobs):
+                jobPath = os.path.join(jobDir, f"job_{i}.json")
+                with open(jobPath, "w") as jobFile:
+                    json.dump(job, jobFile)
+                jobPaths.append(jobPath)
+
+            with ThreadPoolExecutor(self.workerCount) as pool:
+                reports = list(pool.map(self.RunJob, jobs, jobPaths))
+
+        elapsedTime = time.perf_counter() - startTime
+        succeeded = len([report for report in reports if report["status"] == "succeeded"])
+        return {"jobs": reports, "succeeded": succeeded, "failed": len(reports) - succeeded, "time": elapsedTime}
+
+def PrintReport(report):
+    for jobReport in report["jobs"]:
+        counts = ""
+        if "result" in jobReport:
+            exported, skipped = jobReport["result"]["exported"], jobReport["result"]["skipped"]
+            counts = f"exported {exported['skeletalMeshes']} meshes, {exported['clips']} clips, skipped {skipped['skeletalMeshes']} meshes, {skipped['clips']} clips as unchanged"
+        print(f"{jobReport['status']:>9} {jobReport['scene']} ({jobReport['attempts']} attempts, {jobReport['time']:.1f}s) {counts}{jobReport['error']}")
+    print(f"{report['succeeded']} succeeded, {report['failed']} failed in {report['time']:.1f}s")
+
+def Main():
+    parser = argparse.ArgumentParser(description="Export many scenes to UE with MayaToUE in parallel worker processes.")
+    parser.add_argument("manifest", nargs="?")
+    parser.add_argument("--worker", help="run a single job file, used by the worker processes")
+    parser.add_argument("--worker-command", help="command that runs a worker, defaults to $MAYAPY or mayapy. \"python MemoryMaya.py\" runs it in the in-memory scene")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--report", help="write the consolidated report as json to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        RunWorker(args.worker)
+        return
+
+    with open(args.manifest) as manifestFile:
+        manifest = json.load(manifestFile)
+
+    workerCommand = shlex.split(args.worker_command) if args.worker_command else None
+    exporter = BatchExporter(workerCommand, args.workers, args.timeout, args.retries)
+    report = exporter.Run(manifest["jobs"])
+    PrintReport(report)
+
+    if args.report:
+        with open(args.report, "w") as reportFile:
+            json.dump(report, reportFile, indent=4)
+
+    if report["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    Main()
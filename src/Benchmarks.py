@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from MemoryMaya import InstallMemoryMaya, MemorySceneMeshData
+
+# scale benchmarks of the tools on synthetic scenes in the in-memory maya stand-in. every benchmark reports its wall
+# time, the maya.cmds calls it made and the peak memory it allocated, and a run can be checked against a saved
+# report to catch regressions without a maya license. times include the tracemalloc overhead, so only compare them
+# with other runs of this script.
+
+# vertex and joint count of the synthetic scenes
+SceneSizes = {
+    "small": (10000, 30),
+    "medium": (50000, 120),
+    "large": (200000, 300),
+}
+
+scene = InstallMemoryMaya()
+import maya.cmds as mc
+from LimbRiggingTool import LimbRigger
+from ProxyRigger import ProxyRigger
+from MayaToUE import MayaToUE
+from BatchExport import BatchExporter
+from KeyReduction import ReduceKeys, GetChannelTolerances
+from MayaUtils import GetAllConnectIn, GetUpperStream, IsJoint
+from CommandProfiler import CommandProfiler
+from SkinSnapshot import SkinSnapshot, SaveMeshSkinSnapshot, RestoreMeshSkinSnapshot, SaveWithSkinPercent
+
+# a spine along y with three joint limbs branching off it to alternating sides, like arms, legs and fingers
+def CreateSkeleton(jntCount):
+    limbCount = (jntCount - max(2, jntCount // 7)) // 3
+    spineCount = jntCount - limbCount * 3
+
+    mc.select(cl=True)
+    spine = [mc.joint(n=f"spine_{i}", p=(0, i, 0)) for i in range(spineCount)]
+    for i in range(limbCount):
+        spineIndex = 1 + i % (spineCount - 1)
+        side = 1 if i % 2 == 0 else -1
+        z = 0.2 * (i // (2 * (spineCount - 1)))
+        mc.select(spine[spineIndex])
+        for j, bend in enumerate((0, 0.3, 0)):
+            mc.joint(n=f"limb_{i}_{j}", p=(side * (j + 1), spineIndex, z + bend))
+    return spine[0]
+
+def CreateGridMesh(name, vertCount, width, height, cols = 200):
+    rows = max(2, vertCount // cols)
+    y, x = np.mgrid[0:rows, 0:cols]
+    points = np.stack([(x.ravel() / (cols - 1) - 0.5) * width, y.ravel() / (rows - 1) * height, np.zeros(rows * cols)], axis=1)
+    indices = np.arange(rows * cols).reshape(rows, cols)
+    quads = np.stack([indices[:-1, :-1], indices[:-1, 1:], indices[1:, 1:], indices[1:, :-1]], axis=2).reshape(-1, 4)
+    return scene.CreateMesh(name, np.full(len(quads), 4), quads.ravel(), points)
+
+# inverse distance weights to the closest joints of every vertex, like a smoothed bind
+def GetSmoothWeights(points, jntPositions, maxInfluences = 4, chunkSize = 16384):
+    weights = np.zeros((len(points), len(jntPositions)))
+    for start in range(0, len(points), chunkSize):
+        chunk = points[start:start + chunkSize]
+        distances = np.sqrt(((chunk[:, None, :] - jntPositions[None, :, :]) ** 2).sum(axis=2))
+        closest = np.argpartition(distances, maxInfluences - 1, axis=1)[:, :maxInfluences]
+        closestWeights = 1 / (np.take_along_axis(distances, closest, axis=1) + 1e-3)
+        rows = np.arange(start, start + len(chunk))[:, None]
+        weights[rows, closest] = closestWeights / closestWeights.sum(axis=1, keepdims=True)
+    return weights
+
+# frame x (joint x translate, rotate, scale) samples like a baked clip: smooth motion on every translate and rotate
+# channel with a little jitter, and constant scales
+def GetSyntheticJointSamples(frameCount, jntCount):
+    random = np.random.default_rng(0)
+    frames = np.arange(frameCount)[:, None, None]
+    frequencies = random.uniform(0.5, 3, (1, jntCount, 6)) * 2 * np.pi / frameCount
+    motion = random.uniform(0.1, 1, (1, jntCount, 6)) * np.sin(frames * frequencies + random.uniform(0, np.pi, (1, jntCount, 6)))
+    motion += random.normal(0, 1e-4, motion.shape)
+    return np.concatenate([motion, np.ones((frameCount, jntCount, 3))], axis=2).reshape(frameCount, -1)
+
+# a skeleton and a grid mesh in front of it skinned to every joint
+def CreateSkinnedScene(vertCount, jntCount):
+    root = CreateSkeleton(jntCount)
+    jnts = [root] + mc.listRelatives(root, ad=True, type="joint")
+    height = max(mc.xform(jnt, q=True, t=True, ws=True)[1] for jnt in jnts)
+    mesh = CreateGridMesh("body", vertCount, 8, height)
+    skin = mc.skinCluster(jnts, mesh, tsb=True)[0]
+
+    meshData = MemorySceneMeshData(scene)
+    influencePositions = np.array([mc.xform(jnt, q=True, t=True, ws=True) for jnt in meshData.GetSkinInfluences(skin)])
+    meshData.SetSkinWeights(skin, GetSmoothWeights(meshData.GetMeshPoints(mesh), influencePositions))
+    return {"root": root, "mesh": mesh, "meshData": meshData, "samples": GetSyntheticJointSamples(240, len(jnts))}
+
+def BenchmarkProxyRig(context):
+    rigger = ProxyRigger()
+    rigger.meshData = context["meshData"]
+    rigger.CreateProxyRigForMesh(context["mesh"])
+
+def BenchmarkDecimatedProxyRig(context):
+    rigger = ProxyRigger()
+    rigger.meshData = context["meshData"]
+    rigger.decimateRatio = 0.25
+    rigger.CreateProxyRigForMesh(context["mesh"])
+
+def BenchmarkRigidProxyRig(context):
+    rigger = ProxyRigger()
+    rigger.meshData = context["meshData"]
+    rigger.weightTransferMode = "rigid"
+    rigger.CreateProxyRigForMesh(context["mesh"])
+
+def BenchmarkRigLimbs(context):
+    rigger = LimbRigger()
+    context["limbRigger"] = rigger
+    context["rigGrps"] = rigger.RigLimbs(rigger.FindLimbChains(context["root"]))
+
+def BenchmarkRestyleRigs(context):
+    rigger = context["limbRigger"]
+    rigger.controllerSize *= 2
+    rigger.controllerColor = (1, 0, 0)
+    rigger.RestyleRigs(context["rigGrps"])
+
+def BenchmarkFindSkinJoints(context):
+    GetAllConnectIn(mc.listRelatives(context["mesh"], s=True)[0], GetUpperStream, 10, IsJoint)
+
+def BenchmarkAddMeshes(context):
+    exporter = MayaToUE()
+    exporter.meshData = context["meshData"]
+    mc.select(mc.ls(type="transform"))
+    exporter.AddMeshes()
+
+def BenchmarkMeshHash(context):
+    exporter = MayaToUE()
+    exporter.meshData = context["meshData"]
+    exporter.GetMeshHash(context["mesh"])
+
+def BenchmarkSkinFixes(context):
+    exporter = MayaToUE()
+    exporter.meshData = context["meshData"]
+    exporter.rootJnt = context["root"]
+    exporter.meshes = [context["mesh"]]
+    exporter.GetSkinFixes()
+
+def BenchmarkReduceKeys(context):
+    samples = context["samples"]
+    ReduceKeys(samples, GetChannelTolerances(samples.shape[1] // 9, 0.01, 0.05, 0.001), [0, len(samples) // 2, len(samples) - 1])
+
+def BenchmarkSaveSkinSnapshot(context):
+    SaveMeshSkinSnapshot(context["meshData"], context["mesh"], context["snapshotPath"])
+
+def BenchmarkRestoreSkinSnapshot(context):
+    RestoreMeshSkinSnapshot(context["meshData"], context["mesh"], context["snapshotPath"])
+
+def BenchmarkReadSkinSnapshotPart(context):
+    with SkinSnapshot(context["snapshotPath"]) as snapshot:
+        snapshot.GetWeights(np.arange(0, snapshot.vertCount, 10), snapshot.influences[:8])
+
+def BenchmarkSkinPercentSave(context):
+    SaveWithSkinPercent(context["mesh"], range(1000))
+
+# smoke run of a batch export worker: the scene is saved and exported again by BatchExport.py --worker in a python
+# process running MemoryMaya as its mayapy. the clips are left out, sampling them needs the api.
+def BenchmarkBatchExportWorker(context):
+    scenePath = os.path.join(context["tempDir"], "batch.mms")
+    mc.file(rename=scenePath)
+    mc.file(save=True)
+    job = {"scene": scenePath, "rootJnt": context["root"], "meshes": [context["mesh"]], "saveDir": os.path.join(context["tempDir"], "batch"), "fileName": "body"}
+    workerCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "MemoryMaya.py")]
+    report = BatchExporter(workerCommand, workerCount=1, timeout=300, retries=0).Run([job])
+    if report["failed"]:
+        raise Exception(f"batch export worker failed: {report['jobs'][0]['error']}")
+    if report["jobs"][0]["result"]["exported"]["skeletalMeshes"] != 1:
+        raise Exception(f"batch export worker did not export the skeletal mesh: {report['jobs'][0]['result']}")
+
+# run in this order on the same scene, later ones work on what the earlier ones built
+Benchmarks = [
+    ("ProxyRigger.CreateProxyRigForMesh", BenchmarkProxyRig),
+    ("ProxyRigger.CreateProxyRigForMesh unchanged", BenchmarkProxyRig),
+    ("ProxyRigger.CreateProxyRigForMesh decimated 0.25", BenchmarkDecimatedProxyRig),
+    ("ProxyRigger.CreateProxyRigForMesh rigid", BenchmarkRigidProxyRig),
+    ("LimbRigger.RigLimbs", BenchmarkRigLimbs),
+    ("LimbRigger.RestyleRigs", BenchmarkRestyleRigs),
+    ("MayaUtils.GetAllConnectIn joints", BenchmarkFindSkinJoints),
+    ("MayaToUE.AddMeshes", BenchmarkAddMeshes),
+    ("MayaToUE.GetMeshHash", BenchmarkMeshHash),
+    ("MayaToUE.GetSkinFixes", BenchmarkSkinFixes),
+    ("KeyReduction.ReduceKeys 240 frames", BenchmarkReduceKeys),
+    ("SkinSnapshot.SaveMeshSkinSnapshot", BenchmarkSaveSkinSnapshot),
+    ("SkinSnapshot.RestoreMeshSkinSnapshot", BenchmarkRestoreSkinSnapshot),
+    ("SkinSnapshot.GetWeights every 10th vertex", BenchmarkReadSkinSnapshotPart),
+    ("SkinSnapshot.SaveWithSkinPercent 1000 verts", BenchmarkSkinPercentSave),
+    ("BatchExport.BatchExporter worker", BenchmarkBatchExportWorker),
+]
+
+def RunBenchmark(Benchmark, context, profiler = None, operationName = ""):
+    scene.ResetCommandCounts()
+    tracemalloc.reset_peak()
+    startMemory = tracemalloc.get_traced_memory()[0]
+    startTime = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), profiler.Profile(operationName) if profiler else contextlib.nullcontext():
+        Benchmark(context)
+    elapsedTime = time.perf_counter() - startTime
+    peakMemory = tracemalloc.get_traced_memory()[1] - startMemory
+
+    commandCounts = dict(scene.commandCounts.most_common())
+    return {"time": elapsedTime, "commands": sum(commandCounts.values()), "commandCounts": commandCounts, "peakMemory": peakMemory}
+
+def RunSuite(sizes, profiler = None):
+    global scene
+    report = {"sizes": {}}
+    tempDir = tempfile.mkdtemp()
+    tracemalloc.start()
+    try:
+        for size in sizes:
+            vertCount, jntCount = SceneSizes[size]
+            scene = InstallMemoryMaya()
+            context = CreateSkinnedScene(vertCount, jntCount)
+            context["tempDir"] = tempDir
+            context["snapshotPath"] = os.path.join(tempDir, f"{size}.skinsnap")
+            results = {name: RunBenchmark(Benchmark, context, profiler, f"{size} {name}") for name, Benchmark in Benchmarks}
+            report["sizes"][size] = {"vertCount": vertCount, "jntCount": jntCount, "benchmarks": results}
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(tempDir)
+    return report
+
+def PrintReport(report):
+    print(f"{'scene':<8}{'benchmark':<48}{'time':>10}{'commands':>10}{'peak':>10}  most called")
+    for size, sizeReport in report["sizes"].items():
+        for name, result in sizeReport["benchmarks"].items():
+            mostCalled = ", ".join(f"{command} {count}" for command, count in list(result["commandCounts"].items())[:3])
+            print(f"{size:<8}{name:<48}{result['time']:>9.3f}s{result['commands']:>10}{result['peakMemory'] / 2**20:>8.1f}MB  {mostCalled}")
+
+# a benchmark regresses if it makes more commands than in the baseline, or takes more time or memory than the
+# tolerance allows
+def FindRegressions(report, baseline, tolerance):
+    regressions = []
+    for size, sizeReport in report["sizes"].items():
+        baseResults = baseline["sizes"].get(size, {}).get("benchmarks", {})
+        for name, result in sizeReport["benchmarks"].items():
+            baseResult = baseResults.get(name)
+            if not baseResult:
+                continue
+
+            if result["commands"] > baseResult["commands"]:
+                regressions.append(f"{size} {name}: {baseResult['commands']} -> {result['commands']} commands")
+            for key in ("time", "peakMemory"):
+                if result[key] > baseResult[key] * (1 + tolerance):
+                    regressions.append(f"{size} {name}: {key} {baseResult[key]:.3f} -> {result[key]:.3f}")
+    return regressions
+
+def Main():
+    parser = argparse.ArgumentParser(description="Benchmark the tools on synthetic scenes in the in-memory maya stand-in.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SceneSizes), default=list(SceneSizes))
+    parser.add_argument("--json", help="write the report as json to this path")
+    parser.add_argument("--baseline", help="report of an earlier run to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth of time and memory")
+    parser.add_argument("--profile", help="write the per command profile of every benchmark as json to this path")
+    args = parser.parse_args()
+
+    profiler = CommandProfiler() if args.profile else None
+    report = RunSuite(args.sizes, profiler)
+    PrintReport(report)
+
+    if profiler:
+        profiler.WriteJson(args.profile)
+
+    if args.json:
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            regressions = FindRegressions(report, json.load(baselineFile), args.tolerance)
+        for regression in regressions:
+            print("regression: " + regression)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    Main()
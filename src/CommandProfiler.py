@@ -0,0 +1,161 @@
+import contextlib
+import functools
+import json
+import time
+from collections import Counter
+import maya.cmds as mc
+import maya.mel as mel
+
+# records how often every maya.cmds command and mel.eval is called during a tool operation, how long the calls take
+# and how large their arguments are. the commands are only wrapped while an operation runs, so the tools pay nothing
+# when profiling is off. usage:
+#     profiler = CommandProfiler()
+#     profiler.Attach(ProxyRigger, "CreateProxyRigFromSelectedMesh")
+#     profiler.Attach(LimbRigger, "RigLimb")
+#     ... run the tools ...
+#     profiler.PrintReport()
+#     profiler.WriteJson("D:/proxy_rig_profile.json")
+
+# upper bounds of the argument size buckets, the size of a call is the number of values it was passed with lists
+# flattened, or the length of the script for mel.eval
+ArgSizeBuckets = [1, 10, 100, 1000, 10000]
+
+def GetArgSize(value):
+    if isinstance(value, (list, tuple, set)):
+        return sum(GetArgSize(item) for item in value)
+    return 1
+
+def GetArgSizeBucket(size):
+    for limit in ArgSizeBuckets:
+        if size <= limit:
+            return f"<={limit}"
+    return f">{ArgSizeBuckets[-1]}"
+
+class CommandStats:
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.argSizes = Counter()
+
+    def Add(self, elapsedTime, argSize):
+        self.count += 1
+        self.time += elapsedTime
+        self.argSizes[GetArgSizeBucket(argSize)] += 1
+
+    def ToDict(self):
+        buckets = [f"<={limit}" for limit in ArgSizeBuckets] + [f">{ArgSizeBuckets[-1]}"]
+        return {"count": self.count, "time": self.time, "argSizes": {bucket: self.argSizes[bucket] for bucket in buckets if self.argSizes[bucket]}}
+
+class CommandProfiler:
+    def __init__(self):
+        self.operations = []
+        self.commandStats = {}
+        self.depth = 0
+        self.originalCommands = []
+        self.attachedMethods = []
+
+    def WrapCommand(self, name, command, GetSize):
+        @functools.wraps(command)
+        def ProfiledCommand(*args, **kwargs):
+            startTime = time.perf_counter()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                stats = self.commandStats.get(name)
+                if not stats:
+                    stats = self.commandStats[name] = CommandStats()
+                stats.Add(time.perf_counter() - startTime, GetSize(args, kwargs))
+        return ProfiledCommand
+
+    def WrapCommands(self):
+        for name in dir(mc):
+            command = getattr(mc, name)
+            if name.startswith("_") or not callable(command):
+                continue
+            self.originalCommands.append((mc, name, command))
+            setattr(mc, name, self.WrapCommand(name, command, lambda args, kwargs: GetArgSize(args) + GetArgSize(list(kwargs.values()))))
+
+        self.originalCommands.append((mel, "eval", mel.eval))
+        mel.eval = self.WrapCommand("mel.eval", mel.eval, lambda args, kwargs: len(args[0]) if args else 0)
+
+    def UnwrapCommands(self):
+        for module, name, command in self.originalCommands:
+            setattr(module, name, command)
+        self.originalCommands = []
+
+    # profiles the commands issued inside the with block as one operation. operations started inside another one
+    # are counted as part of the outermost.
+    @contextlib.contextmanager
+    def Profile(self, operationName):
+        if self.depth:
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+            return
+
+        self.commandStats = {}
+        self.WrapCommands()
+        self.depth = 1
+        startTime = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsedTime = time.perf_counter() - startTime
+            self.depth = 0
+            self.UnwrapCommands()
+            self.operations.append({"name": operationName, "time": elapsedTime, "commands": self.commandStats})
+            self.commandStats = {}
+
+    # makes every call of the given methods of a class or object a profiled operation
+    def Attach(self, owner, *methodNames):
+        ownerName = getattr(owner, "__name__", type(owner).__name__)
+        for methodName in methodNames:
+            method = getattr(owner, methodName)
+            operationName = f"{ownerName}.{methodName}"
+
+            def ProfiledMethod(*args, method=method, operationName=operationName, **kwargs):
+                with self.Profile(operationName):
+                    return method(*args, **kwargs)
+
+            functools.update_wrapper(ProfiledMethod, method)
+            self.attachedMethods.append((owner, methodName, owner.__dict__.get(methodName)))
+            setattr(owner, methodName, ProfiledMethod)
+
+    def DetachAll(self):
+        for owner, methodName, method in reversed(self.attachedMethods):
+            if method is None:
+                delattr(owner, methodName)
+            else:
+                setattr(owner, methodName, method)
+        self.attachedMethods = []
+
+    def Clear(self):
+        self.operations = []
+
+    # operations in the order they ran, their commands sorted by cumulative time
+    def GetReport(self):
+        operations = []
+        for operation in self.operations:
+            commands = sorted(operation["commands"].items(), key=lambda item: item[1].time, reverse=True)
+            operations.append({
+                "name": operation["name"],
+                "time": operation["time"],
+                "commandCount": sum(stats.count for name, stats in commands),
+                "commandTime": sum(stats.time for name, stats in commands),
+                "commands": {name: stats.ToDict() for name, stats in commands},
+            })
+        return {"operations": operations}
+
+    def PrintReport(self, maxCommands = 15):
+        for operation in self.GetReport()["operations"]:
+            print(f"{operation['name']}: {operation['time']:.3f}s, {operation['commandCount']} commands taking {operation['commandTime']:.3f}s")
+            print(f"    {'command':<28}{'calls':>10}{'total':>12}{'per call':>12}  argument sizes")
+            for name, stats in list(operation["commands"].items())[:maxCommands]:
+                argSizes = " ".join(f"{bucket}:{count}" for bucket, count in stats["argSizes"].items())
+                print(f"    {name:<28}{stats['count']:>10}{stats['time'] * 1000:>10.1f}ms{stats['time'] * 1e6 / stats['count']:>10.1f}us  {argSizes}")
+
+    def WriteJson(self, path):
+        with open(path, "w") as reportFile:
+            json.dump(self.GetReport(), reportFile, indent=4)
@@ -0,0 +1,19 @@
+import json
+import os
+import maya.cmds as mc
+
+# cv data of the controller shapes, loaded from ControllerShapes.json the first time a shape is built
+shapeLibrary = None
+
+def GetShapeLibrary():
+    global shapeLibrary
+    if shapeLibrary is None:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ControllerShapes.json")) as libraryFile:
+            shapeLibrary = json.load(libraryFile)
+    return shapeLibrary
+
+# builds the curve with its points already scaled, so no scale or freeze is needed afterwards
+def CreateShapeCurve(name, shapeName, scale):
+    shape = GetShapeLibrary()[shapeName]
+    points = [(x * scale, y * scale, z * scale) for x, y, z in shape["points"]]
+    return mc.curve(n=name, d=shape["degree"], per=shape.get("periodic", False), p=points, k=shape["knots"])
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import maya.cmds as mc
+import maya.api.OpenMaya as om
+from maya.api.MDGContextGuard import MDGContextGuard
+from MeshData import GetDependNode
+
+# per joint channels of a sample, rotations are in radians
+SampleChannels = ["tx", "ty", "tz", "rx", "ry", "rz", "sx", "sy", "sz"]
+
+def GetSkeletonJnts(rootJnt):
+    return [rootJnt] + (mc.listRelatives(rootJnt, ad=True, type="joint") or [])
+
+def GetChannelPlugs(jnts):
+    plugs = []
+    for jnt in jnts:
+        nodeFn = om.MFnDependencyNode(GetDependNode(jnt))
+        for attr in ("translate", "rotate", "scale"):
+            compoundPlug = nodeFn.findPlug(attr, False)
+            plugs += [compoundPlug.child(i) for i in range(3)]
+    return plugs
+
+def GetTransformPlugs(jnts):
+    return [om.MFnDependencyNode(GetDependNode(jnt)).findPlug("xformMatrix", False) for jnt in jnts]
+
+# the channels of a joint from one read of its xformMatrix, so the joint is evaluated once instead of once per channel.
+# the rotation is the euler of the rotate channels, in radians.
+def GetTransformChannels(plug):
+    transform = om.MFnMatrixData(plug.asMObject()).transformation()
+    return list(transform.translation(om.MSpace.kTransform)) + list(transform.rotationComponents()) + list(transform.scale(om.MSpace.kTransform))
+
+# whether the xformMatrix reads give the same channels as the channel plugs at the current frame
+def CanSampleTransforms(jnts):
+    channelValues = [plug.asDouble() for plug in GetChannelPlugs(jnts)]
+    transformValues = [value for plug in GetTransformPlugs(jnts) for value in GetTransformChannels(plug)]
+    return np.allclose(channelValues, transformValues, rtol=0, atol=1e-6)
+
+# evaluates every joint once per given frame, writing into a frame x joint x channel array. the channel plugs are read
+# one by one instead if the xformMatrix of a joint does not match them.
+def SampleJointTransforms(jnts, frames, samples):
+    timeUnit = om.MTime.uiUnit()
+    if CanSampleTransforms(jnts):
+        plugs = GetTransformPlugs(jnts)
+        ReadPlugs = lambda: [GetTransformChannels(plug) for plug in plugs]
+    else:
+        plugs = GetChannelPlugs(jnts)
+        ReadPlugs = lambda: [plug.asDouble() for plug in plugs]
+
+    for frameIndex, frame in enumerate(frames):
+        with MDGContextGuard(om.MDGContext(om.MTime(frame, timeUnit))):
+            values = ReadPlugs()
+        samples[frameIndex] = np.reshape(values, (len(jnts), len(SampleChannels)))
+
+# the bake and keyframe query path the sampling replaces, for comparison. the bake is undone afterwards.
+def SampleWithBakeResults(jnts, start, end):
+    mc.undoInfo(openChunk=True, chunkName="SampleWithBakeResults")
+    try:
+        mc.bakeResults(jnts, t=(start, end), at=SampleChannels, simulation=True)
+        values = np.array([mc.keyframe(f"{jnt}.{channel}", q=True, t=(start, end), vc=True) for jnt in jnts for channel in SampleChannels]).T
+    finally:
+        mc.undoInfo(closeChunk=True)
+        mc.undo()
+
+    samples = values.reshape(-1, len(jnts), len(SampleChannels))
+    samples[:, :, 3:6] = np.radians(samples[:, :, 3:6])
+    return samples
+
+# times sampling the skeleton under rootJnt from start to end against baking it and querying the keys
+def BenchmarkJointSampling(rootJnt, start, end):
+    jnts = GetSkeletonJnts(rootJnt)
+    frames = range(int(start), int(end) + 1)
+    samples = np.zeros((len(frames), len(jnts), len(SampleChannels)))
+
+    startTime = time.perf_counter()
+    SampleJointTransforms(jnts, frames, samples)
+    sampleTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    bakedSamples = SampleWithBakeResults(jnts, start, end)
+    bakeTime = time.perf_counter() - startTime
+
+    print(f"{len(jnts)} joints, {len(frames)} frames: sampling {sampleTime:.3f}s, bakeResults {bakeTime:.3f}s, {bakeTime / sampleTime:.1f}x faster, max difference {np.abs(samples - bakedSamples).max():.2e}")
+    return {"sampleTime": sampleTime, "bakeTime": bakeTime}
+
+# fingerprint of all the keyframes in the scene and of the nodes upstream of the skeleton, so unsaved animation edits
+# and rig changes like a new constraint invalidate cached samples
+def GetSceneFingerprint(jnts):
+    hasher = hashlib.sha1()
+    curves = mc.ls(type="animCurve")
+    if curves:
+        hasher.update(json.dumps(curves).encode())
+        hasher.update(json.dumps(mc.keyframe(curves, q=True, tc=True, vc=True)).encode())
+    hasher.update(json.dumps(sorted(mc.listHistory(jnts) or [])).encode())
+    return hasher.hexdigest()
+
+# frames of a cached range that are sampled again and compared with the cache before it is used, this catches the
+# changes the fingerprint does not see, like an edited constraint offset or a reloaded reference
+ValidationFrameCount = 3
+ValidationTolerance = 1e-6
+# the least recently used sample files are deleted once the cache is over this size
+DefaultCacheBytes = 2 * 1024 ** 3
+
+# samples are stored as one .npy per scene and frame range and read back memory-mapped, so later passes over the
+# same range do not evaluate the scene again. the scene fingerprint is taken once per export pass, call
+# BeginExportPass before each one.
+class JointSampleCache:
+    def __init__(self, cacheDir = "", maxCacheBytes = DefaultCacheBytes):
+        self.cacheDir = cacheDir or os.path.join(mc.internalVar(userTmpDir=True), "MayaToUESamples")
+        self.maxCacheBytes = maxCacheBytes
+        self.fingerprints = {}
+        self.validatedPaths = set()
+
+    def BeginExportPass(self):
+        self.fingerprints = {}
+        self.validatedPaths = set()
+
+    def GetFingerprint(self, jnts):
+        if jnts[0] not in self.fingerprints:
+            self.fingerprints[jnts[0]] = GetSceneFingerprint(jnts)
+        return self.fingerprints[jnts[0]]
+
+    def GetKey(self, jnts, start, end):
+        keyData = [mc.file(q=True, sn=True), self.GetFingerprint(jnts), jnts, int(start), int(end)]
+        return hashlib.sha1(json.dumps(keyData).encode()).hexdigest()
+
+    def GetSamplePath(self, key):
+        return os.path.join(self.cacheDir, key + ".npy")
+
+    # returns the joints and a read-only frame x joint x channel array of their samples from start to end
+    def GetSamples(self, rootJnt, start, end):
+        jnts = GetSkeletonJnts(rootJnt)
+        samplePath = self.GetSamplePath(self.GetKey(jnts, start, end))
+        if os.path.exists(samplePath) and self.IsValid(samplePath, jnts, start):
+            os.utime(samplePath)
+        else:
+            self.Put(samplePath, jnts, start, end)
+
+        return jnts, np.load(samplePath, mmap_mode="r")
+
+    # compares the first, middle and last frames of the cached samples with the scene, once per export pass
+    def IsValid(self, samplePath, jnts, start):
+        if samplePath in self.validatedPaths:
+            return True
+
+        cached = np.load(samplePath, mmap_mode="r")
+        if cached.shape[1] != len(jnts):
+            return False
+
+        frameIndices = np.unique(np.linspace(0, len(cached) - 1, ValidationFrameCount).astype(np.int64))
+        samples = np.zeros((len(frameIndices),) + cached.shape[1:])
+        SampleJointTransforms(jnts, (int(start) + frameIndices).tolist(), samples)
+        if not np.allclose(samples, cached[frameIndices], rtol=0, atol=ValidationTolerance):
+            print(f"cached samples from frame {int(start)} no longer match the scene, sampling again")
+            return False
+
+        self.validatedPaths.add(samplePath)
+        return True
+
+    def Put(self, samplePath, jnts, start, end):
+        os.makedirs(self.cacheDir, exist_ok=True)
+        tempPath = samplePath + ".tmp.npy"
+        frameCount = int(end) - int(start) + 1
+        samples = np.lib.format.open_memmap(tempPath, mode="w+", dtype=np.float64, shape=(frameCount, len(jnts), len(SampleChannels)))
+        SampleJointTransforms(jnts, range(int(start), int(end) + 1), samples)
+        samples.flush()
+        del samples
+        os.replace(tempPath, samplePath)
+        self.validatedPaths.add(samplePath)
+        self.Evict(samplePath)
+
+    # deletes the least recently used sample files until the cache fits maxCacheBytes, a hit touches its file. files
+    # still mapped elsewhere can not be deleted on windows and are left for a later pass.
+    def Evict(self, keepPath = ""):
+        sampleFiles = []
+        for fileName in os.listdir(self.cacheDir):
+            path = os.path.join(self.cacheDir, fileName)
+            if fileName.endswith(".npy") and path != keepPath:
+                fileStat = os.stat(path)
+                sampleFiles.append((fileStat.st_mtime, fileStat.st_size, path))
+
+        cacheBytes = sum(size for mtime, size, path in sampleFiles) + (os.path.getsize(keepPath) if keepPath else 0)
+        for mtime, size, path in sorted(sampleFiles):
+            if cacheBytes <= self.maxCacheBytes:
+                break
+            try:
+                os.remove(path)
+                self.validatedPaths.discard(path)
+                cacheBytes -= size
+            except OSError:
+                pass
+
+    def Clear(self):
+        if not os.path.isdir(self.cacheDir):
+            return
+
+        for fileName in os.listdir(self.cacheDir):
+            if fileName.endswith(".npy"):
+                os.remove(os.path.join(self.cacheDir, fileName))
+        self.validatedPaths = set()
@@ -0,0 +1,55 @@
+import numpy as np
+
+# frame x curve mask of the keys to keep so that linear interpolation between them stays within each curve's
+# tolerance. every pass refines all curves at once: it interpolates between the kept keys, and in every segment
+# that is still off by more than the tolerance it keeps the frame with the largest error.
+def ReduceKeys(values, tolerances, forcedFrames = ()):
+    frameCount, curveCount = values.shape
+    frames = np.arange(frameCount)[:, None]
+    curves = np.arange(curveCount)[None, :]
+
+    keep = np.zeros(values.shape, dtype=bool)
+    keep[[0, -1]] = True
+    keep[list(forcedFrames)] = True
+
+    while True:
+        prevKeys = np.maximum.accumulate(np.where(keep, frames, 0), axis=0)
+        nextKeys = np.minimum.accumulate(np.where(keep, frames, frameCount - 1)[::-1], axis=0)[::-1]
+        span = np.maximum(nextKeys - prevKeys, 1)
+        prevValues = values[prevKeys, curves]
+        interpolated = prevValues + (values[nextKeys, curves] - prevValues) * (frames - prevKeys) / span
+        errors = np.abs(values - interpolated)
+
+        keyFrames, keyCurves = np.nonzero(errors > tolerances)
+        if len(keyFrames) == 0:
+            return keep
+
+        segments = prevKeys[keyFrames, keyCurves]
+        order = np.lexsort((-errors[keyFrames, keyCurves], segments, keyCurves))
+        keyFrames, keyCurves, segments = keyFrames[order], keyCurves[order], segments[order]
+
+        worstInSegment = np.ones(len(order), dtype=bool)
+        worstInSegment[1:] = (keyCurves[1:] != keyCurves[:-1]) | (segments[1:] != segments[:-1])
+        keep[keyFrames[worstInSegment], keyCurves[worstInSegment]] = True
+
+# per curve tolerances for samples laid out as joint x (translate, rotate, scale) channels, rotations in radians
+def GetChannelTolerances(jntCount, translateTolerance, rotateTolerance, scaleTolerance):
+    channelTolerances = np.repeat([translateTolerance, np.radians(rotateTolerance), scaleTolerance], 3)
+    return np.tile(channelTolerances, jntCount)
+
+# the kept keys of every curve over disjoint frame ranges, given as (start frame, frame x curve values, keep mask)
+# per range. returns (frames, values) per curve in frame order, so each curve can be written with one call.
+def MergeKeptKeys(reducedRanges):
+    reducedRanges = sorted(reducedRanges, key=lambda reducedRange: reducedRange[0])
+    curveCount = reducedRanges[0][1].shape[1]
+    curves, frames, values = [], [], []
+    for start, rangeValues, keep in reducedRanges:
+        keptCurves, keptFrames = np.nonzero(keep.T)
+        curves.append(keptCurves)
+        frames.append(start + keptFrames)
+        values.append(rangeValues[keptFrames, keptCurves])
+
+    curves = np.concatenate(curves)
+    order = np.argsort(curves, kind="stable")
+    splits = np.cumsum(np.bincount(curves, minlength=curveCount))[:-1]
+    return list(zip(np.split(np.concatenate(frames)[order], splits), np.split(np.concatenate(values)[order], splits)))
@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+from KeyReduction import ReduceKeys, MergeKeptKeys
+
+# run from this folder with python -m unittest KeyReductionTest
+
+class MergeKeptKeysTest(unittest.TestCase):
+    # two clips baked over disjoint ranges, reduced one range at a time like MayaToUE.ReduceBakedKeys does
+    def test_two_disjoint_clips(self):
+        ranges = [(0, 40), (100, 160)]
+        tolerance = 1e-3
+        sampledRanges = []
+        for start, end in ranges:
+            frames = np.arange(start, end + 1)[:, None]
+            values = np.concatenate([np.sin(frames * 0.1), np.cos(frames * 0.05) * 2, np.ones_like(frames, dtype=float)], axis=1)
+            keep = ReduceKeys(values, np.full(values.shape[1], tolerance), [0, len(values) - 1])
+            sampledRanges.append((start, values, keep))
+
+        # the ranges are given out of order, the keys still come back in frame order
+        curveKeys = MergeKeptKeys(sampledRanges[::-1])
+        self.assertEqual(len(curveKeys), 3)
+        for curve, (keyFrames, keyValues) in enumerate(curveKeys):
+            self.assertTrue(np.all(np.diff(keyFrames) > 0))
+            for (start, end), (_, values, keep) in zip(ranges, sampledRanges):
+                inRange = (keyFrames >= start) & (keyFrames <= end)
+                self.assertEqual(inRange.sum(), keep[:, curve].sum())
+                self.assertIn(start, keyFrames)
+                self.assertIn(end, keyFrames)
+                interpolated = np.interp(np.arange(start, end + 1), keyFrames, keyValues)
+                self.assertLessEqual(np.abs(interpolated - values[:, curve]).max(), tolerance)
+
+if __name__ == "__main__":
+    unittest.main()
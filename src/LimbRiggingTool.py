@@ -1,6 +1,7 @@
+import re
+import time
 from PySide2.QtGui import QColor
 import maya.cmds as mc
-import maya.mel as mel
 from maya.OpenMaya import MVector
 
 from PySide2.QtWidgets import (QWidget,
@@ -11,10 +12,12 @@ from PySide2.QtWidgets import (QWidget,
                                QPushButton,
                                QLineEdit,
                                QMessageBox,
-                               QColorDialog
+                               QColorDialog,
+                               QCheckBox
                                )
 from PySide2.QtCore import Qt
-from MayaUtils import QMayaWindow
+from MayaUtils import QMayaWindow, MeasurePlaybackFps
+from ControllerShapes import CreateShapeCurve
     
 class LimbRigger:
     def __init__(self):
@@ -23,36 +26,112 @@ class LimbRigger:
         self.end = ""
         self.controllerSize = 5
         self.controllerColor = (0,0,0)
+        self.useUtilityNodes = True
+        self.shapeCache = {}
 
     def AutoFindJnts(self):
-        self.root = mc.ls(sl=True, type="joint")[0]
-        self.mid = mc.listRelatives(self.root, c=True, type="joint")[0]
-        self.end = mc.listRelatives(self.mid, c=True, type="joint")[0]
+        self.FindJntsFromRoot(mc.ls(sl=True, type="joint")[0])
+
+    def FindJntsFromRoot(self, root):
+        self.root, self.mid, self.end = self.GetChainJnts(root)
+
+    def GetChainJnts(self, root):
+        mid = mc.listRelatives(root, c=True, type="joint")[0]
+        return root, mid, mc.listRelatives(mid, c=True, type="joint")[0]
+
+    # the skeleton is split into runs of joints that each have a single joint child, from the root or a child of a
+    # branching joint down to the next branching joint or tip. a run that ends at a branch gives its last three joints,
+    # like shoulder-elbow-wrist without the clavicle, unless more branches follow below that branch, like a spine that
+    # ends at the chest. a run that ends at a tip gives its first three joints, like thigh-knee-ankle without the toes,
+    # or the finger joints. namePattern, if given, keeps only the chains with a joint whose name matches it. the chains
+    # are printed as root, mid, end, their roots are returned.
+    def FindLimbChains(self, skeletonRoot, namePattern = ""):
+        shortNames = dict(zip(mc.ls(type="joint", long=True), mc.ls(type="joint")))
+        rootLongName = mc.ls(skeletonRoot, long=True)[0]
+        jnts = [rootLongName] + (mc.listRelatives(skeletonRoot, ad=True, type="joint", fullPath=True) or [])
+
+        children = {jnt: [] for jnt in jnts}
+        for jnt in jnts[1:]:
+            children[jnt.rsplit("|", 1)[0]].append(jnt)
+
+        # joints with a branching joint below them, deepest joints first so children are done before their parents
+        hasBranchBelow = {}
+        for jnt in sorted(jnts, key=lambda jnt: -jnt.count("|")):
+            hasBranchBelow[jnt] = any(len(children[child]) > 1 or hasBranchBelow[child] for child in children[jnt])
+
+        chains = []
+        for jnt in jnts:
+            if jnt != rootLongName and len(children[jnt.rsplit("|", 1)[0]]) == 1:
+                continue
+
+            run = [jnt]
+            while len(children[run[-1]]) == 1:
+                run.append(children[run[-1]][0])
+            if len(run) < 3:
+                continue
+
+            if not children[run[-1]]:
+                chains.append(run[:3])
+            elif not hasBranchBelow[run[-1]]:
+                chains.append(run[-3:])
+
+        chains = [[shortNames[jnt] for jnt in chain] for chain in chains]
+        if namePattern:
+            chains = [chain for chain in chains if any(re.search(namePattern, jnt) for jnt in chain)]
+
+        print(f"found {len(chains)} limb chains under {skeletonRoot}:")
+        for chain in chains:
+            print("    " + " -> ".join(chain))
+        return [chain[0] for chain in chains]
+
+    # rigs every chain in one undo chunk with the viewport refresh suspended
+    def RigLimbs(self, roots):
+        startTime = time.perf_counter()
+        rigGrps = []
+        mc.undoInfo(openChunk=True, chunkName="RigLimbs")
+        mc.refresh(suspend=True)
+        try:
+            for root in roots:
+                self.FindJntsFromRoot(root)
+                rigGrps.append(self.RigLimb())
+        finally:
+            mc.refresh(suspend=False)
+            mc.undoInfo(closeChunk=True)
+
+        elapsedTime = time.perf_counter() - startTime
+        print(f"rigged {len(rigGrps)} limbs in {elapsedTime:.2f}s, {len(rigGrps) / elapsedTime:.2f} rigs/sec")
+        return rigGrps
 
     def CreateFKControlForJnt(self, jntName):
         ctrlName = "arc_fk_" + jntName
         ctrlGrpName = ctrlName + "_grp"
-        mc.circle(n=ctrlName, r=self.controllerSize, nr=(1,0,0))
-        self.ApplyControllerColor(ctrlName)
+        ctrlName = self.CreateControllerCurve(ctrlName, "circle", self.controllerSize)
         mc.group(ctrlName, n=ctrlGrpName)
         mc.matchTransform(ctrlGrpName, jntName)
         mc.orientConstraint(ctrlName,  jntName)
         return ctrlName, ctrlGrpName
 
+    # controls of the same shape and size within one rig share a single instanced shape node. the cache keeps the
+    # shape as ctrl|shape, the shape name alone becomes ambiguous once it is instanced.
+    def CreateControllerCurve(self, name, shapeName, scale):
+        shapeKey = (shapeName, scale)
+        if shapeKey in self.shapeCache:
+            name = mc.createNode("transform", n=name)
+            mc.parent(self.shapeCache[shapeKey], name, add=True, s=True)
+            return name
+
+        name = CreateShapeCurve(name, shapeName, scale)
+        self.shapeCache[shapeKey] = name + "|" + self.ApplyControllerColor(name)[0]
+        return name
+
     def CreateBoxController(self, name):
-        mel.eval(f"curve -n {name} -d 1 -p 0.5 0.5 0.5 -p 0.5 0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 0.5 0.5 -p 0.5 0.5 0.5 -p 0.5 -0.5 0.5 -p 0.5 -0.5 -0.5 -p 0.5 0.5 -0.5 -p 0.5 -0.5 -0.5 -p -0.5 -0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 -0.5 -0.5 -p -0.5 -0.5 0.5 -p -0.5 0.5 0.5 -p -0.5 -0.5 0.5 -p 0.5 -0.5 0.5 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 -k 13 -k 14 -k 15 ;")
-        mc.scale(self.controllerSize, self.controllerSize, self.controllerSize, name)
-        mc.makeIdentity(name, apply = True)
-        self.ApplyControllerColor(name)
+        name = self.CreateControllerCurve(name, "box", self.controllerSize)
         grpName = name + "_grp"
         mc.group(name, n=grpName)
         return name, grpName
     
     def CreatePlusController(self, name):
-        mel.eval(f"curve -n {name} -d 1 -p 0 0 0 -p 0 6 0 -p -6 6 0 -p -6 12 0 -p 0 12 0 -p 0 18 0 -p 6 18 0 -p 6 12 0 -p 12 12 0 -p 12 6 0 -p 6 6 0 -p 6 0 0 -p 0 0 0 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 ;")
-        mc.scale(self.controllerSize/8, self.controllerSize/8, self.controllerSize/8)
-        mc.makeIdentity(name, apply = True)
-        self.ApplyControllerColor(name)
+        name = self.CreateControllerCurve(name, "plus", self.controllerSize/8)
         grpName = name + "_grp"
         mc.group(name, n=grpName)
         return name, grpName
@@ -67,15 +146,17 @@ class LimbRigger:
     def ApplyControllerColor(self, ctrlName):
         shapes = mc.listRelatives(ctrlName, shapes=True, type="nurbsCurve")
         if not shapes:
-            return
+            return []
         
         for shape in shapes:
             mc.setAttr(f"{shape}.overrideEnabled", 1)
             mc.setAttr(f"{shape}.overrideRGBColors", 1)
             mc.setAttr(f"{shape}.overrideColorRGB", self.controllerColor[0], self.controllerColor[1], self.controllerColor[2])
+        return shapes
 
     def RigLimb(self):
         print(f"Start Rigging the limb with {self.root},{self.mid},{self.end}")
+        self.shapeCache = {}
         rootCtrl, rootCtrlName = self.CreateFKControlForJnt(self.root)
         midCtrl, midCtrlName = self.CreateFKControlForJnt(self.mid)
         endCtrl, endCtrlName = self.CreateFKControlForJnt(self.end)
@@ -121,17 +202,95 @@ class LimbRigger:
         mc.addAttr(ikfkBlendCtrlName, ln=ikfkBlendAttrName, min=0, max=1, k=True)
         ikfkBlendAttr = ikfkBlendCtrlName + "." + ikfkBlendAttrName
 
-        mc.expression(s=f"{ikHandleName}.ikBlend = {ikfkBlendAttr}")
-        mc.expression(s=f"{ikEndCtrlGrp}.v = {ikPoleVectorCtrlGrp}.v = {ikfkBlendAttr}")
-        mc.expression(s=f"{rootCtrlName}.v = 1 - {ikfkBlendAttr}")
-        mc.expression(s=f"{endOrientConstraint}.{endCtrl}W0 = 1-{ikfkBlendAttr}")
-        mc.expression(s=f"{endOrientConstraint}.{ikEndCtrl}W1 = 1-{ikfkBlendAttr}")
+        if self.useUtilityNodes:
+            ikfkReverse = mc.createNode("reverse", n="ikfk_reverse_" + self.root)
+            mc.connectAttr(ikfkBlendAttr, ikfkReverse + ".inputX")
+            mc.connectAttr(ikfkBlendAttr, ikHandleName + ".ikBlend")
+            mc.connectAttr(ikfkBlendAttr, ikEndCtrlGrp + ".v")
+            mc.connectAttr(ikfkBlendAttr, ikPoleVectorCtrlGrp + ".v")
+            mc.connectAttr(ikfkReverse + ".outputX", rootCtrlName + ".v")
+            mc.connectAttr(ikfkReverse + ".outputX", f"{endOrientConstraint}.{endCtrl}W0")
+            mc.connectAttr(ikfkBlendAttr, f"{endOrientConstraint}.{ikEndCtrl}W1")
+        else:
+            mc.expression(s=f"{ikHandleName}.ikBlend = {ikfkBlendAttr}")
+            mc.expression(s=f"{ikEndCtrlGrp}.v = {ikPoleVectorCtrlGrp}.v = {ikfkBlendAttr}")
+            mc.expression(s=f"{rootCtrlName}.v = 1 - {ikfkBlendAttr}")
+            mc.expression(s=f"{endOrientConstraint}.{endCtrl}W0 = 1-{ikfkBlendAttr}")
+            mc.expression(s=f"{endOrientConstraint}.{ikEndCtrl}W1 = {ikfkBlendAttr}")
 
         mc.parent(ikHandleName, ikEndCtrl)
         mc.setAttr(ikHandleName+".v", 0)
 
         topGrpName = self.root + "_rig_grp"
         mc.group([rootCtrlName, ikEndCtrlGrp, ikPoleVectorCtrlGrp, ikfkBlendGrp], n= topGrpName)
+        self.RecordRigShapes(topGrpName)
+        return topGrpName
+
+    # stores the size the rig was built with and its unique control shapes on the rig group, so RestyleRigs can
+    # update the rig later without rebuilding it
+    def RecordRigShapes(self, rigGrp):
+        mc.addAttr(rigGrp, ln="controllerSize", at="double", dv=self.controllerSize)
+        mc.addAttr(rigGrp, ln="ctrlShapes", dt="string")
+        mc.setAttr(rigGrp + ".ctrlShapes", " ".join(self.shapeCache.values()), type="string")
+
+    # rig groups of the selected objects, a control selects the rig it belongs to
+    def GetSelectedRigGrps(self):
+        rigGrps = []
+        for obj in mc.ls(sl=True, long=True):
+            parts = obj.split("|")
+            for i in range(len(parts), 0, -1):
+                rigGrp = "|".join(parts[:i])
+                if parts[i - 1].endswith("_rig_grp") and mc.attributeQuery("ctrlShapes", node=rigGrp, exists=True):
+                    if rigGrp not in rigGrps:
+                        rigGrps.append(rigGrp)
+                    break
+        return rigGrps
+
+    # rescales and/or recolors every control of the given rigs in place. instanced controls share one shape, so
+    # each shape is touched once: its cvs are scaled around the pivot of the control it was created under, and it
+    # gets the override color with a single setAttr, the override flags were already set when it was built.
+    def RestyleRigs(self, rigGrps, resize = True, recolor = True):
+        mc.undoInfo(openChunk=True, chunkName="RestyleRigs")
+        try:
+            for rigGrp in rigGrps:
+                scale = self.controllerSize / mc.getAttr(rigGrp + ".controllerSize")
+                for ctrlShape in mc.getAttr(rigGrp + ".ctrlShapes").split():
+                    ctrl = ctrlShape.split("|")[0]
+                    if resize and scale != 1:
+                        pivot = mc.xform(ctrl, q=True, ws=True, rp=True)
+                        mc.scale(scale, scale, scale, ctrl + ".cv[*]", r=True, p=pivot)
+                    if recolor:
+                        mc.setAttr(ctrlShape + ".overrideColorRGB", *self.controllerColor)
+
+                if resize:
+                    mc.setAttr(rigGrp + ".controllerSize", self.controllerSize)
+        finally:
+            mc.undoInfo(closeChunk=True)
+
+    # rigs the chains once with expressions and once with utility nodes, animates the ik/fk blend over the frame
+    # range and plays it back. both rigs are undone afterwards.
+    def BenchmarkIKFKBlend(self, roots, frameCount = 200):
+        useUtilityNodes = self.useUtilityNodes
+        playbackFps = {}
+        try:
+            for useNodes in (False, True):
+                self.useUtilityNodes = useNodes
+                mc.undoInfo(openChunk=True, chunkName="BenchmarkIKFKBlend")
+                try:
+                    self.RigLimbs(roots)
+                    for root in roots:
+                        blendAttr = "ac_ikfk_blend_" + root + ".ikfkBlend"
+                        mc.setKeyframe(blendAttr, t=0, v=0)
+                        mc.setKeyframe(blendAttr, t=frameCount, v=1)
+                    playbackFps[useNodes] = MeasurePlaybackFps(0, frameCount)
+                finally:
+                    mc.undoInfo(closeChunk=True)
+                    mc.undo()
+        finally:
+            self.useUtilityNodes = useUtilityNodes
+
+        print(f"{len(roots)} limbs, expressions: {playbackFps[False]:.1f} fps, utility nodes: {playbackFps[True]:.1f} fps")
+        return playbackFps
 
 class ColorPicker(QWidget):
     def __init__(self):
@@ -169,12 +328,13 @@ class LimbRigToolWidget(QMayaWindow):
 
         ctrlSliderLayout = QHBoxLayout()
 
-        ctrlSizeSlider = QSlider()
-        ctrlSizeSlider.setValue(self.rigger.controllerSize)
-        ctrlSizeSlider.valueChanged.connect(self.CtrlSizeValueChanged)
-        ctrlSizeSlider.setRange(1,30)
-        ctrlSizeSlider.setOrientation(Qt.Horizontal)
-        ctrlSliderLayout.addWidget(ctrlSizeSlider)
+        self.ctrlSizeSlider = QSlider()
+        self.ctrlSizeSlider.setValue(self.rigger.controllerSize)
+        self.ctrlSizeSlider.valueChanged.connect(self.CtrlSizeValueChanged)
+        self.ctrlSizeSlider.sliderReleased.connect(self.CtrlSizeSliderReleased)
+        self.ctrlSizeSlider.setRange(1,30)
+        self.ctrlSizeSlider.setOrientation(Qt.Horizontal)
+        ctrlSliderLayout.addWidget(self.ctrlSizeSlider)
         self.ctrlSizeLabel = QLabel(f"{self.rigger.controllerSize}")
         self.masterLayout.addWidget(self.ctrlSizeLabel)
 
@@ -183,6 +343,11 @@ class LimbRigToolWidget(QMayaWindow):
         self.colorPicker = ColorPicker()
         self.masterLayout.addWidget(self.colorPicker)
 
+        self.useUtilityNodesCheckBox = QCheckBox("Use Utility Nodes For IK/FK Blend")
+        self.useUtilityNodesCheckBox.setChecked(self.rigger.useUtilityNodes)
+        self.useUtilityNodesCheckBox.toggled.connect(self.UseUtilityNodesToggled)
+        self.masterLayout.addWidget(self.useUtilityNodesCheckBox)
+
         self.setColorBtn = QPushButton("Set Ctrl Color")
         self.masterLayout.addWidget(self.setColorBtn)
         self.setColorBtn.clicked.connect(self.SetColorBtnClicked)
@@ -192,22 +357,88 @@ class LimbRigToolWidget(QMayaWindow):
         self.masterLayout.addWidget(self.rigLimbBtn)
         self.rigLimbBtn.clicked.connect(self.RigLimbBtnClicked)
 
+        self.rigSelectedLimbsBtn = QPushButton("Rig Selected Limbs")
+        self.masterLayout.addWidget(self.rigSelectedLimbsBtn)
+        self.rigSelectedLimbsBtn.clicked.connect(self.RigSelectedLimbsBtnClicked)
+
+        limbNameFilterLayout = QHBoxLayout()
+        self.masterLayout.addLayout(limbNameFilterLayout)
+        limbNameFilterLayout.addWidget(QLabel("Limb Name Filter: "))
+        self.limbNameFilterLineEdit = QLineEdit()
+        self.limbNameFilterLineEdit.setPlaceholderText("regex, e.g. arm|leg|finger")
+        limbNameFilterLayout.addWidget(self.limbNameFilterLineEdit)
+
+        self.rigAllLimbsBtn = QPushButton("Rig All Limbs Under Selected Root")
+        self.masterLayout.addWidget(self.rigAllLimbsBtn)
+        self.rigAllLimbsBtn.clicked.connect(self.RigAllLimbsBtnClicked)
+
         self.setWindowTitle("Limb Rigging Tool")
+
+    def GetWindowHash(self):
+        return "7c1d9e04a6b35f28e9d0c4b1f6a7e352"
     
+    # while the slider is dragged only the label follows it, the selected rigs are restyled once it is released so
+    # a drag is one undo step. clicks and key presses on the slider restyle right away.
     def CtrlSizeValueChanged(self, newValue):
         self.rigger.controllerSize = newValue
+        self.ctrlSizeLabel.setText(f"{newValue}")
+        if not self.ctrlSizeSlider.isSliderDown():
+            self.RestyleSelectedRigSizes()
+
+    def CtrlSizeSliderReleased(self):
+        self.RestyleSelectedRigSizes()
+
+    def RestyleSelectedRigSizes(self):
+        self.rigger.RestyleRigs(self.rigger.GetSelectedRigGrps(), recolor=False)
     
+    def UseUtilityNodesToggled(self, checked):
+        self.rigger.useUtilityNodes = checked
+
     def RigLimbBtnClicked(self):
         color = self.colorPicker.color
         self.rigger.controllerColor = (color.redF(), color.greenF(), color.blueF())
         self.rigger.RigLimb()
 
+    def RigSelectedLimbsBtnClicked(self):
+        roots = mc.ls(sl=True, type="joint")
+        if not roots:
+            QMessageBox.critical(self, "Error", "Please select the first joint of every limb to rig!")
+            return
+
+        color = self.colorPicker.color
+        self.rigger.controllerColor = (color.redF(), color.greenF(), color.blueF())
+        self.rigger.RigLimbs(roots)
+
+    def RigAllLimbsBtnClicked(self):
+        roots = mc.ls(sl=True, type="joint")
+        if not roots:
+            QMessageBox.critical(self, "Error", "Please select the root joint of the skeleton!")
+            return
+
+        chainRoots = self.rigger.FindLimbChains(roots[0], self.limbNameFilterLineEdit.text())
+        if not chainRoots:
+            QMessageBox.critical(self, "Error", "Found no limb chains under the selected root!")
+            return
+
+        chainNames = "\n".join(f"{root} -> {mid} -> {end}" for root, mid, end in (self.rigger.GetChainJnts(root) for root in chainRoots))
+        if QMessageBox.question(self, "Rig Limbs", f"Rig these {len(chainRoots)} limbs?\n{chainNames}") != QMessageBox.Yes:
+            return
+
+        color = self.colorPicker.color
+        self.rigger.controllerColor = (color.redF(), color.greenF(), color.blueF())
+        self.rigger.RigLimbs(chainRoots)
+
     def SetColorBtnClicked(self):
         print("Set Color Button Clicked!")
         color = self.colorPicker.color
         self.rigger.controllerColor = (color.redF(), color.greenF(), color.blueF())
-        ctrl = mc.ls(sl=True)
-        self.rigger.ApplyControllerColor(ctrl[0])
+        rigGrps = self.rigger.GetSelectedRigGrps()
+        if rigGrps:
+            self.rigger.RestyleRigs(rigGrps, resize=False)
+            return
+
+        for ctrl in mc.ls(sl=True):
+            self.rigger.ApplyControllerColor(ctrl)
 
     def AutoFindBtnClicked(self):
         try:
@@ -215,6 +446,3 @@ class LimbRigToolWidget(QMayaWindow):
             self.jointSelectionText.setText(f"{self.rigger.root} {self.rigger.mid} {self.rigger.end}")
         except Exception as e:
             QMessageBox.critical(self, "Error", "Wrong Slection, please select the first joint of the limb!")
-
-limbRigToolWidget = LimbRigToolWidget()
-limbRigToolWidget.show()
\ No newline at end of file
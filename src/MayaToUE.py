@@ -5,10 +5,34 @@ from PySide2.QtWidgets import (QVBoxLayout,
                                QPushButton,
                                QMessageBox,
                                QListWidget,
-                               QLabel,)
-from PySide2.QtGui import QIntValidator, QRegExpValidator
+                               QLabel,
+                               QFileDialog,
+                               QTableView,
+                               QAbstractItemView,
+                               QHeaderView,
+                               QStyledItemDelegate,)
+from PySide2.QtGui import QIntValidator, QDoubleValidator, QRegExpValidator
+from PySide2.QtCore import Qt, QAbstractTableModel, QModelIndex
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import numpy as np
 from MayaUtils import *
 import maya.cmds as mc
+import maya.mel as mel
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+from JointSamples import JointSampleCache, GetSkeletonJnts, GetChannelPlugs
+from KeyReduction import ReduceKeys, GetChannelTolerances, MergeKeptKeys
+from MeshData import MayaMeshData
+from ProxyPartition import HashArrays
+from Pipeline import Pipeline, RunPipeline, UndoChunks
+from SkinSnapshot import SaveMeshSkinSnapshot, RestoreMeshSkinSnapshot
+from SkinValidation import SkinIssues, FixSkinWeights
 
 def TryAction(action):
     def wrapper(*args, **kwargs):
@@ -18,22 +42,99 @@ def TryAction(action):
             QMessageBox().critical(None, "Error", f"{e}")
     return wrapper
 
+# sorts and merges overlapping or touching frame ranges
+def MergeFrameRanges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(frameRange) for frameRange in merged]
+
+# the frame range defaults to the playback range
 class AnimClip:
-    def __init__(self):
-        self.subfix = ""
-        self.frameMin = mc.playbackOptions(q=True, min=True)
-        self.frameMax = mc.playbackOptions(q=True, max=True)
-        self.shouldExport = True
+    def __init__(self, subfix = "", frameMin = None, frameMax = None, shouldExport = True):
+        self.subfix = subfix
+        self.frameMin = mc.playbackOptions(q=True, min=True) if frameMin is None else frameMin
+        self.frameMax = mc.playbackOptions(q=True, max=True) if frameMax is None else frameMax
+        self.shouldExport = shouldExport
+
+SubfixPattern = "[a-zA-Z0-9_]+"
+
+# clip ranges from a csv file with a header row or a json list of objects, both with the keys subfix, frameMin,
+# frameMax and optionally shouldExport, like the clips of a batch export job
+def ReadAnimClipData(path):
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path) as clipFile:
+            return json.load(clipFile)
+
+    with open(path, newline="") as clipFile:
+        clipDatas = []
+        for row in csv.DictReader(clipFile):
+            clipData = {"subfix": row["subfix"].strip(), "frameMin": int(row["frameMin"]), "frameMax": int(row["frameMax"])}
+            if row.get("shouldExport"):
+                clipData["shouldExport"] = row["shouldExport"].strip().lower() in ("1", "true", "yes")
+            clipDatas.append(clipData)
+        return clipDatas
 
 class MayaToUE:
     def __init__(self):
         self.rootJnt = ""
         self.meshes = []
         self.animationClips : list[AnimClip] = []
+        self.fileName = ""
+        self.saveDir = ""
+        self.sampleCache = JointSampleCache()
+        self.reduceKeys = False
+        # with reduceKeys, every clip is also exported unreduced to a temporary file first and its size and export
+        # time are reported next to the reduced ones
+        self.compareUnreduced = False
+        self.skipUnchanged = True
+        # what the last export wrote and what it skipped as unchanged, filled in by the export stages
+        self.exportCounts = {"exported": {"skeletalMeshes": 0, "clips": 0}, "skipped": {"skeletalMeshes": 0, "clips": 0}}
+        self.meshData = MayaMeshData()
+        self.translateTolerance = 0.01
+        self.rotateTolerance = 0.05
+        self.scaleTolerance = 0.001
+        self.maxInfluences = 8
     
     def AddNewAnimEntry(self):
         self.animationClips.append(AnimClip())
         return self.animationClips[-1]
+
+    # a clip with the subfix of an existing one updates its range, the others are appended. every clip is checked
+    # before any is changed. returns the appended clips.
+    def AddAnimClips(self, clipDatas):
+        for i, clipData in enumerate(clipDatas):
+            if not re.fullmatch(SubfixPattern, str(clipData.get("subfix", ""))):
+                raise Exception(f"clip {i + 1} has no valid subfix, use letters, digits and underscores!")
+            if clipData["frameMin"] > clipData["frameMax"]:
+                raise Exception(f"clip {clipData['subfix']} starts at {clipData['frameMin']} after it ends at {clipData['frameMax']}!")
+
+        clipsBySubfix = {clip.subfix: clip for clip in self.animationClips}
+        newClips = []
+        for clipData in clipDatas:
+            clip = clipsBySubfix.get(clipData["subfix"])
+            if not clip:
+                clip = AnimClip(clipData["subfix"], clipData["frameMin"], clipData["frameMax"])
+                clipsBySubfix[clip.subfix] = clip
+                newClips.append(clip)
+            clip.frameMin = clipData["frameMin"]
+            clip.frameMax = clipData["frameMax"]
+            clip.shouldExport = clipData.get("shouldExport", True)
+
+        self.animationClips += newClips
+        return newClips
+
+    def ImportAnimClips(self, path):
+        clipDatas = ReadAnimClipData(path)
+        newClips = self.AddAnimClips(clipDatas)
+        print(f"imported {len(clipDatas)} clips from {path}, {len(newClips)} new, {len(clipDatas) - len(newClips)} updated")
+        return newClips
+
+    def RemoveAnimClips(self, start, end):
+        del self.animationClips[start:end + 1]
     
     def SetSelectedAsRootJnt(self):
         selection = mc.ls(sl=True)
@@ -67,78 +168,391 @@ class MayaToUE:
         
         meshes = set()
 
-        for sel in selection:
-            if IsMesh(sel):
-                meshes.add(sel)
+        with SceneIndexScope():
+            for sel in selection:
+                if IsMesh(sel):
+                    meshes.add(sel)
         
         if len(meshes) == 0:
             raise Exception("No mesh selected!")
         
         self.meshes = list(meshes)
 
-class AnimClipEntryWidget(QWidget):
-    def __init__(self, animClip: AnimClip):
+    def GetExportClips(self):
+        return [clip for clip in self.animationClips if clip.shouldExport]
+
+    def GetBakeRanges(self):
+        return MergeFrameRanges([(clip.frameMin, clip.frameMax) for clip in self.GetExportClips()])
+
+    # returns the joints and the frame x joint x channel samples of the clip, sliced from its bake range's samples
+    def GetClipSamples(self, clip: AnimClip):
+        for start, end in self.GetBakeRanges():
+            if start <= clip.frameMin and clip.frameMax <= end:
+                jnts, samples = self.sampleCache.GetSamples(self.rootJnt, start, end)
+                return jnts, samples[int(clip.frameMin - start):int(clip.frameMax - start) + 1]
+
+        raise Exception(f"Clip {clip.subfix} is not set to export!")
+
+    def GetSkeletalMeshSavePath(self):
+        return os.path.join(self.saveDir, self.fileName + ".fbx").replace("\\", "/")
+
+    def GetAnimClipSavePath(self, clip: AnimClip):
+        return os.path.join(self.saveDir, "anim", self.fileName + "_" + clip.subfix + ".fbx").replace("\\", "/")
+
+    def SaveFiles(self):
+        self.CreateExportPipeline().Run()
+
+    # the mesh is exported in one stage and the clips one at a time in the next. the bake undoes itself when the
+    # export ends or is cancelled, so the pipeline needs no undo chunk of its own. a cancelled export leaves the
+    # manifest as it was for the clips, they are exported again next time.
+    def CreateExportPipeline(self):
+        pipeline = Pipeline(f"Export {self.fileName}", undoable=False)
+        pipeline.AddStage("Exporting skeletal mesh", self.SaveSkeletalMesh)
+        pipeline.AddStage("Exporting animations", self.SaveAnimations, weight=max(1, len(self.GetExportClips())))
+        return pipeline
+
+    def SaveSkeletalMesh(self):
+        if not self.fileName or not self.saveDir:
+            raise Exception("Please set the save directory and the file name before exporting!")
+
+        mc.loadPlugin("fbxmaya", quiet=True)
+        os.makedirs(os.path.join(self.saveDir, "anim"), exist_ok=True)
+
+        manifest = self.ReadExportManifest()
+        meshHashes = {mesh: self.GetMeshHash(mesh) for mesh in self.meshes}
+        self.exportCounts = {"exported": {"skeletalMeshes": 0, "clips": 0}, "skipped": {"skeletalMeshes": 0, "clips": 0}}
+        if self.skipUnchanged and manifest["meshes"] == meshHashes and os.path.exists(self.GetSkeletalMeshSavePath()):
+            print(f"skipped skeletal mesh {self.fileName}, unchanged since the last export")
+            self.exportCounts["skipped"]["skeletalMeshes"] = 1
+        else:
+            self.ExportSkeletalMeshWithFixedSkins()
+            self.exportCounts["exported"]["skeletalMeshes"] = 1
+        manifest["meshes"] = meshHashes
+        self.WriteExportManifest(manifest)
+
+    def SaveAnimations(self):
+        self.sampleCache.BeginExportPass()
+        manifest = self.ReadExportManifest()
+        clipHashes = {clip.subfix: self.GetClipHash(clip) for clip in self.GetExportClips()}
+        dirtyClips = []
+        for clip in self.GetExportClips():
+            if self.skipUnchanged and manifest["clips"].get(clip.subfix) == clipHashes[clip.subfix] and os.path.exists(self.GetAnimClipSavePath(clip)):
+                print(f"skipped clip {clip.subfix}, unchanged since the last export")
+                continue
+            dirtyClips.append(clip)
+
+        yield from self.ExportAnimations(dirtyClips)
+        self.exportCounts["exported"]["clips"] = len(dirtyClips)
+        self.exportCounts["skipped"]["clips"] = len(clipHashes) - len(dirtyClips)
+        manifest["clips"].update(clipHashes)
+        self.WriteExportManifest(manifest)
+
+    # checks the skin of every mesh against what unreal imports, and returns (skin, weights, fixed weights) for every
+    # skin with offending vertices. the scene is not changed.
+    def GetSkinFixes(self):
+        if (not self.rootJnt) or (not self.meshes):
+            raise Exception("Please set the root joint and add the meshes before exporting!")
+
+        exportedJnts = set(mc.ls(GetSkeletonJnts(self.rootJnt), l=True))
+        fixes = []
+        for mesh in self.meshes:
+            meshShape = mc.listRelatives(mesh, s=True)[0]
+            skin = GetAllConnectIn(meshShape, GetUpperStream, 10, IsSkin, stopAtFirst=True)
+            if not skin:
+                continue
+
+            influences = self.meshData.GetSkinInfluences(skin[0])
+            weights = self.meshData.GetSkinWeights(skin[0])
+            exported = np.array([influence in exportedJnts for influence in mc.ls(influences, l=True)], dtype=bool)
+            issues = SkinIssues(weights, exported, self.maxInfluences)
+            self.ReportSkinIssues(mesh, influences, issues)
+
+            verts, vertWeights = FixSkinWeights(weights, exported, self.maxInfluences, issues)
+            if not len(verts):
+                continue
+
+            unfixable = verts[vertWeights.sum(axis=1) == 0]
+            if len(unfixable):
+                raise Exception(f"{len(unfixable)} vertices of {mesh} have no weight on joints under {self.rootJnt}, like {mesh}.vtx[{unfixable[0]}]!")
+
+            fixedWeights = np.array(weights)
+            fixedWeights[verts] = vertWeights
+            fixes.append((skin[0], weights, fixedWeights))
+            print(f"fixing the weights of {len(verts)} vertices of {mesh} for the export")
+        return fixes
+
+    # the fixed weights are written for the export only, with one bulk write per skin. the weights of the scene are
+    # written back the same way afterwards, also when the export fails, so the scene keeps its weights exactly.
+    def ExportSkeletalMeshWithFixedSkins(self):
+        fixes = self.GetSkinFixes()
+        try:
+            for skin, weights, fixedWeights in fixes:
+                self.meshData.SetSkinWeights(skin, fixedWeights)
+            self.ExportSkeletalMesh()
+        finally:
+            for skin, weights, fixedWeights in fixes:
+                self.meshData.SetSkinWeights(skin, weights)
+
+    def ReportSkinIssues(self, mesh, influences, issues: SkinIssues):
+        print(f"{mesh}: {np.count_nonzero(issues.overInfluenced)} vertices over {self.maxInfluences} influences, {np.count_nonzero(issues.unnormalized)} unnormalized, {np.count_nonzero(issues.negativeWeighted)} with negative weights, {np.count_nonzero(issues.outsideWeighted)} weighted to joints outside {self.rootJnt}")
+        if len(issues.zeroInfluences):
+            print(f"{mesh} has influences with no weight: {[influences[i] for i in issues.zeroInfluences.tolist()]}")
+        if len(issues.outsideInfluences):
+            print(f"{mesh} has influences outside {self.rootJnt}: {[influences[i] for i in issues.outsideInfluences.tolist()]}")
+
+    # a weight snapshot of every mesh next to the export, to go back to the exported weights after editing them
+    def GetSkinSnapshotPath(self, mesh):
+        return os.path.join(self.saveDir, f"{self.fileName}_{mesh}.skinsnap")
+
+    def SaveSkinSnapshots(self):
+        if not self.fileName or not self.saveDir:
+            raise Exception("Please set the save directory and the file name before saving skin weights!")
+
+        os.makedirs(self.saveDir, exist_ok=True)
+        for mesh in self.meshes:
+            SaveMeshSkinSnapshot(self.meshData, mesh, self.GetSkinSnapshotPath(mesh))
+            print(f"saved skin weights of {mesh} to {self.GetSkinSnapshotPath(mesh)}")
+
+    def RestoreSkinSnapshots(self):
+        for mesh in self.meshes:
+            RestoreMeshSkinSnapshot(self.meshData, mesh, self.GetSkinSnapshotPath(mesh))
+            print(f"restored skin weights of {mesh} from {self.GetSkinSnapshotPath(mesh)}")
+
+    # the manifest records a hash of the source data and export settings of every exported mesh and clip, assets
+    # whose hash has not changed since the last export are skipped.
+    def GetExportManifestPath(self):
+        return os.path.join(self.saveDir, self.fileName + "_export_manifest.json")
+
+    def ReadExportManifest(self):
+        manifest = {"meshes": {}, "clips": {}}
+        if os.path.exists(self.GetExportManifestPath()):
+            with open(self.GetExportManifestPath()) as manifestFile:
+                manifest.update(json.load(manifestFile))
+        return manifest
+
+    def WriteExportManifest(self, manifest):
+        with open(self.GetExportManifestPath(), "w") as manifestFile:
+            json.dump(manifest, manifestFile, indent=4)
+
+    def GetMeshHash(self, mesh):
+        settings = [mesh, self.rootJnt, self.GetSkeletalMeshSavePath(), self.maxInfluences]
+        faceCounts, faceVerts = self.meshData.GetMeshFaces(mesh)
+        sourceData = [faceCounts, faceVerts, self.meshData.GetMeshPoints(mesh)]
+
+        meshShape = mc.listRelatives(mesh, s=True)[0]
+        skin = GetAllConnectIn(meshShape, GetUpperStream, 10, IsSkin, stopAtFirst=True)
+        if skin:
+            settings += self.meshData.GetSkinInfluences(skin[0])
+            sourceData.append(self.meshData.GetSkinWeights(skin[0]))
+
+        return HashArrays(np.frombuffer(json.dumps(settings).encode(), dtype=np.uint8), *sourceData)
+
+    def GetClipHash(self, clip: AnimClip):
+        jnts, samples = self.GetClipSamples(clip)
+        settings = [clip.subfix, clip.frameMin, clip.frameMax, jnts, self.GetAnimClipSavePath(clip)]
+        if self.reduceKeys:
+            settings += [self.translateTolerance, self.rotateTolerance, self.scaleTolerance]
+        return HashArrays(np.frombuffer(json.dumps(settings).encode(), dtype=np.uint8), samples)
+
+    def ExportSkeletalMesh(self):
+        if (not self.rootJnt) or (not self.meshes):
+            raise Exception("Please set the root joint and add the meshes before exporting!")
+
+        mc.select([self.rootJnt] + self.meshes, r=True)
+        mel.eval("FBXExportBakeComplexAnimation -v false")
+        mel.eval("FBXExportSplitAnimationIntoTakes -c")
+        mel.eval(f"FBXExport -f \"{self.GetSkeletalMeshSavePath()}\" -s")
+
+    # the skeleton is baked once over the union of the enabled clip ranges, every clip is then exported as a take
+    # sliced out of that bake. the bake is recorded in an undo chunk that is closed before the first clip, so no
+    # chunk stays open while the pipeline yields, and only that chunk is undone once all clips are written.
+    # yields the fraction of clips exported after each one
+    def ExportAnimations(self, clips):
+        if not clips:
+            return
+
+        jnts = GetSkeletonJnts(self.rootJnt)
+        bakeRanges = [(start, end) for start, end in self.GetBakeRanges() if any(start <= clip.frameMin and clip.frameMax <= end for clip in clips)]
+        sampledRanges = [(start, end) + self.sampleCache.GetSamples(self.rootJnt, start, end) for start, end in bakeRanges] if self.reduceKeys else []
+        curveChange = oma.MAnimCurveChange()
+        bakeChunks = UndoChunks("MayaToUEBake")
+
+        try:
+            bakeChunks.Open()
+            for start, end in bakeRanges:
+                mc.bakeResults(jnts, t=(start, end), simulation=True, preserveOutsideKeys=True)
+            mc.select(self.rootJnt, r=True)
+            bakeChunks.Close()
+
+            mel.eval("FBXExportBakeComplexAnimation -v false")
+            mel.eval("FBXExportDeleteOriginalTakeOnSplitAnimation -v true")
+            unreducedStats = self.ExportUnreducedClips(clips) if self.reduceKeys and self.compareUnreduced else {}
+            reductionStats = self.ReduceBakedKeys(sampledRanges, clips, curveChange)
+
+            for i, clip in enumerate(clips):
+                fileSize, exportTime = self.ExportClipTake(clip, self.GetAnimClipSavePath(clip))
+                report = f"exported clip {clip.subfix}: {fileSize:.1f}KB in {exportTime:.2f}s"
+                if clip in reductionStats:
+                    keyCount, keptCount, reduceTime = reductionStats[clip]
+                    report += f", keys {keyCount} -> {keptCount} ({100 * (1 - keptCount / keyCount):.1f}% fewer) reduced in {reduceTime:.2f}s"
+                if clip in unreducedStats:
+                    unreducedSize, unreducedTime = unreducedStats[clip]
+                    report += f", unreduced {unreducedSize:.1f}KB in {unreducedTime:.2f}s ({100 * (1 - fileSize / unreducedSize):.1f}% smaller)"
+                print(report)
+                yield (i + 1) / len(clips)
+        finally:
+            curveChange.undoIt()
+            bakeChunks.Undo()
+
+    # exports the baked range of the clip as one take, returns the file size in KB and the export time
+    def ExportClipTake(self, clip: AnimClip, path):
+        exportStartTime = time.perf_counter()
+        mel.eval("FBXExportSplitAnimationIntoTakes -c")
+        mel.eval(f"FBXExportSplitAnimationIntoTakes -v \"{self.fileName}_{clip.subfix}\" {clip.frameMin} {clip.frameMax}")
+        mel.eval(f"FBXExport -f \"{path}\" -s")
+        exportTime = time.perf_counter() - exportStartTime
+        return os.path.getsize(path) / 1024, exportTime
+
+    # exports the clips from the full bake to a temporary folder that is deleted again, returns the file size and
+    # export time of every clip
+    def ExportUnreducedClips(self, clips):
+        unreducedDir = tempfile.mkdtemp()
+        try:
+            return {clip: self.ExportClipTake(clip, os.path.join(unreducedDir, clip.subfix + ".fbx").replace("\\", "/")) for clip in clips}
+        finally:
+            shutil.rmtree(unreducedDir, ignore_errors=True)
+
+    # replaces the baked keys with the smallest set of linear keys that stays within the channel tolerances of the
+    # sampled values. clip boundaries are always kept so every sliced take starts and ends on a key. the kept keys of
+    # all bake ranges are written together, writing a curve replaces all of its keys.
+    def ReduceBakedKeys(self, sampledRanges, clips, curveChange):
+        reductionStats = {}
+        reducedRanges = []
+        for start, end, jnts, samples in sampledRanges:
+            values = np.asarray(samples).reshape(len(samples), -1)
+            rangeClips = [clip for clip in clips if start <= clip.frameMin and clip.frameMax <= end]
+            clipBounds = {int(frame - start) for clip in rangeClips for frame in (clip.frameMin, clip.frameMax)}
+
+            reduceStartTime = time.perf_counter()
+            tolerances = GetChannelTolerances(len(jnts), self.translateTolerance, self.rotateTolerance, self.scaleTolerance)
+            keep = ReduceKeys(values, tolerances, sorted(clipBounds))
+            reducedRanges.append((start, values, keep))
+            reduceTime = time.perf_counter() - reduceStartTime
+
+            for clip in rangeClips:
+                clipKeep = keep[int(clip.frameMin - start):int(clip.frameMax - start) + 1]
+                reductionStats[clip] = (clipKeep.size, int(clipKeep.sum()), reduceTime * clipKeep.shape[0] / keep.shape[0])
+
+        if reducedRanges:
+            self.WriteReducedKeys(sampledRanges[0][2], MergeKeptKeys(reducedRanges), curveChange)
+        return reductionStats
+
+    def WriteReducedKeys(self, jnts, curveKeys, curveChange):
+        timeUnit = om.MTime.uiUnit()
+        for plug, (frames, values) in zip(GetChannelPlugs(jnts), curveKeys):
+            animCurves = oma.MAnimUtil.findAnimation(plug)
+            if len(animCurves) == 0:
+                continue
+
+            times = [om.MTime(frame, timeUnit) for frame in frames.tolist()]
+            curveFn = oma.MFnAnimCurve(animCurves[0])
+            curveFn.addKeys(times, values.tolist(), oma.MFnAnimCurve.kTangentLinear, oma.MFnAnimCurve.kTangentLinear, False, curveChange)
+
+# the clips of a MayaToUE, one row per clip of animationClips. the view paints only the visible rows and creates an
+# editor only for the cell being edited, so adding, removing or editing a clip costs the same at any clip count.
+class AnimClipTableModel(QAbstractTableModel):
+    Columns = ("Export", "Subfix", "Min", "Max")
+    Attrs = ("shouldExport", "subfix", "frameMin", "frameMax")
+
+    def __init__(self, mayaToUE: MayaToUE):
         super().__init__()
-        self.animClip = animClip
-        self.masterLayout = QHBoxLayout()
-        self.setLayout(self.masterLayout)
+        self.mayaToUE = mayaToUE
 
-        shouldExportCheckBox = QCheckBox()
-        shouldExportCheckBox.setChecked(self.animClip.shouldExport)
-        self.masterLayout.addWidget(shouldExportCheckBox)
-        shouldExportCheckBox.toggled.connect(self.ShouldExportCheckBoxToggled)
-
-        self.masterLayout.addWidget(QLabel("Subfix: "))
-
-        subfixLineEdit = QLineEdit()
-        subfixLineEdit.setValidator(QRegExpValidator("[a-zA-Z0-9_]+"))
-        subfixLineEdit.setText(self.animClip.subfix)
-        subfixLineEdit.textChanged.connect(self.SubfixTextChanged)
-        self.masterLayout.addWidget(subfixLineEdit)
-
-        self.masterLayout.addWidget(QLabel("Min: "))
-        minFrameLineEdit = QLineEdit()
-        minFrameLineEdit.setValidator(QIntValidator())
-        minFrameLineEdit.setText(str(int(self.animClip.frameMin)))
-        minFrameLineEdit.textChanged.connect(self.MinFrameChanged)
-        self.masterLayout.addWidget(minFrameLineEdit)
-
-        self.masterLayout.addWidget(QLabel("Max: "))
-        maxFrameLineEdit = QLineEdit()
-        maxFrameLineEdit.setValidator(QIntValidator())
-        maxFrameLineEdit.setText(str(int(self.animClip.frameMax)))
-        maxFrameLineEdit.textChanged.connect(self.MaxFrameChanged)
-        self.masterLayout.addWidget(maxFrameLineEdit)
-
-        setRangeBtn = QPushButton("[-]")
-        setRangeBtn.clicked.connect(self.SetRangeBtnClicked)
-        self.masterLayout.addWidget(setRangeBtn)
+    def rowCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.mayaToUE.animationClips)
 
-        deleteBtn = QPushButton("X")
-        deleteBtn.clicked.connect(self.DeleteButtonClicked)
-        self.masterLayout.addWidget(deleteBtn)
+    def columnCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.Columns)
 
-    def DeleteButtonClicked(self):
-        self.deleteLater()
+    def headerData(self, section, orientation, role = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.Columns[section]
+        return super().headerData(section, orientation, role)
 
-    def SetRangeBtnClicked(self):
-        mc.playbackOptions(e=True, min=self.animClip.frameMin, max=self.animClip.frameMax)
-        mc.playbackOptions(e=True, ast=self.animClip.frameMin, aet=self.animClip.frameMax)
+    def flags(self, index):
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
 
-    def MaxFrameChanged(self, newVal):
-        self.animClip.frameMax = int(newVal)
+    def data(self, index, role = Qt.DisplayRole):
+        clip = self.GetClip(index.row())
+        if index.column() == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if clip.shouldExport else Qt.Unchecked
+            return None
 
-    def MinFrameChanged(self, newVal):
-        self.animClip.frameMin = int(newVal)
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            value = getattr(clip, self.Attrs[index.column()])
+            return value if index.column() == 1 else int(value)
+        return None
 
-    def SubfixTextChanged(self, newText):
-        self.animClip.subfix = newText
-    
-    def ShouldExportCheckBoxToggled(self):
-        self.animClip.shouldExport = not self.animClip.shouldExport
+    def setData(self, index, value, role = Qt.EditRole):
+        clip = self.GetClip(index.row())
+        if index.column() == 0 and role == Qt.CheckStateRole:
+            clip.shouldExport = value == Qt.Checked
+        elif index.column() > 0 and role == Qt.EditRole:
+            setattr(clip, self.Attrs[index.column()], value)
+        else:
+            return False
 
-    def GetWindowHash(self):
-        return "MayaToUEMC04172025"
+        self.dataChanged.emit(index, index)
+        return True
+
+    def GetClip(self, row):
+        return self.mayaToUE.animationClips[row]
+
+    def AddNewClip(self):
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.mayaToUE.AddNewAnimEntry()
+        self.endInsertRows()
+
+    # removes the clips from the MayaToUE, one contiguous run of rows at a time from the last
+    def RemoveClips(self, rows):
+        runs = []
+        for row in sorted(set(rows)):
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+
+        for start, end in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            self.mayaToUE.RemoveAnimClips(start, end)
+            self.endRemoveRows()
+
+    # an import can update any row, the view is reset once instead of told about every row
+    def ImportClips(self, path):
+        self.beginResetModel()
+        try:
+            self.mayaToUE.ImportAnimClips(path)
+        finally:
+            self.endResetModel()
+
+# line edits with the subfix and frame validators, created for the cell being edited only
+class AnimClipDelegate(QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setValidator(QRegExpValidator(SubfixPattern, editor) if index.column() == 1 else QIntValidator(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setText(str(index.data(Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        if not editor.hasAcceptableInput():
+            return
+        model.setData(index, editor.text() if index.column() == 1 else int(editor.text()), Qt.EditRole)
 
 class MayaToUEWidget(QMayaWindow):
     def GetWindowHash(self):
@@ -147,6 +561,7 @@ class MayaToUEWidget(QMayaWindow):
     def __init__(self):
         super().__init__()
         self.mayaToUE = MayaToUE()
+        self.pipelineWindow = None
         self.setWindowTitle("Maya to UE")
 
         self.masterLayout = QVBoxLayout()
@@ -171,16 +586,142 @@ class MayaToUEWidget(QMayaWindow):
         addMeshBtn.clicked.connect(self.AddMeshButtonClicked)
         self.masterLayout.addWidget(addMeshBtn)
 
+        self.animClipModel = AnimClipTableModel(self.mayaToUE)
+        self.animClipTable = QTableView()
+        self.animClipTable.setModel(self.animClipModel)
+        self.animClipTable.setItemDelegate(AnimClipDelegate(self.animClipTable))
+        self.animClipTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.animClipTable.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.animClipTable.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.masterLayout.addWidget(self.animClipTable)
+
+        animClipBtnLayout = QHBoxLayout()
+        self.masterLayout.addLayout(animClipBtnLayout)
         addNewAnimClipEntryBtn = QPushButton("Add Animation Clip")
         addNewAnimClipEntryBtn.clicked.connect(self.AddNewAnimClipEntrybtnClicked)
-        self.masterLayout.addWidget(addNewAnimClipEntryBtn)
+        animClipBtnLayout.addWidget(addNewAnimClipEntryBtn)
+        removeAnimClipsBtn = QPushButton("Remove Selected Clips")
+        removeAnimClipsBtn.clicked.connect(self.RemoveAnimClipsBtnClicked)
+        animClipBtnLayout.addWidget(removeAnimClipsBtn)
+        setRangeBtn = QPushButton("Set Range")
+        setRangeBtn.clicked.connect(self.SetRangeBtnClicked)
+        animClipBtnLayout.addWidget(setRangeBtn)
+        importAnimClipsBtn = QPushButton("Import Clips")
+        importAnimClipsBtn.clicked.connect(self.ImportAnimClipsBtnClicked)
+        animClipBtnLayout.addWidget(importAnimClipsBtn)
 
-        self.animEntryLayout = QVBoxLayout()
-        self.masterLayout.addLayout(self.animEntryLayout)
+        self.saveFileLayout = QHBoxLayout()
+        self.masterLayout.addLayout(self.saveFileLayout)
+        self.saveFileLayout.addWidget(QLabel("File Name: "))
+        self.saveFileNameLineEdit = QLineEdit()
+        self.saveFileNameLineEdit.setValidator(QRegExpValidator("[a-zA-Z0-9_]+"))
+        self.saveFileNameLineEdit.textChanged.connect(self.SaveFileNameChanged)
+        self.saveFileLayout.addWidget(self.saveFileNameLineEdit)
+
+        self.saveFileLayout.addWidget(QLabel("Save Directory: "))
+        self.saveDirLineEdit = QLineEdit()
+        self.saveDirLineEdit.setEnabled(False)
+        self.saveFileLayout.addWidget(self.saveDirLineEdit)
+        pickDirBtn = QPushButton("...")
+        pickDirBtn.clicked.connect(self.PickDirBtnClicked)
+        self.saveFileLayout.addWidget(pickDirBtn)
+
+        reduceKeysLayout = QHBoxLayout()
+        self.masterLayout.addLayout(reduceKeysLayout)
+        reduceKeysCheckBox = QCheckBox("Reduce Keys")
+        reduceKeysCheckBox.setChecked(self.mayaToUE.reduceKeys)
+        reduceKeysCheckBox.toggled.connect(self.ReduceKeysCheckBoxToggled)
+        reduceKeysLayout.addWidget(reduceKeysCheckBox)
+        compareUnreducedCheckBox = QCheckBox("Compare Unreduced")
+        compareUnreducedCheckBox.setChecked(self.mayaToUE.compareUnreduced)
+        compareUnreducedCheckBox.toggled.connect(self.CompareUnreducedCheckBoxToggled)
+        reduceKeysLayout.addWidget(compareUnreducedCheckBox)
+        skipUnchangedCheckBox = QCheckBox("Skip Unchanged")
+        skipUnchangedCheckBox.setChecked(self.mayaToUE.skipUnchanged)
+        skipUnchangedCheckBox.toggled.connect(self.SkipUnchangedCheckBoxToggled)
+        reduceKeysLayout.addWidget(skipUnchangedCheckBox)
+        for label, attrName in (("T: ", "translateTolerance"), ("R: ", "rotateTolerance"), ("S: ", "scaleTolerance")):
+            reduceKeysLayout.addWidget(QLabel(label))
+            toleranceLineEdit = QLineEdit(str(getattr(self.mayaToUE, attrName)))
+            toleranceLineEdit.setValidator(QDoubleValidator(0, 1000, 4))
+            toleranceLineEdit.textChanged.connect(lambda newText, attrName=attrName: self.ToleranceChanged(attrName, newText))
+            reduceKeysLayout.addWidget(toleranceLineEdit)
+
+        skinSnapshotLayout = QHBoxLayout()
+        self.masterLayout.addLayout(skinSnapshotLayout)
+        skinSnapshotLayout.addWidget(QLabel("Max Influences: "))
+        maxInfluencesLineEdit = QLineEdit(str(self.mayaToUE.maxInfluences))
+        maxInfluencesLineEdit.setValidator(QIntValidator(1, 12))
+        maxInfluencesLineEdit.textChanged.connect(self.MaxInfluencesChanged)
+        skinSnapshotLayout.addWidget(maxInfluencesLineEdit)
+        saveSkinSnapshotsBtn = QPushButton("Save Skin Weights")
+        saveSkinSnapshotsBtn.clicked.connect(self.SaveSkinSnapshotsBtnClicked)
+        skinSnapshotLayout.addWidget(saveSkinSnapshotsBtn)
+        restoreSkinSnapshotsBtn = QPushButton("Restore Skin Weights")
+        restoreSkinSnapshotsBtn.clicked.connect(self.RestoreSkinSnapshotsBtnClicked)
+        skinSnapshotLayout.addWidget(restoreSkinSnapshotsBtn)
+
+        saveFilesBtn = QPushButton("Save Files")
+        saveFilesBtn.clicked.connect(self.SaveFilesBtnClicked)
+        self.masterLayout.addWidget(saveFilesBtn)
+
+    def SaveFileNameChanged(self, newText):
+        self.mayaToUE.fileName = newText
+
+    def ReduceKeysCheckBoxToggled(self, checked):
+        self.mayaToUE.reduceKeys = checked
+
+    def CompareUnreducedCheckBoxToggled(self, checked):
+        self.mayaToUE.compareUnreduced = checked
+
+    def SkipUnchangedCheckBoxToggled(self, checked):
+        self.mayaToUE.skipUnchanged = checked
+
+    def ToleranceChanged(self, attrName, newText):
+        if newText:
+            setattr(self.mayaToUE, attrName, float(newText))
+
+    def MaxInfluencesChanged(self, newText):
+        if newText:
+            self.mayaToUE.maxInfluences = int(newText)
+
+    def PickDirBtnClicked(self):
+        pickedDir = QFileDialog().getExistingDirectory()
+        self.mayaToUE.saveDir = pickedDir
+        self.saveDirLineEdit.setText(pickedDir)
+
+    @TryAction
+    def SaveFilesBtnClicked(self):
+        self.pipelineWindow = RunPipeline(self.mayaToUE.CreateExportPipeline())
     
+    @TryAction
+    def SaveSkinSnapshotsBtnClicked(self):
+        self.mayaToUE.SaveSkinSnapshots()
+
+    @TryAction
+    def RestoreSkinSnapshotsBtnClicked(self):
+        self.mayaToUE.RestoreSkinSnapshots()
+
     def AddNewAnimClipEntrybtnClicked(self):
-        newEntry = self.mayaToUE.AddNewAnimEntry()
-        self.animEntryLayout.addWidget(AnimClipEntryWidget(newEntry))
+        self.animClipModel.AddNewClip()
+
+    def RemoveAnimClipsBtnClicked(self):
+        self.animClipModel.RemoveClips([index.row() for index in self.animClipTable.selectionModel().selectedRows()])
+
+    def SetRangeBtnClicked(self):
+        index = self.animClipTable.currentIndex()
+        if not index.isValid():
+            return
+
+        animClip = self.animClipModel.GetClip(index.row())
+        mc.playbackOptions(e=True, min=animClip.frameMin, max=animClip.frameMax)
+        mc.playbackOptions(e=True, ast=animClip.frameMin, aet=animClip.frameMax)
+
+    @TryAction
+    def ImportAnimClipsBtnClicked(self):
+        path = QFileDialog().getOpenFileName(self, "Import Clips", "", "Clip Ranges (*.csv *.json)")[0]
+        if path:
+            self.animClipModel.ImportClips(path)
 
     
     @TryAction
@@ -198,5 +739,3 @@ class MayaToUEWidget(QMayaWindow):
     def SetSelectionAsRootJntBtnClicked(self):
         self.mayaToUE.SetSelectedAsRootJnt()
         self.rootJntText.setText(self.mayaToUE.rootJnt)
-
-MayaToUEWidget().show()
\ No newline at end of file
@@ -1,4 +1,10 @@
+import os
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import maya.cmds as mc
+import maya.api.OpenMaya as om
 import maya.OpenMayaUI as omui
 import shiboken2
 
@@ -13,7 +19,119 @@ def DeleteWindowWithName(name):
     for window in GetMayaMainWindow().findChildren(QWidget, name):
         window.deleteLater()
 
+def GetMayapyPath():
+    return os.path.join(os.path.dirname(sys.executable), "mayapy.exe" if os.name == "nt" else "mayapy")
+
+# inside the maya gui sys.executable is maya itself, workers have to be started with mayapy instead.
+def CreateProcessPool(workerCount = None):
+    context = multiprocessing.get_context("spawn")
+    executable = os.path.basename(sys.executable).lower()
+    if executable.startswith("maya") and not executable.startswith("mayapy"):
+        context.set_executable(GetMayapyPath())
+    return ProcessPoolExecutor(workerCount, mp_context=context)
+
+# answers IsMesh / IsJoint / IsSkin and node type queries from a few bulk ls calls. names are indexed both as
+# short unique and as long names. the index is rebuilt lazily after it is invalidated, either by the scene change
+# callbacks from InstallSceneIndex or by leaving a SceneIndexScope.
+class SceneIndex:
+    IndexedTypes = ["joint", "skinCluster"]
+
+    def __init__(self):
+        self.meshTransforms = set()
+        self.nodesByType = {}
+        self.isValid = False
+        self.callbackIds = []
+
+    def Build(self):
+        meshParents = {mesh.rsplit("|", 1)[0] for mesh in mc.ls(type="mesh", long=True)}
+        # ls with an empty list lists the whole scene
+        self.meshTransforms = meshParents | set(mc.ls(list(meshParents))) if meshParents else set()
+        self.nodesByType = {}
+        for nodeType in self.IndexedTypes:
+            self.nodesByType[nodeType] = set(mc.ls(type=nodeType)) | set(mc.ls(type=nodeType, long=True))
+        self.isValid = True
+
+    def Invalidate(self, *args):
+        self.isValid = False
+
+    def GetNodesOfType(self, nodeType):
+        if not self.isValid:
+            self.Build()
+        return self.nodesByType[nodeType]
+
+    def IsMesh(self, obj):
+        if not self.isValid:
+            self.Build()
+        return obj in self.meshTransforms
+
+    def AddCallbacks(self):
+        self.callbackIds = [
+            om.MDGMessage.addNodeAddedCallback(self.Invalidate, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(self.Invalidate, "dependNode"),
+            om.MDagMessage.addAllDagChangesCallback(self.Invalidate),
+            om.MEventMessage.addEventCallback("NameChanged", self.Invalidate),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self.Invalidate),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self.Invalidate),
+        ]
+
+    def RemoveCallbacks(self):
+        if self.callbackIds:
+            om.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+
+activeSceneIndex = None
+
+# keeps one index alive for the session, invalidated by scene change callbacks. ToolLauncher.OpenTool installs it
+# the first time a tool is opened. the callbacks are not tied to a scene, opening or creating a scene only
+# invalidates the index.
+def InstallSceneIndex():
+    global activeSceneIndex
+    if activeSceneIndex:
+        return activeSceneIndex
+
+    activeSceneIndex = SceneIndex()
+    activeSceneIndex.AddCallbacks()
+    return activeSceneIndex
+
+def UninstallSceneIndex():
+    global activeSceneIndex
+    if activeSceneIndex:
+        activeSceneIndex.RemoveCallbacks()
+    activeSceneIndex = None
+
+# an index that is only trusted inside the with block, for headless use or one-off batch queries. if an index is
+# already installed it is reused.
+class SceneIndexScope:
+    def __enter__(self):
+        global activeSceneIndex
+        self.previousIndex = activeSceneIndex
+        if not activeSceneIndex:
+            activeSceneIndex = SceneIndex()
+        return activeSceneIndex
+
+    def __exit__(self, excType, excValue, traceback):
+        global activeSceneIndex
+        activeSceneIndex = self.previousIndex
+
+def GetNodesOfType(nodeType):
+    if activeSceneIndex and nodeType in SceneIndex.IndexedTypes:
+        return activeSceneIndex.GetNodesOfType(nodeType)
+    return set(mc.ls(type=nodeType))
+
+# steps through the frame range evaluating the scene at every frame, returns frames per second
+def MeasurePlaybackFps(start, end):
+    currentFrame = mc.currentTime(q=True)
+    startTime = time.perf_counter()
+    for frame in range(int(start), int(end) + 1):
+        mc.currentTime(frame, update=True)
+    elapsedTime = time.perf_counter() - startTime
+    mc.currentTime(currentFrame)
+    return (int(end) - int(start) + 1) / elapsedTime
+
 def IsMesh(obj):
+    if activeSceneIndex:
+        return activeSceneIndex.IsMesh(obj)
+
     shapes = mc.listRelatives(obj, s=True)
     if not shapes:
         return False
@@ -25,31 +143,77 @@ def IsMesh(obj):
     return False
 
 def IsSkin(obj):
+    if activeSceneIndex:
+        return obj in activeSceneIndex.GetNodesOfType("skinCluster")
     return mc.objectType(obj) == "skinCluster"
 
 def IsJoint(obj):
+    if activeSceneIndex:
+        return obj in activeSceneIndex.GetNodesOfType("joint")
     return mc.objectType(obj) == "joint"
 
-def GetUpperStream(obj):
-    return mc.listConnections(obj, s=True, d=False, sh=True)
+def GetUpperStream(obj, connections=False):
+    return mc.listConnections(obj, s=True, d=False, sh=True, c=connections)
 
-def GetLowerStream(obj):
-    return mc.listConnections(obj, s=False, d=True, sh=True)
+def GetLowerStream(obj, connections=False):
+    return mc.listConnections(obj, s=False, d=True, sh=True, c=connections)
 
-def GetAllConnectIn(obj, NextFunc, searchDepth, Filter = None):
-    AllFound = set()
-    nexts = NextFunc(obj)
-    while nexts and searchDepth > 0:
-        for next in nexts:
-            AllFound.add(next)
-        
-        nexts = NextFunc(nexts)
-        if nexts:
-            nexts = [x for x in nexts if x not in AllFound]
+FilterNodeTypes = {
+    IsSkin: "skinCluster",
+    IsJoint: "joint",
+}
 
-        searchDepth -= 1
-    
-    if not Filter:
+# walks the dependency graph one depth step at a time. the neighbours of every node are queried once, in one
+# listConnections call per step for the whole uncached frontier, and kept for the lifetime of the walk.
+# create one per operation so repeated searches from the same node share the cache.
+class GraphWalk:
+    def __init__(self, NextFunc):
+        self.NextFunc = NextFunc
+        self.adjacency = {}
+
+    def GetNexts(self, nodes):
+        uncached = [node for node in nodes if node not in self.adjacency]
+        if uncached:
+            for node in uncached:
+                self.adjacency[node] = set()
+
+            connections = self.NextFunc(uncached, True) or []
+            for plug, other in zip(connections[::2], connections[1::2]):
+                self.adjacency.setdefault(plug.split(".")[0], set()).add(other)
+
+        nexts = set()
+        for node in nodes:
+            nexts.update(self.adjacency[node])
+        return nexts
+
+    def Walk(self, obj, searchDepth, targets = None, stopAtFirst = False):
+        visited = set()
+        found = set()
+        frontier = [obj]
+        while frontier and searchDepth > 0:
+            frontier = self.GetNexts(frontier) - visited
+            visited.update(frontier)
+
+            if targets is not None:
+                found.update(targets.intersection(frontier))
+                if found and stopAtFirst:
+                    break
+
+            searchDepth -= 1
+
+        if targets is None:
+            return visited
+        return found
+
+def GetAllConnectIn(obj, NextFunc, searchDepth, Filter = None, walk = None, stopAtFirst = False):
+    if not walk:
+        walk = GraphWalk(NextFunc)
+
+    filterType = FilterNodeTypes.get(Filter)
+    targets = GetNodesOfType(filterType) if filterType else None
+    AllFound = walk.Walk(obj, searchDepth, targets, stopAtFirst)
+
+    if not Filter or filterType:
         return list(AllFound)
     
     filtered = []
@@ -0,0 +1,1104 @@
+import math
+import os
+import pickle
+import re
+import runpy
+import sys
+import tempfile
+import types
+from collections import Counter
+import numpy as np
+
+# an in-memory scene graph that stands in for the part of maya.cmds the tools in this folder call, so they can be run
+# and measured without maya. InstallMemoryMaya registers it as maya.cmds, together with maya.mel, an MVector for
+# maya.OpenMaya and inert PySide2 / shiboken2 modules, before the tools are imported. meshes, curves and skinClusters
+# keep their data in numpy arrays shaped the way the api returns them, MemorySceneMeshData serves them to the tools in
+# place of MayaMeshData.
+# the graph is never evaluated: transforms only compose their translation, getAttr returns the stored value even on
+# driven plugs, and only the commands issued inside an undo chunk can be undone.
+
+TypeParents = {
+    "joint": "transform",
+    "ikHandle": "transform",
+    "ikEffector": "transform",
+    "orientConstraint": "transform",
+    "poleVectorConstraint": "transform",
+    "mesh": "shape",
+    "nurbsCurve": "shape",
+    "locator": "shape",
+    "animCurveTL": "animCurve",
+    "animCurveTA": "animCurve",
+    "animCurveTU": "animCurve",
+}
+
+IdentityMatrix = tuple(np.eye(4).ravel().tolist())
+TransformAttrs = {"translate": (0.0, 0.0, 0.0), "rotate": (0.0, 0.0, 0.0), "scale": (1.0, 1.0, 1.0), "visibility": True, "inheritsTransform": True, "offsetParentMatrix": IdentityMatrix}
+ShapeAttrs = {"visibility": True, "intermediateObject": False, "overrideEnabled": False, "overrideRGBColors": False, "overrideColorRGB": (0.0, 0.0, 0.0)}
+NodeAttrs = {
+    "joint": {"inverseScale": (1.0, 1.0, 1.0)},
+    "mesh": {"inMesh": None, "outMesh": None},
+    "nurbsCurve": {"create": None},
+    "makeNurbCircle": {"outputCurve": None},
+    "skinCluster": {"envelope": 1.0, "bindPose": None},
+    "ikHandle": {"ikBlend": 1.0, "poleVector": (0.0, 0.0, 1.0), "startJoint": None, "endEffector": None},
+    "orientConstraint": {"constraintRotate": (0.0, 0.0, 0.0)},
+    "poleVectorConstraint": {"constraintTranslate": (0.0, 0.0, 0.0)},
+    "reverse": {"inputX": 0.0, "inputY": 0.0, "inputZ": 0.0, "outputX": 1.0, "outputY": 1.0, "outputZ": 1.0},
+    "animCurve": {"output": 0.0},
+}
+
+AttrAliases = {"t": "translate", "r": "rotate", "s": "scale", "v": "visibility"}
+ChildAttrs = {}
+for shortName, longName in (("t", "translate"), ("r", "rotate"), ("s", "scale")):
+    for axisIndex, axis in enumerate("xyz"):
+        ChildAttrs[shortName + axis] = (longName, axisIndex)
+        ChildAttrs[longName + axis.upper()] = (longName, axisIndex)
+
+PlugPattern = re.compile(r"([A-Za-z_][\w|:]*)\.([A-Za-z_]\w*)")
+FaceSpecPattern = re.compile(r"^(?P<node>[^.]+)\.f\[(?P<start>\d+)(?::(?P<end>\d+))?\]$")
+VertSpecPattern = re.compile(r"^(?P<node>[^.]+)\.vtx\[(?P<start>\d+)(?::(?P<end>\d+))?\]$")
+
+def IsType(nodeType, queryType):
+    while nodeType:
+        if nodeType == queryType:
+            return True
+        nodeType = TypeParents.get(nodeType)
+    return False
+
+def GetDefaultAttrs(nodeType):
+    attrs = {"message": None}
+    if IsType(nodeType, "transform"):
+        attrs.update(TransformAttrs)
+    if IsType(nodeType, "shape"):
+        attrs.update(ShapeAttrs)
+    for queryType, typeAttrs in NodeAttrs.items():
+        if IsType(nodeType, queryType):
+            attrs.update(typeAttrs)
+    return attrs
+
+def Flatten(args):
+    items = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            items += Flatten(arg)
+        else:
+            items.append(arg)
+    return items
+
+def Flag(kwargs, shortName, longName, default = False):
+    return kwargs.get(shortName, kwargs.get(longName, default))
+
+# node data that lists other nodes, saved by name
+NodeListData = {"influences", "members", "targets"}
+
+class MemoryNode:
+    def __init__(self, name, nodeType):
+        self.name = name
+        self.type = nodeType
+        self.parents = []
+        self.children = []
+        self.attrs = GetDefaultAttrs(nodeType)
+        # bulk data of meshes, curves, skinClusters and anim curves. values are replaced, never changed in place, so
+        # an undo snapshot can share them.
+        self.data = {}
+        self.inputs = {}
+        self.outputs = []
+
+    def IsShape(self):
+        return IsType(self.type, "shape")
+
+    def GetParent(self):
+        return self.parents[0] if self.parents else None
+
+class MemoryScene:
+    def __init__(self):
+        self.nodes = {}
+        self.selection = []
+        self.currentTime = 1.0
+        self.playbackRange = [1.0, 120.0]
+        self.animationRange = [1.0, 200.0]
+        self.fileName = ""
+        self.undoDepth = 0
+        self.undoStack = []
+        self.openChunk = None
+        self.editCount = 0
+        self.commandCounts = Counter()
+        self.melCommands = []
+        self.CreateNode("shadingEngine", "initialShadingGroup")
+
+    def GetUniqueName(self, name):
+        if name not in self.nodes:
+            return name
+
+        baseName = name.rstrip("0123456789")
+        index = 1
+        while f"{baseName}{index}" in self.nodes:
+            index += 1
+        return f"{baseName}{index}"
+
+    def CreateNode(self, nodeType, name = None, parent = None):
+        node = MemoryNode(self.GetUniqueName(name or nodeType + "1"), nodeType)
+        self.nodes[node.name] = node
+        if parent:
+            node.parents.append(parent)
+            parent.children.append(node)
+        return node
+
+    # accepts short names, long names, partial paths and plugs or components of them
+    def FindNode(self, name):
+        return self.nodes.get(name.split(".", 1)[0].rsplit("|", 1)[-1])
+
+    def GetNode(self, name):
+        node = self.FindNode(name)
+        if node is None:
+            raise ValueError(f"No object matches name: {name}")
+        return node
+
+    def GetPlug(self, plug):
+        nodeName, attr = plug.split(".", 1)
+        return self.GetNode(nodeName), AttrAliases.get(attr, attr)
+
+    def GetLongName(self, node):
+        names = []
+        while node:
+            names.append(node.name)
+            node = node.GetParent()
+        return "|" + "|".join(reversed(names))
+
+    def GetDescendants(self, node):
+        descendants = []
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            if child not in descendants:
+                descendants.append(child)
+                stack += reversed(child.children)
+        return descendants
+
+    # an offsetParentMatrix driven by a worldMatrix is followed to its node, only the translation of matrices is kept
+    def GetWorldTranslate(self, node):
+        position = np.zeros(3)
+        while node:
+            if "translate" in node.attrs:
+                position += node.attrs["translate"]
+            if "offsetParentMatrix" in node.attrs:
+                source = node.inputs.get("offsetParentMatrix")
+                if source and source[1].startswith("worldMatrix"):
+                    position += self.GetWorldTranslate(source[0])
+                else:
+                    position += node.attrs["offsetParentMatrix"][12:15]
+            if not node.attrs.get("inheritsTransform", True):
+                break
+            node = node.GetParent()
+        return position
+
+    def GetMeshShape(self, node):
+        if node.type == "mesh":
+            return node
+
+        for child in node.children:
+            if child.type == "mesh" and not child.attrs["intermediateObject"]:
+                return child
+        raise ValueError(f"{node.name} has no mesh shape")
+
+    def GetSkinForShape(self, shape):
+        source = shape.inputs.get("inMesh")
+        if source and source[0].type == "skinCluster":
+            return source[0]
+        return None
+
+    def Reparent(self, node, parent):
+        world = self.GetWorldTranslate(node)
+        oldParent = node.GetParent()
+        if oldParent:
+            oldParent.children.remove(node)
+            node.parents.remove(oldParent)
+        if parent:
+            node.parents.insert(0, parent)
+            parent.children.append(node)
+        if "translate" in node.attrs:
+            node.attrs["translate"] = tuple((world - self.GetWorldTranslate(parent)).tolist())
+
+    def Connect(self, source, sourceAttr, destination, destinationAttr, force = False):
+        for node, attr in ((source, sourceAttr), (destination, destinationAttr)):
+            if attr not in node.attrs and attr not in ChildAttrs and "[" not in attr:
+                raise ValueError(f"No attribute {node.name}.{attr}")
+
+        if destinationAttr in destination.inputs:
+            if not force:
+                raise RuntimeError(f"{destination.name}.{destinationAttr} is already connected")
+            self.Disconnect(destination, destinationAttr)
+
+        destination.inputs[destinationAttr] = (source, sourceAttr)
+        source.outputs.append((sourceAttr, destination, destinationAttr))
+
+    def Disconnect(self, destination, destinationAttr):
+        source, sourceAttr = destination.inputs.pop(destinationAttr)
+        source.outputs.remove((sourceAttr, destination, destinationAttr))
+
+    def DeleteNode(self, node):
+        if self.nodes.get(node.name) is not node:
+            return
+
+        for child in list(node.children):
+            if len(child.parents) > 1:
+                child.parents.remove(node)
+                node.children.remove(child)
+            else:
+                self.DeleteNode(child)
+
+        # like maya, a deformer goes away with the geometry it deforms
+        skin = self.GetSkinForShape(node) if node.type == "mesh" else None
+
+        for attr in list(node.inputs):
+            self.Disconnect(node, attr)
+        for sourceAttr, destination, destinationAttr in list(node.outputs):
+            self.Disconnect(destination, destinationAttr)
+        for parent in node.parents:
+            parent.children.remove(node)
+        node.parents = []
+
+        del self.nodes[node.name]
+        if node in self.selection:
+            self.selection.remove(node)
+
+        if skin:
+            self.DeleteNode(skin)
+
+    def DuplicateNode(self, node, parent, parentOnly = False):
+        duplicate = self.CreateNode(node.type, node.name, parent)
+        duplicate.attrs = dict(node.attrs)
+        duplicate.data = dict(node.data)
+        for child in node.children:
+            if child.GetParent() is node and not parentOnly:
+                self.DuplicateNode(child, duplicate)
+        return duplicate
+
+    # deletes the masked faces and compacts the vertices, keeping the remaining ones in their original order
+    def DeleteFaces(self, shape, faceMask):
+        faceCounts, faceVerts, points = shape.data["faceCounts"], shape.data["faceVerts"], shape.data["points"]
+        keptCorners = np.repeat(~faceMask, faceCounts)
+        usedVerts = np.unique(faceVerts[keptCorners])
+        remap = np.full(len(points), -1, dtype=np.int64)
+        remap[usedVerts] = np.arange(len(usedVerts))
+        shape.data = {"faceCounts": faceCounts[~faceMask], "faceVerts": remap[faceVerts[keptCorners]], "points": points[usedVerts]}
+
+        skin = self.GetSkinForShape(shape)
+        if skin:
+            skin.data = dict(skin.data, weights=skin.data["weights"][usedVerts])
+
+    # creates a mesh transform and shape from api style arrays, returns the transform name
+    def CreateMesh(self, name, faceCounts, faceVerts, points):
+        transform = self.CreateNode("transform", name)
+        self.CreateMeshShape(transform, faceCounts, faceVerts, points)
+        return transform.name
+
+    def CreateMeshShape(self, transform, faceCounts, faceVerts, points):
+        shape = self.CreateNode("mesh", transform.name + "Shape", transform)
+        shape.data = {
+            "faceCounts": np.asarray(faceCounts, dtype=np.int64),
+            "faceVerts": np.asarray(faceVerts, dtype=np.int64),
+            "points": np.asarray(points, dtype=np.float64),
+        }
+        return shape
+
+    def Snapshot(self):
+        nodes = [(node, node.name, list(node.parents), list(node.children), dict(node.attrs), dict(node.data), dict(node.inputs), list(node.outputs)) for node in self.nodes.values()]
+        return nodes, list(self.selection), self.currentTime
+
+    def Restore(self, snapshot):
+        nodes, selection, currentTime = snapshot
+        self.nodes = {}
+        for node, name, parents, children, attrs, data, inputs, outputs in nodes:
+            node.name, node.parents, node.children, node.attrs, node.data, node.inputs, node.outputs = name, parents, children, attrs, data, inputs, outputs
+            self.nodes[name] = node
+        self.selection = selection
+        self.currentTime = currentTime
+
+    # scene files are pickles of the nodes and the time settings, only the in-memory scene reads them. every node
+    # refers to the others by name, like in Snapshot, so pickling does not recurse along the node graph.
+    def Save(self, path):
+        nodes = [(node.name, node.type, [parent.name for parent in node.parents], [child.name for child in node.children], node.attrs,
+                  {key: [other.name for other in value] if key in NodeListData else value for key, value in node.data.items()},
+                  {attr: (source.name, sourceAttr) for attr, (source, sourceAttr) in node.inputs.items()},
+                  [(attr, destination.name, destinationAttr) for attr, destination, destinationAttr in node.outputs]) for node in self.nodes.values()]
+        state = {"nodes": nodes, "selection": [node.name for node in self.selection], "currentTime": self.currentTime, "playbackRange": self.playbackRange, "animationRange": self.animationRange}
+        with open(path, "wb") as sceneFile:
+            pickle.dump(state, sceneFile)
+
+    def Load(self, path):
+        with open(path, "rb") as sceneFile:
+            state = pickle.load(sceneFile)
+        self.__init__()
+        self.nodes = {name: MemoryNode(name, nodeType) for name, nodeType, *links in state["nodes"]}
+        for name, nodeType, parents, children, attrs, data, inputs, outputs in state["nodes"]:
+            node = self.nodes[name]
+            node.parents = [self.nodes[parent] for parent in parents]
+            node.children = [self.nodes[child] for child in children]
+            node.attrs = attrs
+            node.data = {key: [self.nodes[other] for other in value] if key in NodeListData else value for key, value in data.items()}
+            node.inputs = {attr: (self.nodes[source], sourceAttr) for attr, (source, sourceAttr) in inputs.items()}
+            node.outputs = [(attr, self.nodes[destination], destinationAttr) for attr, destination, destinationAttr in outputs]
+        self.selection = [self.nodes[name] for name in state["selection"]]
+        self.currentTime = state["currentTime"]
+        self.playbackRange = state["playbackRange"]
+        self.animationRange = state["animationRange"]
+        self.fileName = path
+
+    def ResetCommandCounts(self):
+        self.commandCounts = Counter()
+
+# binds every point fully to its closest joint, in chunks so the point x joint distances stay small
+def GetClosestJointWeights(points, jntPositions, chunkSize = 16384):
+    weights = np.zeros((len(points), len(jntPositions)))
+    for start in range(0, len(points), chunkSize):
+        chunk = points[start:start + chunkSize]
+        distances = ((chunk[:, None, :] - jntPositions[None, :, :]) ** 2).sum(axis=2)
+        weights[np.arange(start, start + len(chunk)), np.argmin(distances, axis=1)] = 1.0
+    return weights
+
+def GetCirclePoints(radius, normal, count = 8):
+    normal = np.asarray(normal, dtype=np.float64)
+    normal /= np.linalg.norm(normal)
+    helper = np.array([1.0, 0.0, 0.0]) if abs(normal[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    u = np.cross(normal, helper)
+    u /= np.linalg.norm(u)
+    v = np.cross(normal, u)
+    angles = np.linspace(0, 2 * np.pi, count, endpoint=False)
+    return radius * (np.cos(angles)[:, None] * u + np.sin(angles)[:, None] * v)
+
+# the maya.cmds commands, named and flagged like maya. helpers are CamelCase so only the commands are exposed.
+class MemoryCmds:
+    def __init__(self, scene):
+        self.scene = scene
+
+    def GetNodes(self, args):
+        return [self.scene.GetNode(name) for name in Flatten(args)]
+
+    def GetNames(self, nodes, long = False):
+        names = []
+        for node in dict.fromkeys(nodes):
+            names.append(self.scene.GetLongName(node) if long else node.name)
+        return names
+
+    def ls(self, *args, **kwargs):
+        if Flag(kwargs, "sl", "selection"):
+            nodes = list(self.scene.selection)
+        # like maya, an empty list of names lists the whole scene
+        elif Flatten(args):
+            nodes = [self.scene.FindNode(name) for name in Flatten(args)]
+            nodes = [node for node in nodes if node]
+        else:
+            nodes = list(self.scene.nodes.values())
+
+        nodeTypes = kwargs.get("type")
+        if nodeTypes:
+            nodeTypes = [nodeTypes] if isinstance(nodeTypes, str) else nodeTypes
+            nodes = [node for node in nodes if any(IsType(node.type, nodeType) for nodeType in nodeTypes)]
+        return self.GetNames(nodes, Flag(kwargs, "l", "long"))
+
+    def objExists(self, name):
+        return self.scene.FindNode(name) is not None
+
+    def objectType(self, name):
+        return self.scene.GetNode(name).type
+
+    def listRelatives(self, *args, **kwargs):
+        relatives = []
+        for node in self.GetNodes(args):
+            if Flag(kwargs, "p", "parent"):
+                relatives += node.parents[:1]
+            elif Flag(kwargs, "ad", "allDescendents"):
+                relatives += reversed(self.scene.GetDescendants(node))
+            elif Flag(kwargs, "s", "shapes"):
+                relatives += [child for child in node.children if child.IsShape()]
+            else:
+                relatives += node.children
+
+        nodeTypes = kwargs.get("type")
+        if nodeTypes:
+            nodeTypes = [nodeTypes] if isinstance(nodeTypes, str) else nodeTypes
+            relatives = [node for node in relatives if any(IsType(node.type, nodeType) for nodeType in nodeTypes)]
+        return self.GetNames(relatives, Flag(kwargs, "f", "fullPath")) or None
+
+    def listConnections(self, *args, **kwargs):
+        source = Flag(kwargs, "s", "source", True)
+        destination = Flag(kwargs, "d", "destination", True)
+        shapes = Flag(kwargs, "sh", "shapes")
+        connections = Flag(kwargs, "c", "connections")
+        plugs = Flag(kwargs, "p", "plugs")
+
+        results = []
+        for name in Flatten(args):
+            node = self.scene.GetNode(name)
+            plugAttr = AttrAliases.get(name.split(".", 1)[1], name.split(".", 1)[1]) if "." in name else None
+            pairs = []
+            if source:
+                pairs += [(attr, other, otherAttr) for attr, (other, otherAttr) in node.inputs.items()]
+            if destination:
+                pairs += node.outputs
+
+            for attr, other, otherAttr in pairs:
+                if plugAttr and attr != plugAttr:
+                    continue
+                if not shapes and other.IsShape():
+                    other = other.GetParent()
+                otherName = f"{other.name}.{otherAttr}" if plugs else other.name
+                results += [f"{node.name}.{attr}", otherName] if connections else [otherName]
+        return results
+
+    def createNode(self, nodeType, **kwargs):
+        parent = Flag(kwargs, "p", "parent", None)
+        return self.scene.CreateNode(nodeType, Flag(kwargs, "n", "name", None), self.scene.GetNode(parent) if parent else None).name
+
+    def group(self, *args, **kwargs):
+        name = Flag(kwargs, "n", "name", None) or "group1"
+        objs = self.GetNodes(args)
+        if Flag(kwargs, "em", "empty") or not objs:
+            parent = Flag(kwargs, "p", "parent", None)
+            return self.scene.CreateNode("transform", name, self.scene.GetNode(parent) if parent else None).name
+
+        grp = self.scene.CreateNode("transform", name, objs[0].GetParent())
+        for obj in objs:
+            self.scene.Reparent(obj, grp)
+        return grp.name
+
+    def parent(self, *args, **kwargs):
+        objs = self.GetNodes(args)
+        if Flag(kwargs, "w", "world"):
+            for obj in objs:
+                self.scene.Reparent(obj, None)
+            return self.GetNames(objs)
+
+        target = objs.pop()
+        for obj in objs:
+            if Flag(kwargs, "add", "addObject"):
+                obj.parents.append(target)
+                target.children.append(obj)
+            elif obj.GetParent() is not target:
+                self.scene.Reparent(obj, target)
+        return self.GetNames(objs)
+
+    def delete(self, *args, **kwargs):
+        faceMasks = {}
+        for name in Flatten(args):
+            faceSpec = FaceSpecPattern.match(name)
+            if not faceSpec:
+                self.scene.DeleteNode(self.scene.GetNode(name))
+                continue
+
+            shape = self.scene.GetMeshShape(self.scene.GetNode(faceSpec["node"]))
+            if shape.name not in faceMasks:
+                faceMasks[shape.name] = (shape, np.zeros(len(shape.data["faceCounts"]), dtype=bool))
+            start = int(faceSpec["start"])
+            end = int(faceSpec["end"] or start)
+            faceMasks[shape.name][1][start:end + 1] = True
+
+        for shape, faceMask in faceMasks.values():
+            self.scene.DeleteFaces(shape, faceMask)
+
+    def rename(self, oldName, newName):
+        node = self.scene.GetNode(oldName)
+        del self.scene.nodes[node.name]
+        node.name = self.scene.GetUniqueName(newName)
+        self.scene.nodes[node.name] = node
+        return node.name
+
+    def duplicate(self, *args, **kwargs):
+        return [self.scene.DuplicateNode(node, node.GetParent(), Flag(kwargs, "po", "parentOnly")).name for node in self.GetNodes(args)]
+
+    def getAttr(self, plug, **kwargs):
+        node, attr = self.scene.GetPlug(plug)
+        if attr in ("worldMatrix[0]", "worldInverseMatrix[0]"):
+            matrix = np.eye(4)
+            matrix[3, :3] = self.scene.GetWorldTranslate(node) * (1 if attr == "worldMatrix[0]" else -1)
+            return matrix.ravel().tolist()
+
+        if attr in ChildAttrs:
+            compoundAttr, index = ChildAttrs[attr]
+            return node.attrs[compoundAttr][index]
+
+        if attr not in node.attrs:
+            raise ValueError(f"No attribute {plug}")
+        value = node.attrs[attr]
+        return [value] if isinstance(value, tuple) else value
+
+    def setAttr(self, plug, *values, **kwargs):
+        node, attr = self.scene.GetPlug(plug)
+        if attr in ChildAttrs:
+            compoundAttr, index = ChildAttrs[attr]
+            value = list(node.attrs[compoundAttr])
+            value[index] = float(values[0])
+            node.attrs[compoundAttr] = tuple(value)
+            return
+
+        if attr not in node.attrs:
+            raise ValueError(f"No attribute {plug}")
+        node.attrs[attr] = tuple(float(value) for value in values) if len(values) > 1 else values[0]
+
+    def addAttr(self, *args, **kwargs):
+        attr = Flag(kwargs, "ln", "longName", None)
+        for node in self.GetNodes(args):
+            if attr in node.attrs:
+                raise RuntimeError(f"Found attribute {node.name}.{attr} already exists")
+            isString = Flag(kwargs, "dt", "dataType", None) == "string"
+            node.attrs[attr] = None if isString else Flag(kwargs, "dv", "defaultValue", 0.0)
+
+    def attributeQuery(self, attr, **kwargs):
+        node = self.scene.GetNode(Flag(kwargs, "n", "node", None))
+        return AttrAliases.get(attr, attr) in node.attrs or attr in ChildAttrs
+
+    def connectAttr(self, sourcePlug, destinationPlug, **kwargs):
+        source, sourceAttr = self.scene.GetPlug(sourcePlug)
+        destination, destinationAttr = self.scene.GetPlug(destinationPlug)
+        self.scene.Connect(source, sourceAttr, destination, destinationAttr, Flag(kwargs, "f", "force"))
+
+    def select(self, *args, **kwargs):
+        if Flag(kwargs, "cl", "clear"):
+            self.scene.selection = []
+            return
+
+        nodes = self.GetNodes(args)
+        if Flag(kwargs, "add", "add"):
+            self.scene.selection += [node for node in nodes if node not in self.scene.selection]
+        elif Flag(kwargs, "d", "deselect"):
+            self.scene.selection = [node for node in self.scene.selection if node not in nodes]
+        else:
+            self.scene.selection = list(dict.fromkeys(nodes))
+
+    def xform(self, *args, **kwargs):
+        node = self.GetNodes(args)[0]
+        worldSpace = Flag(kwargs, "ws", "worldSpace")
+        if Flag(kwargs, "q", "query"):
+            if worldSpace:
+                return self.scene.GetWorldTranslate(node).tolist()
+            if Flag(kwargs, "rp", "rotatePivot"):
+                return [0.0, 0.0, 0.0]
+            return list(node.attrs["translate"])
+
+        matrix = Flag(kwargs, "m", "matrix", None)
+        if matrix is not None:
+            node.attrs["translate"] = tuple(float(value) for value in matrix[12:15])
+            node.attrs["rotate"] = (0.0, 0.0, 0.0)
+
+        translation = Flag(kwargs, "t", "translation", None)
+        if translation is not None:
+            if worldSpace:
+                translation = np.asarray(translation) - self.scene.GetWorldTranslate(node.GetParent())
+            node.attrs["translate"] = tuple(float(value) for value in translation)
+
+    def matchTransform(self, *args, **kwargs):
+        node, target = self.GetNodes(args)[:2]
+        node.attrs["translate"] = tuple((self.scene.GetWorldTranslate(target) - self.scene.GetWorldTranslate(node.GetParent())).tolist())
+        node.attrs["rotate"] = target.attrs["rotate"]
+
+    def scale(self, x, y, z, *args, **kwargs):
+        factors = np.array([x, y, z], dtype=np.float64)
+        for name in Flatten(args):
+            node = self.scene.GetNode(name)
+            if ".cv[" not in name:
+                node.attrs["scale"] = tuple((np.asarray(node.attrs["scale"]) * factors).tolist()) if Flag(kwargs, "r", "relative") else (x, y, z)
+                continue
+
+            shapes = [node] if node.IsShape() else [child for child in node.children if child.type == "nurbsCurve"]
+            world = self.scene.GetWorldTranslate(node if not node.IsShape() else node.GetParent())
+            pivot = np.asarray(Flag(kwargs, "p", "pivot", world), dtype=np.float64)
+            for shape in shapes:
+                shape.data = dict(shape.data, cvs=pivot + (shape.data["cvs"] + world - pivot) * factors - world)
+
+    # only adds members to existing sets, shading groups included
+    def sets(self, *args, **kwargs):
+        objectSet = self.scene.GetNode(Flag(kwargs, "fe", "forceElement", None) or Flag(kwargs, "add", "addElement", None))
+        members = objectSet.data.get("members", [])
+        objectSet.data = dict(objectSet.data, members=members + [node for node in self.GetNodes(args) if node not in members])
+
+    def spaceLocator(self, **kwargs):
+        transform = self.scene.CreateNode("transform", Flag(kwargs, "n", "name", None) or "locator1")
+        self.scene.CreateNode("locator", transform.name + "Shape", transform)
+        return [transform.name]
+
+    def curve(self, **kwargs):
+        transform = self.scene.CreateNode("transform", Flag(kwargs, "n", "name", None) or "curve1")
+        shape = self.scene.CreateNode("nurbsCurve", transform.name + "Shape", transform)
+        shape.data = {
+            "cvs": np.asarray(Flag(kwargs, "p", "point", None), dtype=np.float64),
+            "degree": Flag(kwargs, "d", "degree", 3),
+            "knots": list(Flag(kwargs, "k", "knot", [])),
+            "periodic": bool(Flag(kwargs, "per", "periodic")),
+        }
+        return transform.name
+
+    def circle(self, **kwargs):
+        transform = self.scene.CreateNode("transform", Flag(kwargs, "n", "name", None) or "nurbsCircle1")
+        shape = self.scene.CreateNode("nurbsCurve", transform.name + "Shape", transform)
+        shape.data = {"cvs": GetCirclePoints(Flag(kwargs, "r", "radius", 1.0), Flag(kwargs, "nr", "normal", (0, 0, 1))), "degree": 3, "periodic": True}
+        maker = self.scene.CreateNode("makeNurbCircle")
+        self.scene.Connect(maker, "outputCurve", shape, "create")
+        return [transform.name, maker.name]
+
+    # like maya, a new joint goes under the selected joint and becomes the selection
+    def joint(self, **kwargs):
+        parent = self.scene.selection[0] if self.scene.selection and self.scene.selection[0].type == "joint" else None
+        jnt = self.scene.CreateNode("joint", Flag(kwargs, "n", "name", None), parent)
+        position = np.asarray(Flag(kwargs, "p", "position", (0.0, 0.0, 0.0)), dtype=np.float64)
+        jnt.attrs["translate"] = tuple((position - self.scene.GetWorldTranslate(parent)).tolist())
+        if parent:
+            self.scene.Connect(parent, "scale", jnt, "inverseScale")
+        self.scene.selection = [jnt]
+        return jnt.name
+
+    def skinCluster(self, *args, **kwargs):
+        if Flag(kwargs, "q", "query"):
+            skin = self.GetNodes(args)[0]
+            if Flag(kwargs, "g", "geometry"):
+                return [destination.name for attr, destination, destinationAttr in skin.outputs if attr.startswith("outputGeometry")]
+            return [jnt.name for jnt in skin.data["influences"]]
+
+        nodes = self.GetNodes(args)
+        jnts = [node for node in nodes if node.type == "joint"]
+        if not Flag(kwargs, "tsb", "toSelectedBones"):
+            jnts = list(dict.fromkeys(jnts + [child for jnt in jnts for child in self.scene.GetDescendants(jnt) if child.type == "joint"]))
+        geometry = [node for node in nodes if node.type != "joint"][-1]
+        shape = self.scene.GetMeshShape(geometry)
+        if self.scene.GetSkinForShape(shape):
+            raise RuntimeError(f"{geometry.name} is already connected to a skinCluster")
+
+        skin = self.scene.CreateNode("skinCluster", Flag(kwargs, "n", "name", None))
+        bindPose = self.scene.CreateNode("dagPose", "bindPose1")
+        for i, jnt in enumerate(jnts):
+            self.scene.Connect(jnt, "worldMatrix[0]", skin, f"matrix[{i}]")
+            self.scene.Connect(jnt, "message", bindPose, f"members[{i}]")
+        self.scene.Connect(bindPose, "message", skin, "bindPose")
+        self.scene.Connect(skin, "outputGeometry[0]", shape, "inMesh")
+
+        points = shape.data["points"] + self.scene.GetWorldTranslate(shape.GetParent())
+        jntPositions = np.array([self.scene.GetWorldTranslate(jnt) for jnt in jnts])
+        skin.data = {"influences": jnts, "weights": GetClosestJointWeights(points, jntPositions)}
+        return [skin.name]
+
+    # closest point sampling is approximated by matching identical vertex positions, which is exact for meshes cut
+    # out of the source mesh like the proxy segments
+    def copySkinWeights(self, **kwargs):
+        sourceSkin = self.scene.GetNode(Flag(kwargs, "ss", "sourceSkin", None))
+        destinationSkin = self.scene.GetNode(Flag(kwargs, "ds", "destinationSkin", None))
+        sourceShape = self.scene.GetNode(self.skinCluster(sourceSkin.name, q=True, g=True)[0])
+        destinationShape = self.scene.GetNode(self.skinCluster(destinationSkin.name, q=True, g=True)[0])
+
+        sourceVerts = {point.tobytes(): i for i, point in enumerate(sourceShape.data["points"])}
+        matches = np.array([sourceVerts.get(point.tobytes(), -1) for point in destinationShape.data["points"]])
+        sourceColumns = {jnt.name: i for i, jnt in enumerate(sourceSkin.data["influences"])}
+
+        weights = np.array(destinationSkin.data["weights"])
+        matched = matches >= 0
+        for column, jnt in enumerate(destinationSkin.data["influences"]):
+            if jnt.name in sourceColumns:
+                weights[matched, column] = sourceSkin.data["weights"][matches[matched], sourceColumns[jnt.name]]
+            else:
+                weights[matched, column] = 0.0
+        if Flag(kwargs, "nm", "noMirror"):
+            totals = weights.sum(axis=1, keepdims=True)
+            weights = np.divide(weights, totals, out=weights, where=totals > 0)
+        destinationSkin.data = dict(destinationSkin.data, weights=weights)
+
+    # queries return the weights of every influence of the first vertex, a set replaces the weights of the given
+    # influences on every vertex
+    def skinPercent(self, skinName, *args, **kwargs):
+        skin = self.scene.GetNode(skinName)
+        verts = []
+        for name in Flatten(args):
+            vertSpec = VertSpecPattern.match(name)
+            verts += range(int(vertSpec["start"]), int(vertSpec["end"] or vertSpec["start"]) + 1)
+
+        if Flag(kwargs, "q", "query"):
+            return skin.data["weights"][verts[0]].tolist()
+
+        columns = {jnt.name: i for i, jnt in enumerate(skin.data["influences"])}
+        weights = np.array(skin.data["weights"])
+        for jnt, weight in Flag(kwargs, "tv", "transformValue", []):
+            weights[verts, columns[jnt]] = weight
+        if Flag(kwargs, "nrm", "normalize", True):
+            totals = weights[verts].sum(axis=1, keepdims=True)
+            weights[verts] = np.divide(weights[verts], totals, out=np.zeros_like(weights[verts]), where=totals > 0)
+        skin.data = dict(skin.data, weights=weights)
+
+    def orientConstraint(self, *args, **kwargs):
+        nodes = self.GetNodes(args)
+        constrained = nodes.pop()
+        constraints = [child for child in constrained.children if child.type == "orientConstraint"]
+        if constraints:
+            constraint = constraints[0]
+        else:
+            constraint = self.scene.CreateNode("orientConstraint", constrained.name + "_orientConstraint1", constrained)
+            constraint.data = {"targets": []}
+            self.scene.Connect(constraint, "constraintRotate", constrained, "rotate")
+
+        for target in nodes:
+            index = len(constraint.data["targets"])
+            constraint.data = {"targets": constraint.data["targets"] + [target]}
+            constraint.attrs[f"{target.name}W{index}"] = 1.0
+            self.scene.Connect(target, "rotate", constraint, f"target[{index}].targetRotate")
+        return [constraint.name]
+
+    def poleVectorConstraint(self, *args, **kwargs):
+        target, handle = self.GetNodes(args)[:2]
+        constraint = self.scene.CreateNode("poleVectorConstraint", handle.name + "_poleVectorConstraint1", handle)
+        constraint.attrs[f"{target.name}W0"] = 1.0
+        self.scene.Connect(target, "translate", constraint, "target[0].targetTranslate")
+        self.scene.Connect(constraint, "constraintTranslate", handle, "poleVector")
+        return [constraint.name]
+
+    # the pole vector starts out in the plane of the chain, perpendicular to the start to end line
+    def ikHandle(self, **kwargs):
+        startJnt = self.scene.GetNode(Flag(kwargs, "sj", "startJoint", None))
+        endJnt = self.scene.GetNode(Flag(kwargs, "ee", "endEffector", None))
+        handle = self.scene.CreateNode("ikHandle", Flag(kwargs, "n", "name", None) or "ikHandle1")
+        effector = self.scene.CreateNode("ikEffector", "effector1", endJnt.GetParent())
+        handle.attrs["translate"] = tuple(self.scene.GetWorldTranslate(endJnt).tolist())
+
+        start = self.scene.GetWorldTranslate(startJnt)
+        startToEnd = self.scene.GetWorldTranslate(endJnt) - start
+        startToMid = self.scene.GetWorldTranslate(endJnt.GetParent()) - start
+        poleVector = startToMid - startToEnd * np.dot(startToMid, startToEnd) / max(np.dot(startToEnd, startToEnd), 1e-12)
+        if np.linalg.norm(poleVector) > 1e-9:
+            handle.attrs["poleVector"] = tuple((poleVector / np.linalg.norm(poleVector)).tolist())
+
+        self.scene.Connect(startJnt, "message", handle, "startJoint")
+        self.scene.Connect(effector, "message", handle, "endEffector")
+        return [handle.name, effector.name]
+
+    # connects the plugs the expression reads to its inputs and its outputs to the plugs it writes
+    def expression(self, **kwargs):
+        script = Flag(kwargs, "s", "string", "")
+        expression = self.scene.CreateNode("expression", Flag(kwargs, "n", "name", None))
+        expression.data = {"string": script}
+        inputCount = 0
+        outputCount = 0
+        for statement in script.split(";"):
+            parts = statement.split("=")
+            for nodeName, attr in PlugPattern.findall(parts[-1]):
+                self.scene.Connect(self.scene.GetNode(nodeName), AttrAliases.get(attr, attr), expression, f"input[{inputCount}]")
+                inputCount += 1
+            for part in parts[:-1]:
+                for nodeName, attr in PlugPattern.findall(part):
+                    self.scene.Connect(expression, f"output[{outputCount}]", self.scene.GetNode(nodeName), AttrAliases.get(attr, attr))
+                    outputCount += 1
+        return expression.name
+
+    def setKeyframe(self, plug, **kwargs):
+        node, attr = self.scene.GetPlug(plug)
+        frame = float(Flag(kwargs, "t", "time", self.scene.currentTime))
+        value = Flag(kwargs, "v", "value", None)
+        value = self.getAttr(plug) if value is None else value
+
+        source = node.inputs.get(attr)
+        if source and IsType(source[0].type, "animCurve"):
+            curve = source[0]
+        else:
+            curve = self.scene.CreateNode("animCurveTU", f"{node.name}_{attr}")
+            curve.data = {"keys": {}}
+            self.scene.Connect(curve, "output", node, attr)
+
+        curve.data = {"keys": dict(curve.data["keys"], **{str(frame): float(value)})}
+        self.setAttr(plug, value)
+        return 1
+
+    def keyframe(self, *args, **kwargs):
+        values = []
+        for curve in self.GetNodes(args):
+            for frame, value in sorted(curve.data["keys"].items(), key=lambda key: float(key[0])):
+                if Flag(kwargs, "tc", "timeChange"):
+                    values.append(float(frame))
+                if Flag(kwargs, "vc", "valueChange"):
+                    values.append(value)
+        return values
+
+    def currentTime(self, *args, **kwargs):
+        if Flag(kwargs, "q", "query"):
+            return self.scene.currentTime
+        self.scene.currentTime = float(args[0])
+        return self.scene.currentTime
+
+    def playbackOptions(self, **kwargs):
+        ranges = {"min": (self.scene.playbackRange, 0), "max": (self.scene.playbackRange, 1), "ast": (self.scene.animationRange, 0), "aet": (self.scene.animationRange, 1)}
+        for flag, longFlag in (("min", "minTime"), ("max", "maxTime"), ("ast", "animationStartTime"), ("aet", "animationEndTime")):
+            value = Flag(kwargs, flag, longFlag, None)
+            if value is None:
+                continue
+
+            frameRange, index = ranges[flag]
+            if Flag(kwargs, "q", "query"):
+                return frameRange[index]
+            frameRange[index] = float(value)
+
+    # one snapshot is taken when the outermost chunk opens. like in maya the chunk is dropped if no command edited the
+    # scene in it, undo restores the snapshot of the last recorded chunk. edits outside of chunks are not recorded.
+    def undoInfo(self, **kwargs):
+        if Flag(kwargs, "q", "query"):
+            if Flag(kwargs, "un", "undoName"):
+                return self.scene.undoStack[-1][0] if self.scene.undoStack else ""
+            return True
+
+        if Flag(kwargs, "ock", "openChunk"):
+            if self.scene.undoDepth == 0:
+                self.scene.openChunk = (Flag(kwargs, "cn", "chunkName", ""), self.scene.Snapshot(), self.scene.editCount)
+            self.scene.undoDepth += 1
+        if Flag(kwargs, "cck", "closeChunk") and self.scene.undoDepth:
+            self.scene.undoDepth -= 1
+            if self.scene.undoDepth == 0:
+                chunkName, snapshot, editCount = self.scene.openChunk
+                self.scene.openChunk = None
+                if self.scene.editCount != editCount:
+                    self.scene.undoStack.append((chunkName, snapshot))
+
+    def undo(self):
+        if self.scene.undoStack:
+            self.scene.Restore(self.scene.undoStack.pop()[1])
+
+    def refresh(self, **kwargs):
+        pass
+
+    def about(self, **kwargs):
+        return True if Flag(kwargs, "batch", "batch") else ""
+
+    def file(self, *args, **kwargs):
+        if Flag(kwargs, "q", "query"):
+            return self.scene.fileName
+        if Flag(kwargs, "new", "newFile"):
+            self.scene.__init__()
+            return ""
+        if Flag(kwargs, "o", "open"):
+            self.scene.Load(args[0])
+            return args[0]
+        if Flag(kwargs, "rn", "rename"):
+            self.scene.fileName = Flag(kwargs, "rn", "rename")
+            return self.scene.fileName
+        if Flag(kwargs, "s", "save"):
+            self.scene.Save(self.scene.fileName)
+            return self.scene.fileName
+        raise NotImplementedError("the in-memory scene can only create, open and save scenes")
+
+    def internalVar(self, **kwargs):
+        return tempfile.gettempdir().replace("\\", "/") + "/"
+
+    def loadPlugin(self, *args, **kwargs):
+        return list(args)
+
+# serves the mesh and skin queries of MayaMeshData from the arrays stored in the scene
+class MemorySceneMeshData:
+    def __init__(self, scene):
+        self.scene = scene
+
+    def GetSkinNode(self, skin):
+        node = self.scene.GetNode(skin)
+        if node.type != "skinCluster":
+            raise TypeError(f"{skin} is not a skinCluster!")
+        return node
+
+    def GetSkinInfluences(self, skin):
+        return [jnt.name for jnt in self.GetSkinNode(skin).data["influences"]]
+
+    def GetSkinWeights(self, skin):
+        return np.array(self.GetSkinNode(skin).data["weights"])
+
+    def SetSkinWeights(self, skin, weights):
+        node = self.GetSkinNode(skin)
+        weights = np.array(weights, dtype=np.float64)
+        if weights.shape != node.data["weights"].shape:
+            raise ValueError(f"{skin} expects weights of shape {node.data['weights'].shape}, got {weights.shape}")
+        node.data = dict(node.data, weights=weights)
+
+    def CreateMesh(self, parent, faceCounts, faceVerts, points):
+        return self.scene.CreateMeshShape(self.scene.GetNode(parent), faceCounts, faceVerts, points).name
+
+    def GetMeshFaces(self, mesh):
+        shape = self.scene.GetMeshShape(self.scene.GetNode(mesh))
+        return np.array(shape.data["faceCounts"]), np.array(shape.data["faceVerts"])
+
+    def GetMeshPoints(self, mesh):
+        return np.array(self.scene.GetMeshShape(self.scene.GetNode(mesh)).data["points"])
+
+class MVector:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        return MVector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return MVector(self.x / scalar, self.y / scalar, self.z / scalar)
+
+    def __neg__(self):
+        return MVector(-self.x, -self.y, -self.z)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        length = self.length()
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return self
+
+    def __repr__(self):
+        return f"MVector({self.x}, {self.y}, {self.z})"
+
+# qt classes accept any construction and return another inert object for every attribute and call, so the tool
+# widgets can be built and never shown
+class InertMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return InertObject()
+
+class InertObject(metaclass=InertMeta):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return InertObject()
+
+    def __call__(self, *args, **kwargs):
+        return InertObject()
+
+    def __iter__(self):
+        return iter(())
+
+    def __int__(self):
+        return 0
+
+# api classes can be imported, but using them raises, the in-memory scene has no api
+class UnavailableMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        raise NotImplementedError(f"{cls.__module__}.{cls.__name__}.{name} is not available in the in-memory scene")
+
+    def __call__(cls, *args, **kwargs):
+        raise NotImplementedError(f"{cls.__module__}.{cls.__name__} is not available in the in-memory scene")
+
+def CreateStandInModule(name, ClassMeta = None, BaseClass = object, isPackage = False):
+    module = types.ModuleType(name)
+    if isPackage:
+        module.__path__ = []
+
+    classes = {}
+    def GetClass(attr):
+        if attr.startswith("__") or ClassMeta is None:
+            raise AttributeError(f"module {name} has no attribute {attr}")
+        if attr not in classes:
+            classes[attr] = ClassMeta(attr, (BaseClass,), {"__module__": name})
+        return classes[attr]
+
+    module.__getattr__ = GetClass
+    return module
+
+activeCommands = None
+
+# commands that never edit the scene, any other command counts as an edit unless it is a query
+QueryCommands = {"ls", "objExists", "objectType", "listRelatives", "listConnections", "getAttr", "attributeQuery", "keyframe", "currentTime", "playbackOptions", "undoInfo", "undo", "refresh", "about", "internalVar", "loadPlugin", "length", "normalize"}
+
+def CreateCommand(name):
+    def Command(*args, **kwargs):
+        activeCommands.scene.commandCounts[name] += 1
+        if name not in QueryCommands and not Flag(kwargs, "q", "query"):
+            activeCommands.scene.editCount += 1
+        return getattr(activeCommands, name)(*args, **kwargs)
+    Command.__name__ = name
+    return Command
+
+def CreateCmdsModule():
+    module = types.ModuleType("maya.cmds")
+    for name in dir(MemoryCmds):
+        if name[0].islower():
+            setattr(module, name, CreateCommand(name))
+
+    def GetMissingCommand(name):
+        raise AttributeError(f"maya.cmds.{name} is not implemented by the in-memory scene")
+    module.__getattr__ = GetMissingCommand
+    return module
+
+def MelEval(command):
+    activeCommands.scene.commandCounts["mel.eval"] += 1
+    activeCommands.scene.melCommands.append(command)
+
+def CreateMelModule():
+    module = types.ModuleType("maya.mel")
+    module.eval = MelEval
+    return module
+
+# scripts written for mayapy initialize maya.standalone first, the in-memory scene is ready as soon as it is installed
+def CreateStandaloneModule():
+    module = types.ModuleType("maya.standalone")
+    module.initialize = lambda name = "python": None
+    module.uninitialize = lambda: None
+    return module
+
+def CreateStandInModules():
+    modules = {
+        "maya": CreateStandInModule("maya", isPackage=True),
+        "maya.cmds": CreateCmdsModule(),
+        "maya.mel": CreateMelModule(),
+        "maya.standalone": CreateStandaloneModule(),
+        "maya.OpenMaya": CreateStandInModule("maya.OpenMaya", UnavailableMeta),
+        "maya.OpenMayaUI": CreateStandInModule("maya.OpenMayaUI", InertMeta, InertObject),
+        "maya.OpenMayaAnim": CreateStandInModule("maya.OpenMayaAnim", UnavailableMeta),
+        "maya.api": CreateStandInModule("maya.api", isPackage=True),
+        "maya.api.OpenMaya": CreateStandInModule("maya.api.OpenMaya", UnavailableMeta),
+        "maya.api.OpenMayaAnim": CreateStandInModule("maya.api.OpenMayaAnim", UnavailableMeta),
+        "maya.api.MDGContextGuard": CreateStandInModule("maya.api.MDGContextGuard", UnavailableMeta),
+        "shiboken2": CreateStandInModule("shiboken2", InertMeta, InertObject),
+        "PySide2": CreateStandInModule("PySide2", isPackage=True),
+        "PySide2.QtWidgets": CreateStandInModule("PySide2.QtWidgets", InertMeta, InertObject),
+        "PySide2.QtGui": CreateStandInModule("PySide2.QtGui", InertMeta, InertObject),
+        "PySide2.QtCore": CreateStandInModule("PySide2.QtCore", InertMeta, InertObject),
+    }
+    modules["maya.OpenMaya"].MVector = MVector
+    modules["shiboken2"].wrapInstance = InertObject
+
+    for name, module in modules.items():
+        if "." in name:
+            packageName, moduleName = name.rsplit(".", 1)
+            setattr(modules[packageName], moduleName, module)
+    return modules
+
+installedModules = {}
+
+# installs the stand-in modules the first time and points maya.cmds at the given scene, or a new empty one. the
+# tools have to be imported after the first install.
+def InstallMemoryMaya(scene = None):
+    global activeCommands
+    activeCommands = MemoryCmds(scene or MemoryScene())
+    if not installedModules:
+        installedModules.update(CreateStandInModules())
+    sys.modules.update(installedModules)
+    return activeCommands.scene
+
+# MemorySceneMeshData of whatever scene is installed, for tools that create their own MayaMeshData
+class ActiveSceneMeshData(MemorySceneMeshData):
+    def __init__(self):
+        super().__init__(activeCommands.scene)
+
+# runs a script written for mayapy against the in-memory scene, with the remaining arguments as its sys.argv, e.g.
+# python MemoryMaya.py BatchExport.py --worker job.json. it can be given as BatchExport's --worker-command. the tools
+# the script imports read meshes and skins through ActiveSceneMeshData instead of the api.
+def RunScript(args):
+    InstallMemoryMaya()
+    import MeshData
+    MeshData.MayaMeshData = ActiveSceneMeshData
+    sys.argv = list(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args[0])))
+    runpy.run_path(args[0], run_name="__main__")
+
+if __name__ == "__main__":
+    # through the import, so pickled scenes refer to MemoryMaya and not to __main__
+    import MemoryMaya
+    MemoryMaya.RunScript(sys.argv[1:])
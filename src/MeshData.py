@@ -0,0 +1,97 @@
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+def GetDependNode(name):
+    selection = om.MSelectionList()
+    selection.add(name)
+    return selection.getDependNode(0)
+
+def GetDagPath(name):
+    selection = om.MSelectionList()
+    selection.add(name)
+    return selection.getDagPath(0)
+
+def GetCompleteVertexComponent(vertCount):
+    componentFn = om.MFnSingleIndexedComponent()
+    component = componentFn.create(om.MFn.kMeshVertComponent)
+    componentFn.setCompleteData(vertCount)
+    return component
+
+# reads mesh and skin data in bulk through the api, one call per array instead of one command per vertex.
+class MayaMeshData:
+    def GetSkinFn(self, skin):
+        return oma.MFnSkinCluster(GetDependNode(skin))
+
+    def GetSkinShapePath(self, skinFn):
+        return skinFn.getPathAtIndex(skinFn.indexForOutputConnection(0))
+
+    def GetSkinInfluences(self, skin):
+        return [path.partialPathName() for path in self.GetSkinFn(skin).influenceObjects()]
+
+    # returns a vertex x influence array, columns in the order of GetSkinInfluences
+    def GetSkinWeights(self, skin):
+        skinFn = self.GetSkinFn(skin)
+        shapePath = self.GetSkinShapePath(skinFn)
+        vertCount = om.MFnMesh(shapePath).numVertices
+        weights, influenceCount = skinFn.getWeights(shapePath, GetCompleteVertexComponent(vertCount))
+        return np.array(weights, dtype=np.float64).reshape(vertCount, influenceCount)
+
+    # weights is a vertex x influence array covering every vertex, columns in the order of GetSkinInfluences
+    def SetSkinWeights(self, skin, weights):
+        skinFn = self.GetSkinFn(skin)
+        shapePath = self.GetSkinShapePath(skinFn)
+        vertCount, influenceCount = weights.shape
+        influenceIndices = om.MIntArray(list(range(influenceCount)))
+        flatWeights = om.MDoubleArray(np.ascontiguousarray(weights, dtype=np.float64).ravel().tolist())
+        skinFn.setWeights(shapePath, GetCompleteVertexComponent(vertCount), influenceIndices, flatWeights, normalize=False)
+
+    # returns per face vertex counts and the flattened vertex indices of all faces
+    def GetMeshFaces(self, mesh):
+        shapePath = GetDagPath(mesh)
+        shapePath.extendToShape()
+        faceCounts, faceVerts = om.MFnMesh(shapePath).getVertices()
+        return np.array(faceCounts, dtype=np.int64), np.array(faceVerts, dtype=np.int64)
+
+    # creates a mesh shape under the given transform from api style arrays, returns the shape name
+    def CreateMesh(self, parent, faceCounts, faceVerts, points):
+        meshFn = om.MFnMesh()
+        meshFn.create(om.MPointArray(points.tolist()), om.MIntArray(faceCounts.tolist()), om.MIntArray(faceVerts.tolist()), parent=GetDependNode(parent))
+        return meshFn.setName(parent.split("|")[-1] + "Shape")
+
+    # returns a vertex x 3 array of object space positions
+    def GetMeshPoints(self, mesh):
+        shapePath = GetDagPath(mesh)
+        shapePath.extendToShape()
+        points = om.MFnMesh(shapePath).getPoints(om.MSpace.kObject)
+        return np.array([(point.x, point.y, point.z) for point in points], dtype=np.float64)
+
+# stand-in backend that serves the same queries from arrays kept in memory, for benchmarking without maya.
+class MemoryMeshData:
+    def __init__(self):
+        self.skins = {}
+        self.meshes = {}
+
+    def AddSkin(self, skin, influences, weights):
+        self.skins[skin] = (list(influences), np.asarray(weights, dtype=np.float64))
+
+    def AddMesh(self, mesh, faceCounts, faceVerts, points = None):
+        faceVerts = np.asarray(faceVerts, dtype=np.int64)
+        if points is None:
+            points = np.zeros((faceVerts.max() + 1, 3))
+        self.meshes[mesh] = (np.asarray(faceCounts, dtype=np.int64), faceVerts, np.asarray(points, dtype=np.float64))
+
+    def GetSkinInfluences(self, skin):
+        return list(self.skins[skin][0])
+
+    def GetSkinWeights(self, skin):
+        return self.skins[skin][1]
+
+    def SetSkinWeights(self, skin, weights):
+        self.skins[skin] = (self.skins[skin][0], np.asarray(weights, dtype=np.float64))
+
+    def GetMeshFaces(self, mesh):
+        return self.meshes[mesh][:2]
+
+    def GetMeshPoints(self, mesh):
+        return self.meshes[mesh][2]
@@ -0,0 +1,252 @@
+import inspect
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import maya.cmds as mc
+from PySide2.QtWidgets import QLabel, QProgressBar, QPushButton, QVBoxLayout, QMessageBox
+from PySide2.QtCore import Qt, QTimer
+from MayaUtils import QMayaWindow
+
+# long operations split into stages. a scene stage is a function that returns a generator yielding its own progress
+# from 0 to 1 between chunks of work, or a plain function for short stages. a data stage is a plain function that must
+# not touch the scene, it runs on a worker thread while the stages before and after it run on the main thread.
+# stages share state through the object whose methods they are.
+class Pipeline:
+    def __init__(self, name, undoable = True):
+        self.name = name
+        self.undoable = undoable
+        self.stages = []
+
+    def AddStage(self, label, Stage, weight = 1.0):
+        self.stages.append((label, Stage, weight, False))
+
+    def AddDataStage(self, label, Function, weight = 1.0):
+        self.stages.append((label, Function, weight, True))
+
+    # runs every stage to the end on the calling thread, for scripts and batch mode
+    def Run(self):
+        pipelineRun = PipelineRun(self)
+        pipelineRun.Start()
+        while pipelineRun.Step(float("inf")):
+            pass
+
+# undo chunks recorded one time slice at a time, so none stays open between ticks of the event loop. maya drops a
+# chunk in which nothing undoable ran, a chunk only counts if it is the one to undo once it is closed. Undo undoes the
+# recorded chunks from the last one and stops at anything else on the undo queue, like edits made between slices.
+class UndoChunks:
+    def __init__(self, name):
+        self.name = name
+        self.chunkPrefix = f"{name} {uuid.uuid4().hex[:8]}"
+        self.chunkName = None
+        self.recordedChunks = []
+
+    def Open(self):
+        if not self.chunkName:
+            self.chunkName = f"{self.chunkPrefix} {len(self.recordedChunks) + 1}"
+            mc.undoInfo(openChunk=True, chunkName=self.chunkName)
+
+    def Close(self):
+        if not self.chunkName:
+            return
+
+        mc.undoInfo(closeChunk=True)
+        if mc.undoInfo(q=True, undoName=True) == self.chunkName:
+            self.recordedChunks.append(self.chunkName)
+        self.chunkName = None
+
+    def Undo(self):
+        self.Close()
+        while self.recordedChunks and mc.undoInfo(q=True, undoName=True) == self.recordedChunks[-1]:
+            mc.undo()
+            self.recordedChunks.pop()
+
+        if self.recordedChunks:
+            print(f"could not undo {len(self.recordedChunks)} steps of {self.name}, the scene was edited after them")
+
+# drives a pipeline in time slices. an undoable pipeline records each time slice that runs a scene stage in an undo
+# chunk of its own, opened when the slice reaches a scene stage and closed before it returns, so no chunk stays open
+# between ticks of the event loop or while a data stage runs. cancelling or a failing stage undoes the chunks the run
+# recorded, and nothing else.
+class PipelineRun:
+    def __init__(self, pipeline: Pipeline):
+        self.pipeline = pipeline
+        self.stageIndex = 0
+        self.stageProgress = 0.0
+        self.generator = None
+        self.future = None
+        self.executor = None
+        self.startTime = 0.0
+        self.isRunning = False
+        self.undoChunks = UndoChunks(pipeline.name)
+
+    def Start(self):
+        self.startTime = time.perf_counter()
+        self.executor = ThreadPoolExecutor(1)
+        self.isRunning = True
+
+    def GetStageLabel(self):
+        if self.stageIndex < len(self.pipeline.stages):
+            return self.pipeline.stages[self.stageIndex][0]
+        return "Done"
+
+    def GetProgress(self):
+        weights = [weight for label, Stage, weight, isDataStage in self.pipeline.stages]
+        doneWeight = sum(weights[:self.stageIndex])
+        if self.stageIndex < len(weights):
+            doneWeight += weights[self.stageIndex] * self.stageProgress
+        return doneWeight / sum(weights) if weights else 1.0
+
+    # seconds left, estimated from the progress so far, or None before there is any
+    def GetEta(self):
+        progress = self.GetProgress()
+        if progress <= 0:
+            return None
+        return (time.perf_counter() - self.startTime) * (1 - progress) / progress
+
+    def NextStage(self):
+        self.stageIndex += 1
+        self.stageProgress = 0.0
+        self.generator = None
+        self.future = None
+
+    # advances the pipeline for up to timeSlice seconds, returns whether it is still running
+    def Step(self, timeSlice = 0.05):
+        deadline = time.perf_counter() + timeSlice
+        try:
+            while self.stageIndex < len(self.pipeline.stages):
+                label, Stage, weight, isDataStage = self.pipeline.stages[self.stageIndex]
+                if isDataStage:
+                    self.CloseChunk()
+                    if not self.future:
+                        self.future = self.executor.submit(Stage)
+                    if timeSlice == float("inf"):
+                        self.future.result()
+                    if not self.future.done():
+                        return True
+                    self.future.result()
+                    self.NextStage()
+                elif not self.generator:
+                    self.OpenChunk()
+                    result = Stage()
+                    if inspect.isgenerator(result):
+                        self.generator = result
+                    else:
+                        self.NextStage()
+                else:
+                    self.OpenChunk()
+                    try:
+                        self.stageProgress = next(self.generator) or self.stageProgress
+                    except StopIteration:
+                        self.NextStage()
+
+                if time.perf_counter() >= deadline:
+                    return True
+        except BaseException:
+            self.Rollback()
+            raise
+        finally:
+            self.CloseChunk()
+
+        self.Finish()
+        return False
+
+    def OpenChunk(self):
+        if self.pipeline.undoable:
+            self.undoChunks.Open()
+
+    def CloseChunk(self):
+        self.undoChunks.Close()
+
+    def Finish(self):
+        self.isRunning = False
+        self.executor.shutdown(wait=False)
+
+    def Rollback(self):
+        if not self.isRunning:
+            return
+
+        self.isRunning = False
+        if self.generator:
+            self.OpenChunk()
+            self.generator.close()
+        self.CloseChunk()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.undoChunks.Undo()
+
+    def Cancel(self):
+        self.Rollback()
+        print(f"cancelled {self.pipeline.name} at {self.GetStageLabel()}")
+
+# runs a pipeline from the event loop, one time slice per timer tick, with its progress, an eta and a cancel button.
+# the window is modal so the scene is not edited between the time slices of the run.
+class PipelineWindow(QMayaWindow):
+    def __init__(self, pipeline: Pipeline, timeSlice = 0.05):
+        super().__init__()
+        self.pipelineRun = PipelineRun(pipeline)
+        self.timeSlice = timeSlice
+        self.setWindowTitle(pipeline.name)
+        self.setWindowModality(Qt.ApplicationModal)
+
+        self.masterLayout = QVBoxLayout()
+        self.setLayout(self.masterLayout)
+
+        self.stageLabel = QLabel()
+        self.masterLayout.addWidget(self.stageLabel)
+
+        self.progressBar = QProgressBar()
+        self.progressBar.setRange(0, 1000)
+        self.masterLayout.addWidget(self.progressBar)
+
+        self.etaLabel = QLabel()
+        self.masterLayout.addWidget(self.etaLabel)
+
+        cancelBtn = QPushButton("Cancel")
+        cancelBtn.clicked.connect(self.CancelBtnClicked)
+        self.masterLayout.addWidget(cancelBtn)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(10)
+        self.timer.timeout.connect(self.Tick)
+
+    def Start(self):
+        self.pipelineRun.Start()
+        self.UpdateProgress()
+        self.show()
+        self.timer.start()
+
+    def Tick(self):
+        try:
+            isRunning = self.pipelineRun.Step(self.timeSlice)
+        except Exception as e:
+            self.timer.stop()
+            self.close()
+            QMessageBox().critical(None, "Error", f"{e}")
+            return
+
+        self.UpdateProgress()
+        if not isRunning:
+            self.timer.stop()
+            self.close()
+
+    def UpdateProgress(self):
+        self.stageLabel.setText(self.pipelineRun.GetStageLabel())
+        self.progressBar.setValue(int(self.pipelineRun.GetProgress() * 1000))
+        eta = self.pipelineRun.GetEta()
+        self.etaLabel.setText("estimating time left..." if eta is None else f"about {eta:.0f}s left")
+
+    def CancelBtnClicked(self):
+        self.close()
+
+    def closeEvent(self, event):
+        if self.pipelineRun.isRunning:
+            self.timer.stop()
+            self.pipelineRun.Cancel()
+        super().closeEvent(event)
+
+    def GetWindowHash(self):
+        return "b3f58d2e71c94a06a8e5d1c7f20b6e49"
+
+def RunPipeline(pipeline: Pipeline):
+    window = PipelineWindow(pipeline)
+    window.Start()
+    return window
@@ -0,0 +1,243 @@
+import numpy as np
+from ProxyPartition import GetDominantInfluences, HashArrays, HashSegmentWeights, PartitionProxyMeshByOwners
+
+# everything in this module works on plain arrays and does not import maya, so it can run in worker processes.
+
+# quadric error decimation of proxy segments. every pass collapses a set of edges that share no triangle, chosen by
+# lowest error, so the whole pass is a handful of array operations over every segment. a collapse keeps one of the edge's vertices where
+# it is, so every decimated vertex is a source vertex and keeps its skin weights. vertices on open edges, which are
+# the cut between neighbouring segments and the open borders of the mesh, are never removed.
+
+# a collapse may turn no triangle further than this cosine, about 60 degrees
+MaxNormalTurn = 0.5
+# errors below this fraction of the squared bounding box diagonal count as zero
+CostTolerance = 1e-10
+# edges left over after this many selection rounds wait for the next pass
+MaxSelectionRounds = 8
+
+class DecimatedMesh:
+    def __init__(self, faceCounts, faceVerts, points, sourceVerts, sourceTriCount):
+        self.faceCounts = faceCounts
+        self.faceVerts = faceVerts
+        self.points = points
+        self.sourceVerts = sourceVerts
+        self.sourceTriCount = sourceTriCount
+        self.pointHash = HashArrays(points)
+
+# fan triangulation of every face, keeping the winding
+def TriangulateFaces(faceCounts, faceVerts):
+    triCounts = faceCounts - 2
+    triFaces = np.repeat(np.arange(len(faceCounts)), triCounts)
+    corners = np.arange(triCounts.sum()) - np.repeat(np.cumsum(triCounts) - triCounts, triCounts)
+    firstCorners = (np.cumsum(faceCounts) - faceCounts)[triFaces]
+    return np.stack([faceVerts[firstCorners], faceVerts[firstCorners + corners + 1], faceVerts[firstCorners + corners + 2]], axis=1)
+
+def GetTriangleNormals(points, tris):
+    first = points[tris[:, 0]]
+    a = points[tris[:, 1]] - first
+    b = points[tris[:, 2]] - first
+    return np.stack([a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1], a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2], a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]], axis=1)
+
+# sum of the area weighted plane quadrics of the triangles around every vertex, as a vertex x 4 x 4 array
+def GetVertexQuadrics(points, tris):
+    normals = GetTriangleNormals(points, tris)
+    doubleAreas = np.linalg.norm(normals, axis=1)
+    unitNormals = np.divide(normals, doubleAreas[:, None], out=np.zeros_like(normals), where=doubleAreas[:, None] > 0)
+    planes = np.concatenate([unitNormals, -(unitNormals * points[tris[:, 0]]).sum(axis=1, keepdims=True)], axis=1)
+    triQuadrics = (planes[:, :, None] * planes[:, None, :] * doubleAreas[:, None, None] / 2).reshape(-1, 16)
+
+    cornerVerts = tris.ravel()
+    quadrics = np.stack([np.bincount(cornerVerts, np.repeat(triQuadrics[:, i], 3), len(points)) for i in range(16)], axis=1)
+    return quadrics.reshape(-1, 4, 4)
+
+# unique edges as sorted vertex pairs, with the number of triangles using each
+def GetEdges(tris, vertCount):
+    edges = np.sort(tris[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    keys, counts = np.unique(edges[:, 0] * vertCount + edges[:, 1], return_counts=True)
+    return np.stack([keys // vertCount, keys % vertCount], axis=1), counts
+
+def RemoveDegenerateTriangles(tris):
+    valid = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 2] != tris[:, 0])
+    tris = tris[valid]
+    unique = np.unique(np.sort(tris, axis=1), axis=0, return_index=True)[1]
+    return tris[np.sort(unique)]
+
+# triangles around every vertex as a csr layout, the triangles of vertex i are vertTris[offsets[i]:offsets[i + 1]]
+def GetVertexTriangles(tris, vertCount):
+    cornerVerts = tris.ravel()
+    order = np.argsort(cornerVerts, kind="stable")
+    offsets = np.zeros(vertCount + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cornerVerts, minlength=vertCount), out=offsets[1:])
+    return offsets, order // 3
+
+# whether moving the removed vertex of each collapse onto the kept one flips or folds a triangle around it
+def GetFlippingCollapses(points, tris, triNormals, vertTriangles, removed, kept):
+    offsets, vertTris = vertTriangles
+    counts = offsets[removed + 1] - offsets[removed]
+    pairCollapses = np.repeat(np.arange(len(removed)), counts)
+    pairTris = vertTris[np.repeat(offsets[removed] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+    oldTris = tris[pairTris]
+    pairRemoved = removed[pairCollapses][:, None]
+    pairKept = kept[pairCollapses][:, None]
+    newTris = np.where(oldTris == pairRemoved, pairKept, oldTris)
+    surviving = ~(oldTris == pairKept).any(axis=1)
+    oldNormals = triNormals[pairTris]
+    newNormals = GetTriangleNormals(points, newTris)
+    cosines = (oldNormals * newNormals).sum(axis=1)
+    flipped = surviving & (cosines <= MaxNormalTurn * np.linalg.norm(oldNormals, axis=1) * np.linalg.norm(newNormals, axis=1))
+    return np.bincount(pairCollapses[flipped], minlength=len(removed)) > 0
+
+# one pass of collapses, returns the remaining triangles or None if no edge can collapse any more. the mesh may hold
+# several disconnected groups of vertices, neededCounts is the number of collapses each group still needs.
+def CollapseEdges(points, tris, quadrics, vertGroups, neededCounts):
+    vertCount = len(points)
+    edges, counts = GetEdges(tris, vertCount)
+    locked = neededCounts[vertGroups] == 0
+    locked[edges[counts != 2].ravel()] = True
+
+    edges = edges[~(locked[edges[:, 0]] & locked[edges[:, 1]])]
+    if len(edges) == 0:
+        return None
+
+    u, v = edges[:, 0], edges[:, 1]
+    homogeneous = np.concatenate([points, np.ones((vertCount, 1))], axis=1)
+    edgeQuadrics = quadrics[u] + quadrics[v]
+    keepVCost = np.einsum("ei,eij,ej->e", homogeneous[v], edgeQuadrics, homogeneous[v])
+    keepUCost = np.einsum("ei,eij,ej->e", homogeneous[u], edgeQuadrics, homogeneous[u])
+    keepVCost[locked[u]] = np.inf
+    keepUCost[locked[v]] = np.inf
+    removeU = keepVCost <= keepUCost
+    removed = np.where(removeU, u, v)
+    kept = np.where(removeU, v, u)
+    costs = np.minimum(keepVCost, keepUCost)
+    # errors this close to zero are flat areas. their ties are broken in a fixed random order, in index order the
+    # lowest edges would line up and only one of them could collapse per round.
+    costs[costs < CostTolerance * (np.ptp(points, axis=0) ** 2).sum()] = 0
+    tieBreaks = np.random.default_rng(len(edges)).permutation(len(edges))
+
+    candidates = np.flatnonzero(np.isfinite(costs))
+    if len(candidates) == 0:
+        return None
+
+    # collapses may not share a triangle, so each one can be checked for flips on its own. every round takes the
+    # edges with the lowest error around them that flip nothing and drops the edges next to the ones taken, until
+    # enough are taken.
+    triNormals = GetTriangleNormals(points, tris)
+    vertTriangles = GetVertexTriangles(tris, vertCount)
+    noRank = len(edges)
+    ranks = np.full(len(edges), noRank)
+    ranks[candidates[np.lexsort((tieBreaks[candidates], costs[candidates]))]] = np.arange(len(candidates))
+    selected = []
+    selectedCount = 0
+    rounds = 0
+    while selectedCount < neededCounts.sum() and (ranks < noRank).any() and (rounds < MaxSelectionRounds or selectedCount == 0):
+        rounds += 1
+        active = np.flatnonzero(ranks < noRank)
+        vertRanks = np.full(vertCount, noRank)
+        np.minimum.at(vertRanks, u[active], ranks[active])
+        np.minimum.at(vertRanks, v[active], ranks[active])
+        triRanks = vertRanks[tris].min(axis=1)
+        aroundRanks = np.full(vertCount, noRank)
+        np.minimum.at(aroundRanks, tris.ravel(), np.repeat(triRanks, 3))
+        roundSelected = active[(aroundRanks[u[active]] == ranks[active]) & (aroundRanks[v[active]] == ranks[active])]
+
+        flipping = GetFlippingCollapses(points, tris, triNormals, vertTriangles, removed[roundSelected], kept[roundSelected])
+        ranks[roundSelected[flipping]] = noRank
+        roundSelected = roundSelected[~flipping]
+        selected.append(roundSelected)
+        selectedCount += len(roundSelected)
+
+        collapseVerts = np.zeros(vertCount, dtype=bool)
+        collapseVerts[u[roundSelected]] = True
+        collapseVerts[v[roundSelected]] = True
+        takenTris = collapseVerts[tris].any(axis=1)
+        blockedVerts = np.zeros(vertCount, dtype=bool)
+        blockedVerts[tris[takenTris].ravel()] = True
+        ranks[active[blockedVerts[u[active]] | blockedVerts[v[active]]]] = noRank
+
+    selected = np.concatenate(selected)
+    if len(selected) == 0:
+        return None
+
+    # every collapse removes about two triangles, each group stops at its target
+    groups = vertGroups[u[selected]]
+    selected = selected[np.lexsort((ranks[selected], groups))]
+    groups = vertGroups[u[selected]]
+    groupStarts = np.searchsorted(groups, groups)
+    selected = selected[np.arange(len(selected)) - groupStarts < neededCounts[groups]]
+
+    remap = np.arange(vertCount)
+    remap[removed[selected]] = kept[selected]
+    quadrics[kept[selected]] += quadrics[removed[selected]]
+    return RemoveDegenerateTriangles(remap[tris])
+
+# passes only get the triangles of the groups that are still above their target, groups that reached it or can not
+# collapse any further are set aside
+def DecimateTriangles(points, tris, vertGroups, targetTriCounts):
+    quadrics = GetVertexQuadrics(points, tris)
+    doneTris = [tris[:0]]
+    while len(tris):
+        triGroups = vertGroups[tris[:, 0]]
+        neededCounts = np.maximum(0, (np.bincount(triGroups, minlength=len(targetTriCounts)) - targetTriCounts + 1) // 2)
+        done = neededCounts[triGroups] == 0
+        doneTris.append(tris[done])
+        tris = tris[~done]
+        if not len(tris):
+            break
+
+        collapsedTris = CollapseEdges(points, tris, quadrics, vertGroups, neededCounts)
+        if collapsedTris is None:
+            doneTris.append(tris)
+            break
+        tris = collapsedTris
+    return np.concatenate(doneTris)
+
+# the decimator outputs triangles, so the ratio and the budget apply to the triangles of the source faces
+def GetTargetTriCount(triCount, ratio, faceBudget):
+    targetTriCount = int(np.ceil(triCount * ratio))
+    if faceBudget > 0:
+        targetTriCount = min(targetTriCount, faceBudget)
+    return max(1, targetTriCount)
+
+# triangles of a segment's faces in segment vertex indices
+def GetSegmentTriangles(segment, faceCounts, faceVerts):
+    faceMask = np.zeros(len(faceCounts), dtype=bool)
+    faceMask[segment.faces] = True
+    segmentFaceVerts = faceVerts[np.repeat(faceMask, faceCounts)]
+    return np.searchsorted(segment.verts, TriangulateFaces(faceCounts[segment.faces], segmentFaceVerts))
+
+# the segments are decimated together as one mesh of disconnected pieces, each with its own copy of its border
+# vertices, so a pass works on every segment at once
+def DecimatePartition(partition, faceCounts, faceVerts, points, ratio, faceBudget):
+    segments = [segment for segment in partition if segment is not None]
+    vertOffsets = np.cumsum([0] + [len(segment.verts) for segment in segments])
+    segmentTris = [GetSegmentTriangles(segment, faceCounts, faceVerts) + offset for segment, offset in zip(segments, vertOffsets)]
+    sourceTriCounts = [len(tris) for tris in segmentTris]
+    tris = np.concatenate(segmentTris)
+    vertGroups = np.repeat(np.arange(len(segments)), np.diff(vertOffsets))
+    targetTriCounts = np.array([GetTargetTriCount(triCount, ratio, faceBudget) for triCount in sourceTriCounts])
+    allVerts = np.concatenate([segment.verts for segment in segments])
+
+    tris = DecimateTriangles(points[allVerts], tris, vertGroups, targetTriCounts)
+    triGroups = vertGroups[tris[:, 0]]
+    tris = tris[np.argsort(triGroups, kind="stable")]
+    for segment, segmentTris, offset, sourceTriCount in zip(segments, np.split(tris, np.cumsum(np.bincount(triGroups, minlength=len(segments)))[:-1]), vertOffsets, sourceTriCounts):
+        segmentTris = segmentTris - offset
+        usedVerts = np.unique(segmentTris)
+        remap = np.full(len(segment.verts), -1, dtype=np.int64)
+        remap[usedVerts] = np.arange(len(usedVerts))
+        segment.decimated = DecimatedMesh(np.full(len(segmentTris), 3, dtype=np.int64), remap[segmentTris].ravel(), points[segment.verts[usedVerts]], segment.verts[usedVerts], sourceTriCount)
+
+# the partition, decimated unless the ratio is 1 and there is no face budget
+def PartitionAndDecimateProxyMesh(weights, faceCounts, faceVerts, points = None, ratio = 1.0, faceBudget = 0):
+    partition = PartitionAndDecimateProxyMeshByOwners(GetDominantInfluences(weights), weights.shape[1], faceCounts, faceVerts, points, ratio, faceBudget)
+    HashSegmentWeights(partition, weights)
+    return partition
+
+# the same from the dominant influences only, the caller hashes the segment weights with HashSegmentWeights
+def PartitionAndDecimateProxyMeshByOwners(owners, ownerCount, faceCounts, faceVerts, points = None, ratio = 1.0, faceBudget = 0):
+    partition = PartitionProxyMeshByOwners(owners, ownerCount, faceCounts, faceVerts)
+    if ratio < 1 or faceBudget > 0:
+        DecimatePartition(partition, faceCounts, faceVerts, points, ratio, faceBudget)
+    return partition
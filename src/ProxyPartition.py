@@ -0,0 +1,96 @@
+import hashlib
+import numpy as np
+
+# everything in this module works on plain arrays and does not import maya, so it can run in worker processes.
+
+class ProxySegment:
+    def __init__(self, faces, deleteRanges, verts, weightHash):
+        self.faces = faces
+        self.deleteRanges = deleteRanges
+        self.verts = verts
+        self.faceHash = HashArrays(faces)
+        self.weightHash = weightHash
+        self.decimated = None
+
+def HashArrays(*arrays):
+    hasher = hashlib.sha1()
+    for array in arrays:
+        hasher.update(np.ascontiguousarray(array).tobytes())
+    return hasher.hexdigest()
+
+def GetDominantInfluences(weights):
+    return np.argmax(weights, axis=1)
+
+# a face goes to every owner that owns at least one of its vertices, so neighbouring segments overlap on their borders
+# the same way polyListComponentConversion(fromVertex=True, toFace=True) did.
+def GetFaceOwnership(vertOwners, faceCounts, faceVerts, ownerCount):
+    faceCount = len(faceCounts)
+    faceIds = np.repeat(np.arange(faceCount, dtype=np.int64), faceCounts)
+    pairs = np.unique(vertOwners[faceVerts].astype(np.int64) * faceCount + faceIds)
+    pairOwners = pairs // faceCount
+    pairFaces = pairs % faceCount
+    splits = np.searchsorted(pairOwners, np.arange(1, ownerCount))
+    return np.split(pairFaces, splits)
+
+# vertices used by the given faces, in ascending order. deleting the other faces of a duplicate keeps the
+# remaining vertices in this order, so position i of the result is vertex i of the segment.
+def GetSegmentVertices(faces, faceCounts, faceVerts):
+    faceMask = np.zeros(len(faceCounts), dtype=bool)
+    faceMask[faces] = True
+    return np.unique(faceVerts[np.repeat(faceMask, faceCounts)])
+
+# influences that carry any weight on the given vertices, and those vertices' weights restricted to them
+def GetSegmentWeights(weights, segmentVerts):
+    segmentWeights = weights[segmentVerts]
+    usedInfluences = np.flatnonzero(segmentWeights.max(axis=0) > 0)
+    return usedInfluences, segmentWeights[:, usedInfluences]
+
+def GetComplementIndices(indices, count):
+    mask = np.ones(count, dtype=bool)
+    mask[indices] = False
+    return np.flatnonzero(mask)
+
+# sorted unique indices -> list of inclusive (start, end) runs
+def CompressRanges(indices):
+    indices = np.asarray(indices)
+    if len(indices) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = indices[np.concatenate(([0], breaks))]
+    ends = indices[np.concatenate((breaks - 1, [len(indices) - 1]))]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def GetComponentSpecs(obj, componentType, ranges):
+    specs = []
+    for start, end in ranges:
+        if start == end:
+            specs.append(f"{obj}.{componentType}[{start}]")
+        else:
+            specs.append(f"{obj}.{componentType}[{start}:{end}]")
+    return specs
+
+# one ProxySegment (or None if the influence owns no faces) per weight column
+def PartitionProxyMesh(weights, faceCounts, faceVerts):
+    partition = PartitionProxyMeshByOwners(GetDominantInfluences(weights), weights.shape[1], faceCounts, faceVerts)
+    HashSegmentWeights(partition, weights)
+    return partition
+
+# the partition from the dominant influence of every vertex alone. the segments have no weight hash yet, this is what
+# worker processes get instead of the full vertex x influence weight matrix.
+def PartitionProxyMeshByOwners(owners, ownerCount, faceCounts, faceVerts):
+    partition = []
+    for faces in GetFaceOwnership(owners, faceCounts, faceVerts, ownerCount):
+        if len(faces) == 0:
+            partition.append(None)
+            continue
+
+        deleteRanges = CompressRanges(GetComplementIndices(faces, len(faceCounts)))
+        verts = GetSegmentVertices(faces, faceCounts, faceVerts)
+        partition.append(ProxySegment(faces, deleteRanges, verts, None))
+    return partition
+
+def HashSegmentWeights(partition, weights):
+    for segment in partition:
+        if segment is not None:
+            segment.weightHash = HashArrays(weights[segment.verts])
@@ -1,18 +1,121 @@
-import importlib
-from PySide2.QtWidgets import QPushButton, QVBoxLayout
+import json
+import os
+import time
+import numpy as np
+from PySide2.QtWidgets import QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QFileDialog, QCheckBox
+from PySide2.QtGui import QDoubleValidator, QIntValidator
 import maya.cmds as mc
-import MayaUtils
-importlib.reload(MayaUtils)
 from MayaUtils import *
+from MeshData import MayaMeshData
+from ProxyPartition import GetComponentSpecs, GetDominantInfluences, GetSegmentWeights, HashArrays, HashSegmentWeights
+from ProxyDecimation import PartitionAndDecimateProxyMesh, PartitionAndDecimateProxyMeshByOwners
+from Pipeline import Pipeline, RunPipeline
+from SkinSnapshot import SaveMeshSkinSnapshot, RestoreMeshSkinSnapshot
 
 class ProxyRigger:
     def __init__(self):
         self.skin = ""
         self.model = ""
         self.jnts = []
+        self.influences = []
+        self.weights = None
+        self.faceCounts = None
+        self.faceVerts = None
+        self.points = None
+        self.topologyHash = ""
+        self.partition = None
+        # "index" and "closestPoint" give every segment a skinCluster with the source weights, "rigid" moves every
+        # segment with the world matrix of its joint instead, with no deformer to evaluate
+        self.weightTransferMode = "index"
+        # segments are decimated to this fraction of their triangles, and to at most decimateFaceBudget triangles if it
+        # is set
+        self.decimateRatio = 1.0
+        self.decimateFaceBudget = 0
+        self.decimationReport = {}
+        self.meshData = MayaMeshData()
 
     def CreateProxyRigFromSelectedMesh(self):
         mesh = mc.ls(sl=True)[0]
+        self.CreateProxyRigForMesh(mesh)
+
+    def CreateProxyRigForMesh(self, mesh):
+        self.LoadMesh(mesh)
+        self.PartitionMesh()
+        self.BuildProxyRig(self.partition)
+
+    # loading and building run in the scene, the partitioning and decimation only read the loaded arrays and run on a
+    # worker thread
+    def CreateProxyRigPipeline(self, mesh):
+        pipeline = Pipeline(f"Proxy Rig {mesh}")
+        pipeline.AddStage("Loading mesh", lambda: self.LoadMesh(mesh))
+        pipeline.AddDataStage("Partitioning faces", self.PartitionMesh, weight=5 if self.IsDecimating() else 2)
+        pipeline.AddStage("Building proxy segments", lambda: self.BuildProxyRigSteps(self.partition), weight=10)
+        return pipeline
+
+    def PartitionMesh(self):
+        self.partition = PartitionAndDecimateProxyMesh(self.weights, self.faceCounts, self.faceVerts, self.points, self.decimateRatio, self.decimateFaceBudget)
+
+    def IsDecimating(self):
+        return self.decimateRatio < 1 or self.decimateFaceBudget > 0
+
+    def GetDecimationSettings(self):
+        return [self.decimateRatio, self.decimateFaceBudget] if self.IsDecimating() else None
+
+    # meshes are loaded and built one after another, only the partitioning runs in the worker processes. the workers
+    # get the dominant influence of every vertex instead of the weights, the weight hashes are taken here. a
+    # workerCount of 0 partitions every mesh in this process instead.
+    def CreateProxyRigsForMeshes(self, meshes, workerCount = None):
+        if not meshes:
+            raise Exception("No skinned meshes to proxy rig!")
+
+        startTime = time.perf_counter()
+        if workerCount is None:
+            workerCount = min(len(meshes), os.cpu_count())
+
+        riggers = []
+        for mesh in meshes:
+            rigger = ProxyRigger()
+            rigger.weightTransferMode = self.weightTransferMode
+            rigger.decimateRatio = self.decimateRatio
+            rigger.decimateFaceBudget = self.decimateFaceBudget
+            rigger.meshData = self.meshData
+            riggers.append(rigger)
+
+        if workerCount == 0:
+            for rigger, mesh in zip(riggers, meshes):
+                rigger.CreateProxyRigForMesh(mesh)
+        else:
+            partitions = []
+            with CreateProcessPool(workerCount) as pool:
+                for rigger, mesh in zip(riggers, meshes):
+                    rigger.LoadMesh(mesh)
+                    owners = GetDominantInfluences(rigger.weights).astype(np.int32)
+                    partitions.append(pool.submit(PartitionAndDecimateProxyMeshByOwners, owners, rigger.weights.shape[1], rigger.faceCounts, rigger.faceVerts, rigger.points, self.decimateRatio, self.decimateFaceBudget))
+
+                for rigger, partition in zip(riggers, partitions):
+                    partition = partition.result()
+                    HashSegmentWeights(partition, rigger.weights)
+                    rigger.BuildProxyRig(partition)
+
+        elapsedTime = time.perf_counter() - startTime
+        meshesPerSec = len(meshes) / elapsedTime
+        print(f"proxy rigged {len(meshes)} meshes in {elapsedTime:.2f}s, {meshesPerSec:.2f} meshes/sec")
+        return meshesPerSec
+
+    # skinned meshes in the given selection, or in the whole scene if nothing is given. existing proxies are skipped.
+    def GetSkinnedMeshes(self, selection = None):
+        meshes = []
+        for skin in mc.ls(type="skinCluster"):
+            for shape in mc.skinCluster(skin, q=True, g=True) or []:
+                meshes += mc.listRelatives(shape, p=True) or []
+
+        meshes = [mesh for mesh in dict.fromkeys(meshes) if not mesh.endswith("_proxy")]
+        if selection:
+            selected = set(selection)
+            meshes = [mesh for mesh in meshes if mesh in selected]
+        return meshes
+
+    def LoadMesh(self, mesh):
         if not IsMesh(mesh):
             raise TypeError(f"{mesh} is not a mesh!")
         
@@ -20,49 +123,132 @@ class ProxyRigger:
         modelShape = mc.listRelatives(self.model, s=True)[0]
         print(f"found mesh {mesh} and shape {modelShape}")
 
-        skin = GetAllConnectIn(modelShape, GetUpperStream, 10, IsSkin)
+        upstream = GraphWalk(GetUpperStream)
+        skin = GetAllConnectIn(modelShape, GetUpperStream, 10, IsSkin, upstream, stopAtFirst=True)
         if not skin:
             raise Exception(f"{mesh} has no skin!")
         self.skin = skin[0]
 
-        jnts = GetAllConnectIn(modelShape, GetUpperStream, 10, IsJoint)
+        jnts = GetAllConnectIn(modelShape, GetUpperStream, 10, IsJoint, upstream)
         if not jnts:
             raise Exception(f"{mesh} has no joints binded!")
         self.jnts = jnts
 
         print(f"mesh: {self.model}, skin: {self.skin}, joints: {self.jnts}")
 
-        jntVertMap = self.GenerateVrtDict()
+        self.influences = self.meshData.GetSkinInfluences(self.skin)
+        self.weights = self.meshData.GetSkinWeights(self.skin)
+        self.faceCounts, self.faceVerts = self.meshData.GetMeshFaces(self.model)
+        self.topologyHash = HashArrays(self.faceCounts, self.faceVerts)
+        self.points = self.meshData.GetMeshPoints(self.model) if self.IsDecimating() else None
+
+    # the face ownership and weight hash of every segment is cached on the global control. on a rebuild only the
+    # segments whose hashes changed or whose vis is no longer driven by their control are regenerated, a topology, mode or decimation change rebuilds the whole rig.
+    # decimated segments also hash their points, they are new meshes instead of duplicates of the current one.
+    def BuildProxyRig(self, partition):
+        for progress in self.BuildProxyRigSteps(partition):
+            pass
+
+    # builds the proxy rig one segment at a time, yielding the fraction of segments done after each
+    def BuildProxyRigSteps(self, partition):
+        globalProxyCtrl = "ac_" + self.model + "_proxy_global"
+        proxyTopGrp = self.model + "_proxy_grp"
+        ctrlTopGrp = "ac_" + self.model + "_proxy_grp"
+
+        cache = self.ReadProxyCache(globalProxyCtrl)
+        if cache.get("topology") != self.topologyHash or cache.get("mode") != self.weightTransferMode or cache.get("decimation") != self.GetDecimationSettings():
+            if mc.objExists(globalProxyCtrl):
+                mc.delete(globalProxyCtrl)
+            self.CreateProxyRigGroups(globalProxyCtrl, proxyTopGrp, ctrlTopGrp)
+            cache = {"segments": {}}
+
+        cachedSegments = cache["segments"]
+        builtSegments = {}
         segments = []
+        rigidSegments = {}
         ctrls = []
-        for jnt, verts in jntVertMap.items():
-            print(f"joint {jnt} controls {verts} primarily")
-            newSeg = self.CreateProxyModelForJntAndVerts(jnt, verts)
-            if newSeg is None:
+        for i, (jnt, segment) in enumerate(zip(self.influences, partition)):
+            if segment is None:
                 continue
-            
-            newSkinCluster = mc.skinCluster(self.jnts, newSeg)[0]
-            mc.copySkinWeights(ss=self.skin, ds=newSkinCluster, nm=True, sa="closestPoint", ia="closestJoint")
+
+            builtSegments[jnt] = [segment.faceHash, segment.weightHash]
+            if segment.decimated:
+                builtSegments[jnt].append(segment.decimated.pointHash)
+            segName = self.model + "_" + jnt + "_proxy"
+            if cachedSegments.get(jnt) == builtSegments[jnt] and mc.objExists(segName) and mc.listConnections(segName + ".v", s=True, d=False):
+                continue
+
+            if mc.objExists(segName):
+                mc.delete(segName)
+
+            print(f"joint {jnt} controls {len(segment.faces)} faces primarily")
+            newSeg = self.CreateProxyModelForJntAndSegment(jnt, segment)
+            if self.weightTransferMode == "rigid":
+                rigidSegments[newSeg] = jnt
+            else:
+                self.SkinProxySegment(newSeg, segment)
             segments.append(newSeg)
 
-            ctrlLocator = "ac_" + jnt + "_proxy"
-            mc.spaceLocator(n=ctrlLocator)
+            ctrlLocator = self.GetProxyCtrlName(jnt)
             ctrlLocatorGrp = ctrlLocator + "_grp"
-            mc.group(ctrlLocator, n=ctrlLocatorGrp)
-            mc.matchTransform(ctrlLocatorGrp, jnt)
-
             vizAttr = "vis"
-            mc.addAttr(ctrlLocator, ln=vizAttr, min=0, max=1, dv=1, k=True)
+            if not mc.objExists(ctrlLocator):
+                if mc.objExists(ctrlLocatorGrp):
+                    mc.delete(ctrlLocatorGrp)
+                mc.spaceLocator(n=ctrlLocator)
+                mc.group(ctrlLocator, n=ctrlLocatorGrp)
+                mc.matchTransform(ctrlLocatorGrp, jnt)
+                mc.addAttr(ctrlLocator, ln=vizAttr, min=0, max=1, dv=1, k=True)
+                ctrls.append(ctrlLocatorGrp)
+
             mc.connectAttr(ctrlLocator + "." + vizAttr, newSeg + ".v")
-            ctrls.append(ctrlLocatorGrp)
-        
-        proxyTopGrp = self.model + "_proxy_grp"
-        mc.group(segments, n=proxyTopGrp)
+            yield (i + 1) / len(partition)
 
-        ctrlTopGrp = "ac_" + self.model + "_proxy_grp"
-        mc.group(ctrls, n=ctrlTopGrp)
+        for jnt in cachedSegments.keys() - builtSegments.keys():
+            staleNodes = mc.ls([self.model + "_" + jnt + "_proxy", self.GetProxyCtrlName(jnt) + "_grp"])
+            if staleNodes:
+                mc.delete(staleNodes)
+
+        if segments:
+            mc.parent(segments, proxyTopGrp)
+        # attached once under the proxy group, parenting would change their transforms to keep them in place
+        for seg, jnt in rigidSegments.items():
+            self.AttachProxySegment(seg, jnt)
+        if ctrls:
+            mc.parent(ctrls, ctrlTopGrp)
+
+        self.WriteProxyCache(globalProxyCtrl, {"topology": self.topologyHash, "mode": self.weightTransferMode, "decimation": self.GetDecimationSettings(), "segments": builtSegments})
+        print(f"rebuilt {len(segments)} of {len(builtSegments)} proxy segments for {self.model}")
+        self.ReportDecimation(partition)
+
+    # proxy rigs of meshes sharing a skeleton each get their own controls, like their segments
+    def GetProxyCtrlName(self, jnt):
+        return "ac_" + self.model + "_" + jnt + "_proxy"
+
+    # source and proxy triangle counts of every decimated segment, the source faces counted as the triangles they
+    # split into so both sides are in the same unit
+    def ReportDecimation(self, partition):
+        self.decimationReport = {jnt: (segment.decimated.sourceTriCount, len(segment.decimated.faceCounts)) for jnt, segment in zip(self.influences, partition) if segment and segment.decimated}
+        if not self.decimationReport:
+            return
+
+        for jnt, (sourceTriCount, triCount) in self.decimationReport.items():
+            print(f"decimated {jnt} proxy: {sourceTriCount} -> {triCount} triangles ({100 * (1 - triCount / sourceTriCount):.1f}% fewer)")
+        sourceTriCount = int((self.faceCounts - 2).sum())
+        triCount = sum(triCount for sourceCount, triCount in self.decimationReport.values())
+        print(f"proxy rig of {self.model}: {triCount} triangles, {100 * triCount / sourceTriCount:.1f}% of the {sourceTriCount} source triangles")
+
+    # snapshots of the source mesh weights, to try weight changes on a proxy rig and go back
+    def SaveSkinWeights(self, mesh, path):
+        SaveMeshSkinSnapshot(self.meshData, mesh, path)
+
+    def RestoreSkinWeights(self, mesh, path):
+        RestoreMeshSkinSnapshot(self.meshData, mesh, path)
+
+    def CreateProxyRigGroups(self, globalProxyCtrl, proxyTopGrp, ctrlTopGrp):
+        mc.group(em=True, n=proxyTopGrp)
+        mc.group(em=True, n=ctrlTopGrp)
 
-        globalProxyCtrl = "ac_" + self.model + "_proxy_global"
         mc.circle(n=globalProxyCtrl, r=30, nr=(0,1,0))
         mc.parent(proxyTopGrp, globalProxyCtrl)
         mc.parent(ctrlTopGrp, globalProxyCtrl)
@@ -71,58 +257,112 @@ class ProxyRigger:
         vizAttr = "vis"
         mc.addAttr(globalProxyCtrl, ln=vizAttr, min=0, max=1, dv=1, k=True)
         mc.connectAttr(globalProxyCtrl + "." + vizAttr, proxyTopGrp + ".v")
-    
-    def CreateProxyModelForJntAndVerts(self, jnt, verts):
-        if not verts:
-            return None
-        
-        faces = mc.polyListComponentConversion(verts, fromVertex=True, toFace=True)
-        faces = mc.ls(faces, fl=True)
 
-        labels = set()
-        for face in faces:
-            labels.add(face.replace(self.model, ""))
+        mc.addAttr(globalProxyCtrl, ln="proxyCache", dt="string")
+
+    def ReadProxyCache(self, globalProxyCtrl):
+        if not mc.objExists(globalProxyCtrl) or not mc.attributeQuery("proxyCache", node=globalProxyCtrl, exists=True):
+            return {}
+
+        cache = mc.getAttr(globalProxyCtrl + ".proxyCache")
+        return json.loads(cache) if cache else {}
+
+    def WriteProxyCache(self, globalProxyCtrl, cache):
+        mc.setAttr(globalProxyCtrl + ".proxyCache", json.dumps(cache), type="string")
+
+    def CreateProxyModelForJntAndSegment(self, jnt, segment):
+        if segment.decimated:
+            return self.CreateDecimatedProxyModel(jnt, segment.decimated)
 
         dup = mc.duplicate(self.model)[0]
 
-        allDupFaces = mc.ls(f"{dup}.f[*]", fl=True)
-        facesToDelete = []
-        for dupFace in allDupFaces:
-            label = dupFace.replace(dup, "")
-            if label not in labels:
-                facesToDelete.append(dupFace)
-        
-        mc.delete(facesToDelete)
+        if segment.deleteRanges:
+            mc.delete(GetComponentSpecs(dup, "f", segment.deleteRanges))
 
         dupName = self.model + "_" + jnt + "_proxy"
         mc.rename(dup, dupName)
         return dupName
     
-    def GenerateVrtDict(self):
-        dict = {}
-        for jnt in self.jnts:
-            dict[jnt] = []
-        
-        verts = mc.ls(f"{self.model}.vtx[*]", fl=True)
-        for vert in verts:
-            owningJnt = self.GetJntWithMaxInfluence(vert, self.skin)
-            dict[owningJnt].append(vert)
-        
-        return dict
-    
-    def GetJntWithMaxInfluence(self, vert, skin):
-        weights = mc.skinPercent(skin, vert, q=True, v=True)
-        jnts = mc.skinPercent(skin, vert, q=True, t=None)
+    # a new mesh under a copy of the model's transform, in the initial shading group like a new polygon primitive
+    def CreateDecimatedProxyModel(self, jnt, decimated):
+        dup = mc.duplicate(self.model, po=True)[0]
+        self.meshData.CreateMesh(dup, decimated.faceCounts, decimated.faceVerts, decimated.points)
+        mc.sets(dup, e=True, forceElement="initialShadingGroup")
+
+        dupName = self.model + "_" + jnt + "_proxy"
+        mc.rename(dup, dupName)
+        return dupName
+
+    def SkinProxySegment(self, seg, segment):
+        if self.weightTransferMode == "closestPoint":
+            newSkinCluster = mc.skinCluster(self.jnts, seg)[0]
+            mc.copySkinWeights(ss=self.skin, ds=newSkinCluster, nm=True, sa="closestPoint", ia="closestJoint")
+            return newSkinCluster
+
+        usedInfluences, segmentWeights = GetSegmentWeights(self.weights, segment.decimated.sourceVerts if segment.decimated else segment.verts)
+        usedJnts = [self.influences[i] for i in usedInfluences.tolist()]
 
-        maxWeightIndex = 0
-        maxWeight = weights[0]
+        newSkinCluster = mc.skinCluster(usedJnts, seg, tsb=True)[0]
+        boundJnts = self.meshData.GetSkinInfluences(newSkinCluster)
+        columns = [usedJnts.index(jnt) for jnt in boundJnts]
+        self.meshData.SetSkinWeights(newSkinCluster, segmentWeights[:, columns])
+        return newSkinCluster
 
-        for i in range(1, len(weights)):
-            if weights[i] > maxWeight:
-                maxWeight = weights[i]
-                maxWeightIndex = i
+    # the segment's transform becomes its offset from the joint and the joint's world matrix drives its
+    # offsetParentMatrix, no constraint or utility node is evaluated between the two. the proxy group does not inherit
+    # transforms so the segment's world matrix is the product of the two.
+    def AttachProxySegment(self, seg, jnt):
+        segMatrix = np.array(mc.getAttr(seg + ".worldMatrix[0]")).reshape(4, 4)
+        jntInverseMatrix = np.array(mc.getAttr(jnt + ".worldInverseMatrix[0]")).reshape(4, 4)
+        mc.xform(seg, m=(segMatrix @ jntInverseMatrix).ravel().tolist())
+        mc.connectAttr(jnt + ".worldMatrix[0]", seg + ".offsetParentMatrix")
 
-        return jnts[maxWeightIndex]
+    # frames per second of the skeleton alone and with a skinned and a rigid proxy rig of the mesh, with every joint
+    # keyed to rotate over the frame range and the mesh hidden. every rig is undone after it is measured, run it on a
+    # mesh without a proxy rig or the existing one is evaluated in every measurement.
+    def BenchmarkProxyEvaluation(self, mesh, frameCount = 200):
+        weightTransferMode = self.weightTransferMode
+        playbackFps = {}
+        try:
+            for mode in ("skeleton", "index", "rigid"):
+                mc.undoInfo(openChunk=True, chunkName="BenchmarkProxyEvaluation")
+                try:
+                    if mode == "skeleton":
+                        self.LoadMesh(mesh)
+                    else:
+                        self.weightTransferMode = mode
+                        self.CreateProxyRigForMesh(mesh)
+                    mc.setAttr(mesh + ".v", 0)
+                    for jnt in self.influences:
+                        mc.setKeyframe(jnt + ".rotateZ", t=0, v=0)
+                        mc.setKeyframe(jnt + ".rotateZ", t=frameCount, v=30)
+                    playbackFps[mode] = MeasurePlaybackFps(0, frameCount)
+                finally:
+                    mc.undoInfo(closeChunk=True)
+                    mc.undo()
+        finally:
+            self.weightTransferMode = weightTransferMode
+
+        print(f"{mesh}, {len(self.influences)} joints, skeleton: {playbackFps['skeleton']:.1f} fps, skinned proxy: {playbackFps['index']:.1f} fps, rigid proxy: {playbackFps['rigid']:.1f} fps")
+        return playbackFps
+
+    # seconds to proxy rig the meshes with every mesh partitioned in this process and with the worker processes. both
+    # rigs are undone after they are measured, run it on meshes without proxy rigs or the second run only rebuilds
+    # what changed.
+    def BenchmarkProxyRigWorkers(self, meshes, workerCount = None):
+        elapsedTimes = {}
+        for name, count in (("serial", 0), ("workers", workerCount)):
+            mc.undoInfo(openChunk=True, chunkName="BenchmarkProxyRigWorkers")
+            try:
+                startTime = time.perf_counter()
+                self.CreateProxyRigsForMeshes(meshes, count)
+                elapsedTimes[name] = time.perf_counter() - startTime
+            finally:
+                mc.undoInfo(closeChunk=True)
+                mc.undo()
+
+        print(f"proxy rigged {len(meshes)} meshes serially in {elapsedTimes['serial']:.2f}s, with workers in {elapsedTimes['workers']:.2f}s, {elapsedTimes['serial'] / elapsedTimes['workers']:.2f}x speedup")
+        return elapsedTimes
 
 class ProxyRiggerWidget(QMayaWindow):
     def __init__(self):
@@ -131,15 +371,72 @@ class ProxyRiggerWidget(QMayaWindow):
         self.setWindowTitle("Proxy Rigger")
         self.masterLayout = QVBoxLayout()
         self.setLayout(self.masterLayout)
+
+        decimateLayout = QHBoxLayout()
+        self.masterLayout.addLayout(decimateLayout)
+        decimateLayout.addWidget(QLabel("Decimate Ratio: "))
+        decimateRatioLineEdit = QLineEdit(str(self.proxyRigger.decimateRatio))
+        decimateRatioLineEdit.setValidator(QDoubleValidator(0.01, 1, 3))
+        decimateRatioLineEdit.textChanged.connect(self.DecimateRatioChanged)
+        decimateLayout.addWidget(decimateRatioLineEdit)
+        decimateLayout.addWidget(QLabel("Max Triangles Per Segment: "))
+        decimateFaceBudgetLineEdit = QLineEdit(str(self.proxyRigger.decimateFaceBudget))
+        decimateFaceBudgetLineEdit.setValidator(QIntValidator(0, 10000000))
+        decimateFaceBudgetLineEdit.textChanged.connect(self.DecimateFaceBudgetChanged)
+        decimateLayout.addWidget(decimateFaceBudgetLineEdit)
+
+        rigidCheckBox = QCheckBox("Rigid Segments (No Skin)")
+        rigidCheckBox.setChecked(self.proxyRigger.weightTransferMode == "rigid")
+        rigidCheckBox.toggled.connect(self.RigidToggled)
+        self.masterLayout.addWidget(rigidCheckBox)
+
         generateProxyRigBtn = QPushButton("Generate Proxy Rig")
         self.masterLayout.addWidget(generateProxyRigBtn)
         generateProxyRigBtn.clicked.connect(self.GenerateProxyRigBtnClicked)
 
+        generateAllProxyRigsBtn = QPushButton("Generate Proxy Rigs For All Skinned Meshes")
+        self.masterLayout.addWidget(generateAllProxyRigsBtn)
+        generateAllProxyRigsBtn.clicked.connect(self.GenerateAllProxyRigsBtnClicked)
+
+        saveSkinWeightsBtn = QPushButton("Save Skin Weights")
+        self.masterLayout.addWidget(saveSkinWeightsBtn)
+        saveSkinWeightsBtn.clicked.connect(self.SaveSkinWeightsBtnClicked)
+
+        restoreSkinWeightsBtn = QPushButton("Restore Skin Weights")
+        self.masterLayout.addWidget(restoreSkinWeightsBtn)
+        restoreSkinWeightsBtn.clicked.connect(self.RestoreSkinWeightsBtnClicked)
+        self.pipelineWindow = None
+
+    def DecimateRatioChanged(self, newText):
+        if newText:
+            self.proxyRigger.decimateRatio = min(1.0, max(0.01, float(newText)))
+
+    def DecimateFaceBudgetChanged(self, newText):
+        if newText:
+            self.proxyRigger.decimateFaceBudget = int(newText)
+
+    def RigidToggled(self, checked):
+        self.proxyRigger.weightTransferMode = "rigid" if checked else "index"
+
     def GenerateProxyRigBtnClicked(self):
-        self.proxyRigger.CreateProxyRigFromSelectedMesh()
+        mesh = mc.ls(sl=True)[0]
+        self.pipelineWindow = RunPipeline(self.proxyRigger.CreateProxyRigPipeline(mesh))
+
+    def GenerateAllProxyRigsBtnClicked(self):
+        meshes = self.proxyRigger.GetSkinnedMeshes(mc.ls(sl=True))
+        self.proxyRigger.CreateProxyRigsForMeshes(meshes)
+
+    def SaveSkinWeightsBtnClicked(self):
+        mesh = mc.ls(sl=True)[0]
+        path = QFileDialog().getSaveFileName(self, "Save Skin Weights", mesh + ".skinsnap", "Skin Snapshot (*.skinsnap)")[0]
+        if path:
+            self.proxyRigger.SaveSkinWeights(mesh, path)
+
+    def RestoreSkinWeightsBtnClicked(self):
+        mesh = mc.ls(sl=True)[0]
+        path = QFileDialog().getOpenFileName(self, "Restore Skin Weights", "", "Skin Snapshot (*.skinsnap)")[0]
+        if path:
+            self.proxyRigger.RestoreSkinWeights(mesh, path)
 
     def GetWindowHash(self):
         return "2401e835b25f8769cba309ce93c2b157"
-
-proxyRiggerWidget = ProxyRiggerWidget()
-proxyRiggerWidget.show()
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import struct
+import time
+import numpy as np
+import maya.cmds as mc
+from MayaUtils import GetAllConnectIn, GetUpperStream, IsSkin
+from ProxyPartition import HashArrays
+
+# binary snapshot of the weights of one skinCluster. only the non zero weights are stored, row by row like a csr
+# matrix:
+#   header        magic, version, influence count, vertex count, weight count, name table size, topology hash
+#   name table    influence names, utf-8, newline separated, padded to 8 bytes
+#   offsets       int64 x (vertex count + 1), the weights of vertex i are entries offsets[i] to offsets[i + 1]
+#   weights       float32 x weight count
+#   influences    uint16 x weight count, column of each weight in the name table
+# the arrays are memory mapped when read, so loading some vertices or influences only reads the pages they are in.
+
+SnapshotMagic = b"SKINSNAP"
+SnapshotVersion = 1
+HeaderFormat = "<8sIIQQI40s"
+HeaderSize = struct.calcsize(HeaderFormat)
+
+def GetPadding(size, alignment = 8):
+    return -size % alignment
+
+# weights is a vertex x influence array with columns in the order of influences
+def SaveSkinSnapshot(path, influences, weights, topologyHash):
+    if len(influences) > np.iinfo(np.uint16).max:
+        raise ValueError(f"a snapshot holds at most {np.iinfo(np.uint16).max} influences, got {len(influences)}")
+
+    vertCount = len(weights)
+    rows, columns = np.nonzero(weights)
+    offsets = np.zeros(vertCount + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=vertCount), out=offsets[1:])
+    nameTable = "\n".join(influences).encode()
+
+    with open(path, "wb") as snapshotFile:
+        snapshotFile.write(struct.pack(HeaderFormat, SnapshotMagic, SnapshotVersion, len(influences), vertCount, len(rows), len(nameTable), topologyHash.encode()))
+        snapshotFile.write(nameTable + bytes(GetPadding(HeaderSize + len(nameTable))))
+        snapshotFile.write(offsets.tobytes())
+        snapshotFile.write(weights[rows, columns].astype(np.float32).tobytes())
+        snapshotFile.write(columns.astype(np.uint16).tobytes())
+
+class SkinSnapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as snapshotFile:
+            header = struct.unpack(HeaderFormat, snapshotFile.read(HeaderSize))
+            magic, version, influenceCount, self.vertCount, self.weightCount, nameTableSize, topologyHash = header
+            if magic != SnapshotMagic or version != SnapshotVersion:
+                raise ValueError(f"{path} is not a version {SnapshotVersion} skin snapshot")
+            nameTable = snapshotFile.read(nameTableSize).decode()
+
+        self.topologyHash = topologyHash.decode()
+        self.influences = nameTable.split("\n") if influenceCount else []
+        offsetsStart = HeaderSize + nameTableSize + GetPadding(HeaderSize + nameTableSize)
+        weightsStart = offsetsStart + (self.vertCount + 1) * 8
+        columnsStart = weightsStart + self.weightCount * 4
+        self.offsets = np.memmap(path, dtype=np.int64, mode="r", offset=offsetsStart, shape=(self.vertCount + 1,))
+        self.weights = np.memmap(path, dtype=np.float32, mode="r", offset=weightsStart, shape=(self.weightCount,)) if self.weightCount else np.zeros(0, dtype=np.float32)
+        self.columns = np.memmap(path, dtype=np.uint16, mode="r", offset=columnsStart, shape=(self.weightCount,)) if self.weightCount else np.zeros(0, dtype=np.uint16)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.Close()
+
+    # drops the memory maps so the file can be written again, windows keeps mapped files locked
+    def Close(self):
+        self.offsets = self.weights = self.columns = None
+
+    # returns a vertex x influence array of the given vertices, all by default, with one column per given influence
+    # name, all in the order of the snapshot by default. influences missing from the snapshot get zero weights.
+    def GetWeights(self, verts = None, influences = None):
+        if verts is None:
+            rowCount = self.vertCount
+            rows = np.repeat(np.arange(rowCount), np.diff(self.offsets))
+            positions = slice(None)
+        else:
+            verts = np.asarray(verts, dtype=np.int64)
+            rowCount = len(verts)
+            starts = self.offsets[verts]
+            counts = self.offsets[verts + 1] - starts
+            rows = np.repeat(np.arange(rowCount), counts)
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        columns = np.asarray(self.columns[positions], dtype=np.int64)
+        values = np.asarray(self.weights[positions], dtype=np.float64)
+        if influences is None:
+            weights = np.zeros((rowCount, len(self.influences)))
+            weights[rows, columns] = values
+            return weights
+
+        snapshotColumns = {influence: i for i, influence in enumerate(self.influences)}
+        columnMap = np.full(len(self.influences), -1, dtype=np.int64)
+        for i, influence in enumerate(influences):
+            if influence in snapshotColumns:
+                columnMap[snapshotColumns[influence]] = i
+
+        newColumns = columnMap[columns]
+        kept = newColumns >= 0
+        weights = np.zeros((rowCount, len(influences)))
+        weights[rows[kept], newColumns[kept]] = values[kept]
+        return weights
+
+def GetMeshSkin(mesh):
+    meshShape = mc.listRelatives(mesh, s=True)[0]
+    skin = GetAllConnectIn(meshShape, GetUpperStream, 10, IsSkin, stopAtFirst=True)
+    if not skin:
+        raise Exception(f"{mesh} has no skin!")
+    return skin[0]
+
+def GetMeshTopologyHash(meshData, mesh):
+    return HashArrays(*meshData.GetMeshFaces(mesh))
+
+# one bulk read of the skin weights
+def SaveMeshSkinSnapshot(meshData, mesh, path):
+    skin = GetMeshSkin(mesh)
+    SaveSkinSnapshot(path, meshData.GetSkinInfluences(skin), meshData.GetSkinWeights(skin), GetMeshTopologyHash(meshData, mesh))
+
+# one bulk write of the skin weights, of the given vertices only if there are any. every influence in the snapshot
+# has to be bound to the skin.
+def RestoreMeshSkinSnapshot(meshData, mesh, path, verts = None):
+    skin = GetMeshSkin(mesh)
+    influences = meshData.GetSkinInfluences(skin)
+    with SkinSnapshot(path) as snapshot:
+        if snapshot.topologyHash != GetMeshTopologyHash(meshData, mesh):
+            raise Exception(f"the topology of {mesh} changed since {path} was saved!")
+
+        missing = set(snapshot.influences) - set(influences)
+        if missing:
+            raise Exception(f"{skin} is missing the influences {sorted(missing)} of {path}!")
+
+        if verts is None:
+            weights = snapshot.GetWeights(influences=influences)
+        else:
+            weights = np.array(meshData.GetSkinWeights(skin))
+            weights[verts] = snapshot.GetWeights(verts, influences)
+    meshData.SetSkinWeights(skin, weights)
+
+# the per vertex command path the snapshot replaces
+def SaveWithSkinPercent(mesh, verts):
+    skin = GetMeshSkin(mesh)
+    return np.array([mc.skinPercent(skin, f"{mesh}.vtx[{vert}]", q=True, v=True) for vert in verts])
+
+def RestoreWithSkinPercent(mesh, verts, weights):
+    skin = GetMeshSkin(mesh)
+    influences = mc.skinCluster(skin, q=True, inf=True)
+    for vert, vertWeights in zip(verts, weights):
+        mc.skinPercent(skin, f"{mesh}.vtx[{vert}]", transformValue=list(zip(influences, vertWeights.tolist())), normalize=False)
+
+# times a snapshot save and restore of the whole mesh against skinPercent on the first vertCount vertices, the
+# skinPercent times are scaled up to the whole mesh
+def BenchmarkSkinSnapshot(meshData, mesh, path, vertCount = 1000):
+    allVertCount = len(meshData.GetMeshPoints(mesh))
+    verts = np.arange(min(vertCount, allVertCount))
+
+    startTime = time.perf_counter()
+    SaveMeshSkinSnapshot(meshData, mesh, path)
+    saveTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    RestoreMeshSkinSnapshot(meshData, mesh, path)
+    restoreTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    weights = SaveWithSkinPercent(mesh, verts)
+    skinPercentSaveTime = (time.perf_counter() - startTime) * allVertCount / len(verts)
+
+    startTime = time.perf_counter()
+    RestoreWithSkinPercent(mesh, verts, weights)
+    skinPercentRestoreTime = (time.perf_counter() - startTime) * allVertCount / len(verts)
+
+    fileSize = os.path.getsize(path)
+    print(f"snapshot of {allVertCount} vertices: {fileSize / 1024:.1f}KB, {fileSize / allVertCount:.1f} bytes per vertex")
+    print(f"save: snapshot {saveTime:.3f}s, skinPercent {skinPercentSaveTime:.3f}s estimated")
+    print(f"restore: snapshot {restoreTime:.3f}s, skinPercent {skinPercentRestoreTime:.3f}s estimated")
+    return {"fileSize": fileSize, "saveTime": saveTime, "restoreTime": restoreTime, "skinPercentSaveTime": skinPercentSaveTime, "skinPercentRestoreTime": skinPercentRestoreTime}
@@ -0,0 +1,41 @@
+import numpy as np
+
+# checks of a vertex x influence weight matrix against what unreal imports cleanly: at most maxInfluences non zero
+# weights per vertex, the weights of every vertex summing to one, and weights only on the joints that are exported.
+# every check is one operation over the whole matrix.
+
+NormalizeTolerance = 1e-4
+
+class SkinIssues:
+    def __init__(self, weights, exported, maxInfluences, tolerance = NormalizeTolerance):
+        nonZero = weights != 0
+        # vertex masks
+        self.overInfluenced = np.count_nonzero(nonZero, axis=1) > maxInfluences
+        self.unnormalized = np.abs(weights.sum(axis=1) - 1) > tolerance
+        self.outsideWeighted = nonZero[:, ~exported].any(axis=1)
+        self.negativeWeighted = (weights < 0).any(axis=1)
+        # influence columns
+        self.zeroInfluences = np.flatnonzero(~nonZero.any(axis=0))
+        self.outsideInfluences = np.flatnonzero(~exported)
+
+    def GetOffendingVerts(self):
+        return np.flatnonzero(self.overInfluenced | self.unnormalized | self.outsideWeighted | self.negativeWeighted)
+
+# exported is a mask of the influence columns on exported joints. returns the offending vertices and their fixed
+# weights: weights on joints that are not exported and negative weights are dropped, then each vertex keeps its
+# largest maxInfluences weights, renormalized. vertices left with no weight can not be fixed and keep all zeros.
+def FixSkinWeights(weights, exported, maxInfluences, issues: SkinIssues = None):
+    issues = issues or SkinIssues(weights, exported, maxInfluences)
+    verts = issues.GetOffendingVerts()
+    fixed = weights[verts]
+    fixed[:, ~exported] = 0
+    np.maximum(fixed, 0, out=fixed)
+
+    if fixed.shape[1] > maxInfluences:
+        dropped = np.argpartition(fixed, -maxInfluences, axis=1)[:, :-maxInfluences]
+        np.put_along_axis(fixed, dropped, 0, axis=1)
+
+    sums = fixed.sum(axis=1)
+    weighted = sums > 0
+    fixed[weighted] /= sums[weighted, None]
+    return verts, fixed
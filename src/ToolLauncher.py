@@ -0,0 +1,123 @@
+import importlib
+import os
+import sys
+import time
+
+# registry of the tool windows. registering a tool only records the module and widget class it lives in, so
+# installing the tools at startup imports none of them. a tool's module, and with it PySide2 and maya, is imported the
+# first time the tool is opened, after that its window is shown again instead of being rebuilt.
+# with MAYA_TOOLS_DEV_MODE=1 every open reloads MayaUtils and the tool's module and builds a new window, so edits show
+# up without restarting maya.
+
+DevMode = os.environ.get("MAYA_TOOLS_DEV_MODE", "") == "1"
+
+class ToolEntry:
+    def __init__(self, name, moduleName, widgetClassName):
+        self.name = name
+        self.moduleName = moduleName
+        self.widgetClassName = widgetClassName
+        self.windowHash = ""
+        self.firstOpenTime = None
+
+tools = {}
+# open windows by their GetWindowHash
+openWindows = {}
+
+def RegisterTool(name, moduleName, widgetClassName):
+    tools[name] = ToolEntry(name, moduleName, widgetClassName)
+
+RegisterTool("Limb Rigger", "LimbRiggingTool", "LimbRigToolWidget")
+RegisterTool("Proxy Rigger", "ProxyRigger", "ProxyRiggerWidget")
+RegisterTool("Maya To UE", "MayaToUE", "MayaToUEWidget")
+
+# a reload of MayaUtils starts with no scene index, the old one is uninstalled first so its callbacks do not leak
+def GetToolModule(entry):
+    if DevMode and entry.moduleName in sys.modules:
+        importlib.import_module("MayaUtils").UninstallSceneIndex()
+        importlib.reload(importlib.import_module("MayaUtils"))
+        return importlib.reload(sys.modules[entry.moduleName])
+    return importlib.import_module(entry.moduleName)
+
+def IsWindowAlive(window):
+    import shiboken2
+    return shiboken2.isValid(window)
+
+def OpenTool(name):
+    entry = tools[name]
+    window = openWindows.get(entry.windowHash)
+    if window and not DevMode and IsWindowAlive(window):
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    startTime = time.perf_counter()
+    moduleCount = len(sys.modules)
+    toolModule = GetToolModule(entry)
+    # the tools share one scene index for the session, it is installed with the first tool so startup imports nothing
+    importlib.import_module("MayaUtils").InstallSceneIndex()
+    window = getattr(toolModule, entry.widgetClassName)()
+    window.show()
+    entry.windowHash = window.GetWindowHash()
+    openWindows[entry.windowHash] = window
+
+    if entry.firstOpenTime is None:
+        entry.firstOpenTime = time.perf_counter() - startTime
+        print(f"opened {name} in {entry.firstOpenTime:.3f}s, importing {len(sys.modules) - moduleCount} modules")
+    return window
+
+def GetFirstOpenTimes():
+    return {name: entry.firstOpenTime for name, entry in tools.items() if entry.firstOpenTime is not None}
+
+# adds a menu with one entry per tool to the maya main menu bar, there is none in batch mode
+def InstallToolsMenu(menuName = "MayaToolsMenu", label = "Tools"):
+    import maya.cmds as mc
+    if mc.about(batch=True):
+        return
+
+    startTime = time.perf_counter()
+    if mc.menu(menuName, exists=True):
+        mc.deleteUI(menuName)
+
+    mc.menu(menuName, parent="MayaWindow", label=label, tearOff=True)
+    for name in tools:
+        mc.menuItem(label=name, parent=menuName, command=lambda *args, name=name: OpenTool(name))
+    print(f"installed {len(tools)} tools in {time.perf_counter() - startTime:.3f}s")
+
+StartupScript = """
+import sys
+import time
+startTime = time.perf_counter()
+import maya.standalone
+maya.standalone.initialize()
+{setup}
+print("STARTUP_TIME", time.perf_counter() - startTime)
+maya.standalone.uninitialize()
+"""
+
+# times a mayapy start up to a ready scene with and without the tools installed, median of the given runs
+def MeasureStartup(mayapyCommand = None, runs = 3):
+    import statistics
+    import subprocess
+    from BatchExport import GetDefaultWorkerCommand
+
+    toolsDir = os.path.dirname(os.path.abspath(__file__))
+    setups = {
+        "without tools": "",
+        "with tools": f"sys.path.append({toolsDir!r})\nimport ToolLauncher",
+    }
+
+    startupTimes = {}
+    for label, setup in setups.items():
+        times = []
+        for run in range(runs):
+            process = subprocess.run((mayapyCommand or GetDefaultWorkerCommand()) + ["-c", StartupScript.format(setup=setup)], capture_output=True, text=True, check=True)
+            times += [float(line.split()[1]) for line in process.stdout.splitlines() if line.startswith("STARTUP_TIME")]
+        startupTimes[label] = statistics.median(times)
+        print(f"startup {label}: {startupTimes[label]:.3f}s")
+
+    print(f"the tools add {startupTimes['with tools'] - startupTimes['without tools']:.3f}s to startup")
+    return startupTimes
+
+if __name__ == "__main__":
+    MeasureStartup()